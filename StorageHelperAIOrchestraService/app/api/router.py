@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 import logging
 from app.api.schemas import (
     IngestRequest, IngestResponse, 
+    IngestBatchRequest, IngestBatchResponse,
     SearchRequest, SearchResponse, 
     FeedbackRequest, FeedbackResponse,
     SearchResultItem, LocationInfo
@@ -68,6 +69,41 @@ async def process_document(request: IngestRequest):
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
 
 
+@api_router.post("/ingestion/batch", response_model=IngestBatchResponse)
+async def process_documents_batch(request: IngestBatchRequest):
+    """
+    [Batch Ingestion Pipeline]
+    Process several documents in one call. OCR runs concurrently across the batch and
+    all embeddings are generated with a single batch request.
+    Failed documents are reported per item instead of failing the whole request.
+    """
+    try:
+        results = await ingestion.run_ingestion_batch(
+            [(item.image_url, item.owner_id, item.document_id, item.file_type) for item in request.items]
+        )
+        
+        responses = []
+        for result in results:
+            recommendation_data = result.get("recommendation_data") or {}
+            succeeded = result.get("status") == "completed" and bool(recommendation_data)
+            responses.append(IngestResponse(
+                status="completed" if succeeded else "failed",
+                document_id=str(result.get("document_id") or ""),
+                detected_type_code=recommendation_data.get("category_code"),
+                extracted_metadata=result.get("extracted_metadata", {}),
+                recommended_location_id=recommendation_data.get("location_id"),
+                recommended_location_reason=recommendation_data.get("recommendation_reason"),
+                error=None if succeeded else (
+                    result.get("recommendation_error") or result.get("error") or "Ingestion failed."
+                )
+            ))
+        
+        return IngestBatchResponse(results=responses)
+    except Exception as e:
+        logger.error(f"Error in batch ingestion pipeline: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch ingestion failed: {str(e)}")
+
+
 @api_router.post("/search", response_model=SearchResponse)
 async def search_documents(request: SearchRequest):
     """
@@ -55,6 +55,21 @@ class IngestResponse(BaseModel):
     # AI 推荐的位置 (对应 storage_location)
     recommended_location_id: Optional[int] = None
     recommended_location_reason: Optional[str] = None
+    
+    # 批量处理时单个文档失败的原因
+    error: Optional[str] = None
+
+class IngestBatchRequest(BaseModel):
+    """
+    批量处理多个文档的入参
+    """
+    items: List[IngestRequest] = Field(..., min_length=1, description="Documents to process in one batch")
+
+class IngestBatchResponse(BaseModel):
+    """
+    批量处理结果，顺序与请求一致
+    """
+    results: List[IngestResponse]
 
 # ==========================================
 # 2. Search Pipeline (搜索文档)
@@ -96,6 +96,9 @@ class Settings(BaseSettings):
     GEMINI_LLM_API_KEY: str = ""  # Gemini API key for LLM (recommendation)
     GEMINI_EMBEDDING_MODEL: str = "text-embedding-004"  # Embedding model name
     GEMINI_LLM_MODEL: str = "gemini-2.5-flash-preview-09-2025"  # LLM model name
+    EMBEDDING_CACHE_ENABLE: bool = True  # Cache embeddings by (model, task type, text) hash in tmp/embedding_cache.sqlite
+    RECOMMENDATION_CACHE_ENABLE: bool = True  # Cache successful LLM recommendations by (owner, model, text) hash
+    RECOMMENDATION_CACHE_TTL: float = 86400.0  # Recommendation cache entry lifetime (seconds)
     
     # OCR Configuration
     TESSERACT_CMD: Optional[str] = None  # Tesseract 可执行文件路径，如果为 None 则使用系统 PATH
@@ -127,6 +130,8 @@ class Settings(BaseSettings):
         logger.info(f"Embedding API Key: {mask_sensitive_value(self.GEMINI_EMBEDDING_API_KEY)}")
         logger.info(f"LLM API Key: {mask_sensitive_value(self.GEMINI_LLM_API_KEY)}")
         logger.info(f"Embedding Model: {self.GEMINI_EMBEDDING_MODEL}")
+        logger.info(f"Embedding Cache: {'Enabled' if self.EMBEDDING_CACHE_ENABLE else 'Disabled'}")
+        logger.info(f"Recommendation Cache: {'Enabled' if self.RECOMMENDATION_CACHE_ENABLE else 'Disabled'} (TTL: {self.RECOMMENDATION_CACHE_TTL}s)")
         logger.info(f"LLM Model: {self.GEMINI_LLM_MODEL}")
         logger.info(f"Tesseract Language: {self.TESSERACT_LANG}")
         logger.info(f"OCR Preprocessing: {'Enabled' if self.OCR_ENABLE_PREPROCESSING else 'Disabled'}")
@@ -1,7 +1,12 @@
 import httpx
 import logging
 from typing import Dict, Any, List, Optional, TYPE_CHECKING
+
+import numpy as np
+import orjson
+
 from app.core.config import settings
+from app.storage.vector_codec import encode_embedding
 
 # Use TYPE_CHECKING to avoid circular import
 if TYPE_CHECKING:
@@ -16,6 +21,11 @@ client = httpx.AsyncClient(base_url=settings.STORAGE_SERVICE_URL)
 DB_LOCATION_FORMAT = Dict[int, List[Any]]  # Input format: {location_id: [name, description, ...]}
 LLM_LOCATION_FORMAT = Dict[int, Dict[str, Any]]  # Output format: {location_id: {"name": str, "description": str}}
 
+# Document fields kept out of the persist payload: the embedding travels only as
+# packed float32 (embedding_b64); the int8 copy is a local search tier, and
+# content_hash is local storage's duplicate key
+LOCAL_ONLY_DOCUMENT_FIELDS = ("embedding", "embedding_int8_b64", "embedding_scale", "content_hash")
+
 
 class LocationDataHandler:
     """
@@ -146,6 +156,26 @@ async def get_location_info(location_id: int) -> Dict[str, Any]:
         # 抛出异常以便上层捕获
         raise RuntimeError(f"Failed to fetch location info for ID: {location_id}")
 
+def encode_document_payload(document_data: Dict[str, Any]) -> bytes:
+    """
+    Serialize document data for POST /internal/documents.
+    The embedding is sent as base64 of packed little-endian float32 (about a quarter
+    of the size of a JSON float list), and the body is encoded once with orjson.
+    
+    :param document_data: Document dictionary from the ingestion pipeline
+    :return: JSON request body
+    """
+    payload = {key: value for key, value in document_data.items() if key not in LOCAL_ONLY_DOCUMENT_FIELDS}
+    
+    # Callers that still pass a plain float list get it packed here
+    embedding = document_data.get("embedding")
+    if not payload.get("embedding_b64") and embedding is not None and len(embedding) > 0:
+        payload["embedding_b64"] = encode_embedding(np.asarray(embedding, dtype=np.float32))
+        payload["embedding_dimension"] = len(embedding)
+    
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
+
+
 async def persist_document(document_data: Dict[str, Any]) -> int:
     """
     [对应后端 API: POST /internal/documents]
@@ -156,9 +186,10 @@ async def persist_document(document_data: Dict[str, Any]) -> int:
     """
     url = "/documents"
     try:
-        # 实际代码会调用: await client.post(url, json=document_data, timeout=10.0)
+        payload = encode_document_payload(document_data)
+        # 实际代码会调用: await client.post(url, content=payload, headers={"Content-Type": "application/json"}, timeout=10.0)
         # 这里为了测试通过，我们返回一个Mock文档ID
-        print(f"Mocking POST {url}: Persisting document data with keys: {list(document_data.keys())}")
+        print(f"Mocking POST {url}: Persisting document data with keys: {list(document_data.keys())} ({len(payload)} bytes)")
         return 1  # Mock document ID
     except Exception:
         raise RuntimeError("Failed to persist document to storage service")
\ No newline at end of file
@@ -3,11 +3,11 @@ Result assembler for combining search results with document and location informa
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import logging
-import json
 from pathlib import Path
 
-from app.storage.local_storage import get_document
+from app.storage.local_storage import get_document, read_json_cached
 from app.integrations.storage_client import get_location_info
 from app.api.schemas import LocationInfo
 
@@ -29,8 +29,7 @@ def load_locations() -> Dict[int, Dict[str, Any]]:
             logger.warning(f"Locations file not found: {LOCATIONS_FILE}")
             return {}
         
-        with open(LOCATIONS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json_cached(LOCATIONS_FILE)
         
         locations = data.get("locations", [])
         # Create a dictionary mapping location_id to location data
@@ -68,19 +67,24 @@ class ResultAssembler:
         assembled_results = []
         
         # Load locations once if needed (optimization: avoid loading multiple times)
-        locations_cache = None
-        if include_location:
-            locations_cache = load_locations()
+        # and fetch all documents concurrently, off the event loop
+        locations_task = asyncio.to_thread(load_locations) if include_location else asyncio.sleep(0)
+        locations_cache, *docs = await asyncio.gather(
+            locations_task,
+            *[
+                asyncio.to_thread(get_document, str(result["document_id"]), include_embedding=False)
+                if result.get("document_id") else asyncio.sleep(0)
+                for result in search_results
+            ]
+        )
         
-        for result in search_results:
+        for result, doc in zip(search_results, docs):
             doc_id = result.get("document_id")
             score = result.get("score", 0.0)
             
             if not doc_id:
                 continue
             
-            # Get full document data
-            doc = get_document(str(doc_id), include_embedding=False)
             if not doc:
                 logger.warning(f"Document not found: {doc_id}")
                 continue
@@ -169,6 +173,11 @@ class ResultAssembler:
 _default_assembler = ResultAssembler()
 
 
+def get_default_assembler() -> ResultAssembler:
+    """Get default result assembler instance"""
+    return _default_assembler
+
+
 async def assemble_search_results(
     search_results: List[Dict[str, Any]],
     include_location: bool = True
@@ -3,11 +3,23 @@ Text cleaning and post-processing module for OCR results.
 Cleans up common OCR errors and normalizes text.
 """
 import re
+import asyncio
 import logging
 from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns, shared across calls
+_WS_RE = re.compile(r'\s+')
+
+# Common OCR character fixes (adjust based on common errors)
+COMMON_OCR_FIXES = {
+    '0': 'O',  # Only in context where O makes more sense (requires context)
+    '1': 'I',  # Only in context where I makes more sense
+    'rn': 'm',  # Common OCR error: rn -> m
+    'vv': 'w',  # Common OCR error: vv -> w
+}
+
 
 def clean_ocr_text(text: str, min_confidence: float = 0.0) -> str:
     """
@@ -27,7 +39,7 @@ def clean_ocr_text(text: str, min_confidence: float = 0.0) -> str:
         return ""
     
     # 1. Remove excessive whitespace (keep single spaces)
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # 2. Remove leading/trailing whitespace from each line
     lines = [line.strip() for line in text.split('\n')]
@@ -38,14 +50,7 @@ def clean_ocr_text(text: str, min_confidence: float = 0.0) -> str:
     # 4. Join lines back with single newline
     text = '\n'.join(lines)
     
-    # 5. Common OCR character fixes (adjust based on common errors)
-    # Fix common character recognition errors
-    common_fixes = {
-        '0': 'O',  # Only in context where O makes more sense (requires context)
-        '1': 'I',  # Only in context where I makes more sense
-        'rn': 'm',  # Common OCR error: rn -> m
-        'vv': 'w',  # Common OCR error: vv -> w
-    }
+    # 5. Common OCR character fixes: see COMMON_OCR_FIXES (context-dependent, not applied yet)
     
     # 6. Remove lines with too many special characters (likely garbage)
     # Do this before removing single chars to preserve meaningful lines
@@ -65,7 +70,7 @@ def clean_ocr_text(text: str, min_confidence: float = 0.0) -> str:
     # text = re.sub(r'\b\w\b(?![.])', '', text)
     
     # 8. Normalize whitespace again after cleaning
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     
     return text
 
@@ -95,6 +100,19 @@ def filter_low_confidence_text(ocr_data: Dict[str, Any], min_confidence: float =
 async def process_text(ocr_text: str, ocr_data: Dict[str, Any] = None, min_confidence: float = 50.0) -> Dict[str, Any]:
     """
     Clean OCR text and extract metadata.
+    The CPU-bound cleaning runs in a worker thread so it does not block the event loop.
+    
+    :param ocr_text: Raw OCR text
+    :param ocr_data: Optional OCR data dictionary for confidence filtering
+    :param min_confidence: Minimum confidence threshold (0-100)
+    :return: Dictionary with cleaned text and metadata
+    """
+    return await asyncio.to_thread(process_text_sync, ocr_text, ocr_data, min_confidence)
+
+
+def process_text_sync(ocr_text: str, ocr_data: Dict[str, Any] = None, min_confidence: float = 50.0) -> Dict[str, Any]:
+    """
+    Synchronous implementation of process_text.
     
     :param ocr_text: Raw OCR text
     :param ocr_data: Optional OCR data dictionary for confidence filtering
@@ -2,8 +2,9 @@ import httpx
 import json
 import logging
 import asyncio
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 from app.core.config import settings
+from app.storage.embedding_cache import EmbeddingCache, get_default_cache
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +15,17 @@ class EmbeddingGenerator:
     Uses Gemini API's embedContent endpoint with configurable model and task type.
     """
     
+    # Maximum number of texts per batchEmbedContents request
+    MAX_BATCH_SIZE = 100
+    
     def __init__(
         self,
         model_name: Optional[str] = None,
         api_key: Optional[str] = None,
         task_type: str = "RETRIEVAL_DOCUMENT",
         max_retries: int = 3,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize the EmbeddingGenerator with configuration.
@@ -30,6 +35,7 @@ class EmbeddingGenerator:
         :param task_type: Task type for embedding (e.g., "RETRIEVAL_DOCUMENT").
         :param max_retries: Maximum number of retry attempts.
         :param timeout: Request timeout in seconds.
+        :param cache: Embedding cache for repeated texts. Defaults to the shared cache if EMBEDDING_CACHE_ENABLE is set.
         """
         self.model_name = model_name or settings.GEMINI_EMBEDDING_MODEL
         self.api_key = api_key or settings.GEMINI_EMBEDDING_API_KEY
@@ -37,6 +43,8 @@ class EmbeddingGenerator:
         self.max_retries = max_retries
         self.timeout = timeout
         self._api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:embedContent?key={self.api_key}"
+        self._batch_api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:batchEmbedContents?key={self.api_key}"
+        self.cache = cache or (get_default_cache() if settings.EMBEDDING_CACHE_ENABLE else None)
     
     async def generate(self, text: str) -> List[float]:
         """
@@ -52,6 +60,15 @@ class EmbeddingGenerator:
             logger.warning("Attempted to generate embedding for empty or whitespace text. Returning empty vector.")
             return []
         
+        # Return the stored vector if this text was embedded before (SQLite lookup off the event loop)
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(self.model_name, self.task_type, text)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached:
+                logger.info(f"Embedding cache hit. Vector dimension: {len(cached)}")
+                return cached
+        
         # Construct request payload
         payload = {
             "content": {
@@ -83,6 +100,8 @@ class EmbeddingGenerator:
                     
                     if embedding_values and isinstance(embedding_values, list):
                         logger.info(f"Embedding successful. Vector dimension: {len(embedding_values)}")
+                        if self.cache:
+                            await asyncio.to_thread(self.cache.put, cache_key, embedding_values)
                         return embedding_values
                     else:
                         error_message = "Embedding response missing 'values' or invalid structure."
@@ -103,27 +122,259 @@ class EmbeddingGenerator:
         logger.critical("Failed to generate embedding after all retries.")
         raise Exception("Embedding generation failed due to repeated API errors.")
     
-    async def generate_batch(self, texts: List[str]) -> List[List[float]]:
+    async def generate_batch(self, texts: List[str], raise_on_error: bool = False) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batch.
+        Texts are sent to Gemini API's batchEmbedContents endpoint, one request per MAX_BATCH_SIZE texts.
         
         :param texts: List of document texts to generate embeddings for.
-        :return: List of embedding vectors (each is a list of floats).
+        :param raise_on_error: If True, raise when a batch fails instead of returning empty vectors.
+        :return: List of embedding vectors (each is a list of floats), in input order.
+        :raises Exception: If raise_on_error is set and a batch fails after all retries.
         """
-        results = []
-        for text in texts:
+        results: List[List[float]] = [[] for _ in texts]
+        
+        # Empty texts get an empty vector without a round-trip
+        positions = [i for i, text in enumerate(texts) if text and text.strip()]
+        
+        # Serve previously embedded texts from the cache (SQLite lookup off the event loop)
+        keys = {}
+        if self.cache and positions:
+            keys = {i: self.cache.make_key(self.model_name, self.task_type, texts[i]) for i in positions}
+            cached = await asyncio.to_thread(self.cache.get_many, list(set(keys.values())))
+            for i in positions:
+                if keys[i] in cached:
+                    results[i] = cached[keys[i]]
+            misses = [i for i in positions if not results[i]]
+            if len(misses) < len(positions):
+                logger.info(f"Embedding cache hits: {len(positions) - len(misses)}/{len(positions)}")
+            positions = misses
+        
+        for start in range(0, len(positions), self.MAX_BATCH_SIZE):
+            chunk = positions[start:start + self.MAX_BATCH_SIZE]
             try:
-                embedding = await self.generate(text)
-                results.append(embedding)
+                embeddings = await self._request_batch([texts[i] for i in chunk])
             except Exception as e:
-                logger.error(f"Failed to generate embedding for text (length: {len(text)}): {e}")
-                results.append([])  # Append empty list on failure
+                if raise_on_error:
+                    raise
+                logger.error(f"Failed to generate embeddings for batch of {len(chunk)} texts: {e}")
+                continue
+            for i, embedding in zip(chunk, embeddings):
+                results[i] = embedding
+            if self.cache:
+                await asyncio.to_thread(self.cache.put_many, {keys[i]: results[i] for i in chunk})
+        
         return results
+    
+    async def _request_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call the batchEmbedContents endpoint for a list of non-empty texts.
+        
+        :param texts: Texts to embed (at most MAX_BATCH_SIZE).
+        :return: List of embedding vectors, in input order.
+        :raises Exception: If API call fails or returns invalid data after all retries.
+        """
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{self.model_name}",
+                    "content": {"parts": [{"text": text}]},
+                    "taskType": self.task_type
+                }
+                for text in texts
+            ]
+        }
+        
+        headers = {'Content-Type': 'application/json'}
+        
+        # Implement exponential backoff retry
+        delay = 1
+        
+        for attempt in range(self.max_retries):
+            try:
+                async with httpx.AsyncClient(timeout=self.timeout) as client:
+                    logger.info(f"Attempting to generate {len(texts)} embeddings in batch (Attempt {attempt + 1}/{self.max_retries})")
+                    response = await client.post(self._batch_api_url, headers=headers, json=payload)
+                    response.raise_for_status()
+                    
+                    result = response.json()
+                    
+                    # Extract embedding values from result['embeddings'][i]['values']
+                    embeddings = [item.get('values') for item in result.get('embeddings', [])]
+                    
+                    if len(embeddings) == len(texts) and all(isinstance(values, list) and values for values in embeddings):
+                        logger.info(f"Batch embedding successful. {len(embeddings)} vectors")
+                        return embeddings
+                    else:
+                        error_message = "Batch embedding response missing 'values' or invalid structure."
+                        logger.error(error_message)
+                        # Raise ValueError to trigger next retry
+                        raise ValueError(error_message)
+                        
+            except httpx.HTTPError as e:
+                logger.error(f"HTTP Error on Batch Embedding API call (Attempt {attempt + 1}/{self.max_retries}): {e}")
+            except Exception as e:
+                logger.error(f"Error processing Batch Embedding response (Attempt {attempt + 1}/{self.max_retries}): {e}")
+                
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(delay)
+                delay *= 2  # Exponential backoff
+        
+        logger.critical("Failed to generate batch embeddings after all retries.")
+        raise Exception("Batch embedding generation failed due to repeated API errors.")
+
+
+class BatchedEmbedder:
+    """
+    Micro-batching wrapper around EmbeddingGenerator.
+    
+    Exposes the same async generate(text) API, but concurrent calls are queued and
+    coalesced into a single batchEmbedContents request. A batch is flushed once it
+    reaches max_batch_size or max_wait_ms after its first text arrived.
+    """
+    
+    def __init__(
+        self,
+        generator: Optional[EmbeddingGenerator] = None,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize the BatchedEmbedder.
+        
+        :param generator: Underlying EmbeddingGenerator. Defaults to new EmbeddingGenerator().
+        :param max_batch_size: Maximum number of texts per backend call.
+        :param max_wait_ms: Maximum time to wait for more texts before flushing a batch.
+        """
+        self.generator = generator or EmbeddingGenerator()
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._collecting: List[Tuple[str, asyncio.Future]] = []  # Batch _run has dequeued but not flushed yet
+    
+    @property
+    def model_name(self) -> str:
+        """Model name of the underlying generator."""
+        return self.generator.model_name
+    
+    async def generate(self, text: str) -> List[float]:
+        """
+        Generate embedding for the given text, batched with concurrent callers.
+        
+        :param text: Document text to generate embedding for.
+        :return: List of floats representing the embedding vector.
+        :raises Exception: If the batch containing this text fails after all retries.
+        """
+        if not text or not text.strip():
+            logger.warning("Attempted to generate embedding for empty or whitespace text. Returning empty vector.")
+            return []
+        
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def generate_batch(self, texts: List[str], raise_on_error: bool = False) -> List[List[float]]:
+        """
+        Generate embeddings for an explicit batch of texts (bypasses the queue).
+        
+        :param texts: List of document texts to generate embeddings for.
+        :param raise_on_error: If True, raise when a batch fails instead of returning empty vectors.
+        :return: List of embedding vectors, in input order.
+        """
+        return await self.generator.generate_batch(texts, raise_on_error=raise_on_error)
+    
+    async def close(self) -> None:
+        """
+        Stop the background worker (call on application shutdown).
+        Texts already handed to a backend call are still embedded; callers whose text was
+        queued but not yet sent get a RuntimeError instead of waiting forever.
+        """
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        pending = self._collecting
+        self._collecting = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("BatchedEmbedder closed before the text was embedded"))
+        
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+    
+    def _ensure_worker(self) -> None:
+        """Start the background worker on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+    
+    async def _run(self) -> None:
+        """Drain the queue into batches and flush each one in its own task."""
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._queue.get()]
+            self._collecting = batch
+            deadline = self._loop.time() + self.max_wait_ms / 1000
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Flush without blocking collection of the next batch
+            self._collecting = []
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+    
+    async def _flush(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed one batch and resolve the callers' futures."""
+        texts = [text for text, _ in batch]
+        logger.info(f"Flushing embedding batch of {len(texts)} texts")
+        
+        try:
+            embeddings = await self.generator.generate_batch(texts, raise_on_error=True)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
 
 
 # Create a default instance for backward compatibility
 _default_generator = EmbeddingGenerator()
 
+# Shared micro-batching embedder used by the pipelines
+_default_embedder: Optional[BatchedEmbedder] = None
+
+
+def get_default_embedder() -> BatchedEmbedder:
+    """Get default batched embedder instance (wraps the default EmbeddingGenerator)"""
+    global _default_embedder
+    if _default_embedder is None:
+        _default_embedder = BatchedEmbedder(_default_generator)
+    return _default_embedder
+
+
 # Backward compatibility: export the generate method as a module-level function
 async def generate_embedding(text: str) -> List[float]:
     """
@@ -4,6 +4,9 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Precompiled whitespace pattern, shared across calls
+_WS_RE = re.compile(r'\s+')
+
 
 class QueryProcessor:
     """
@@ -26,7 +29,7 @@ class QueryProcessor:
             return ""
         
         # Remove extra whitespace and trim
-        normalized = re.sub(r'\s+', ' ', query.strip())
+        normalized = _WS_RE.sub(' ', query.strip())
         
         logger.debug(f"Query normalized: '{query}' -> '{normalized}'")
         return normalized
@@ -36,6 +39,11 @@ class QueryProcessor:
 _default_processor = QueryProcessor()
 
 
+def get_default_processor() -> QueryProcessor:
+    """Get default query processor instance"""
+    return _default_processor
+
+
 async def normalize_query(query: str) -> str:
     """
     Backward compatibility wrapper for normalize_query function.
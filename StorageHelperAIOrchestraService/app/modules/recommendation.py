@@ -1,15 +1,19 @@
 import httpx
 import json
 import logging
+import orjson
 import asyncio
+import random
 from typing import Dict, Any, Optional, List
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 # Import location data handler from storage_client
 from app.integrations.storage_client import LocationDataHandler, LLM_LOCATION_FORMAT, DB_LOCATION_FORMAT
 # Import settings for API configuration
 from app.core.config import settings
+from app.storage.local_storage import read_json_cached
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +106,16 @@ class RecommendationGenerator:
         self.model_name = model_name or settings.GEMINI_LLM_MODEL
         self.api_key = api_key or settings.GEMINI_LLM_API_KEY
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:generateContent?key={self.api_key}"
+        # Shared pooled client: reuses TCP/TLS connections across requests
+        self._client = httpx.AsyncClient(
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+
+    async def close(self) -> None:
+        """Close the shared HTTP client (call on application shutdown)."""
+        await self._client.aclose()
 
     def load_document_categories(self) -> List[Dict[str, Any]]:
         """Load document categories from JSON file."""
@@ -109,9 +123,8 @@ class RecommendationGenerator:
             if not self.DOCUMENT_CATEGORIES_FILE.exists():
                 logger.warning(f"Document categories file not found: {self.DOCUMENT_CATEGORIES_FILE}")
                 return []
-            with open(self.DOCUMENT_CATEGORIES_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("document_categories", [])
+            data = read_json_cached(self.DOCUMENT_CATEGORIES_FILE)
+            return data.get("document_categories", [])
         except Exception as e:
             logger.error(f"Error loading document categories: {e}")
             return []
@@ -122,9 +135,8 @@ class RecommendationGenerator:
             if not self.LOCATIONS_FILE.exists():
                 logger.warning(f"Locations file not found: {self.LOCATIONS_FILE}")
                 return []
-            with open(self.LOCATIONS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("locations", [])
+            data = read_json_cached(self.LOCATIONS_FILE)
+            return data.get("locations", [])
         except Exception as e:
             logger.error(f"Error loading locations: {e}")
             return []
@@ -142,8 +154,7 @@ class RecommendationGenerator:
         try:
             if not self.INDEX_FILE.exists():
                 return []
-            with open(self.INDEX_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = read_json_cached(self.INDEX_FILE)
             mappings = data.get("location_mappings")
             if isinstance(mappings, list):
                 return mappings
@@ -157,13 +168,14 @@ class RecommendationGenerator:
         try:
             index_data = {}
             if self.INDEX_FILE.exists():
-                with open(self.INDEX_FILE, 'r', encoding='utf-8') as f:
-                    index_data = json.load(f)
+                with open(self.INDEX_FILE, 'rb') as f:
+                    index_data = orjson.loads(f.read())
                     if not isinstance(index_data, dict):
                         index_data = {}
             index_data["location_mappings"] = mappings
-            with open(self.INDEX_FILE, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, indent=2, ensure_ascii=False)
+            # Indented: index.json is also edited by hand
+            with open(self.INDEX_FILE, 'wb') as f:
+                f.write(orjson.dumps(index_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         except Exception as e:
             logger.error(f"Failed to persist location mappings to index: {e}")
 
@@ -178,7 +190,8 @@ class RecommendationGenerator:
         if category_id is None or location_id is None:
             return
 
-        mappings = self.load_location_mappings()
+        # Copy: the loaded list is shared with other readers until the file changes
+        mappings = list(self.load_location_mappings())
         for mapping in mappings:
             if mapping.get("category_id") == category_id and mapping.get("location_id") == location_id:
                 return  # Mapping already exists
@@ -235,6 +248,22 @@ class RecommendationGenerator:
         category_mappings.sort(key=lambda m: m.get("priority", 0), reverse=True)
         return category_mappings[0].get("location_id")
 
+    def context_fingerprint(self) -> str:
+        """
+        Fingerprint of the categories, locations and location mappings files that generate()
+        reads, from their modification time and size. Changes whenever any of them is rewritten.
+
+        :return: Fingerprint string
+        """
+        parts = []
+        for path in (self.DOCUMENT_CATEGORIES_FILE, self.LOCATIONS_FILE, self.INDEX_FILE):
+            try:
+                stat = path.stat()
+                parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except OSError:
+                parts.append("-")
+        return "/".join(parts)
+
     def score_location_for_category(self, category_code: str, location: Dict[str, Any]) -> int:
         """Score how suitable a location is for the given category code using keyword overlap."""
         keywords = get_category_keywords(category_code) or []
@@ -283,8 +312,8 @@ class RecommendationGenerator:
         try:
             self.DOCUMENT_CATEGORIES_FILE.parent.mkdir(parents=True, exist_ok=True)
             data = {"document_categories": categories}
-            with open(self.DOCUMENT_CATEGORIES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(self.DOCUMENT_CATEGORIES_FILE, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             logger.info(f"Saved document categories to {self.DOCUMENT_CATEGORIES_FILE}")
             return True
         except Exception as e:
@@ -300,7 +329,8 @@ class RecommendationGenerator:
         :param code: Category code (auto-generated if not provided)
         :return: The new category dict with assigned ID
         """
-        categories = self.load_document_categories()
+        # Copy: the loaded list is shared with other readers until the file changes
+        categories = list(self.load_document_categories())
 
         # Generate code if not provided (use first 3 uppercase letters of name)
         if not code or not is_allowed_category_type(code):
@@ -500,146 +530,176 @@ class RecommendationGenerator:
 
         # Implementing exponential backoff for robustness
         max_retries = 3
-        delay = 1
+        base_delay = 1
+        max_delay = 8
+        max_retry_after = max_delay * 4
 
         for attempt in range(max_retries):
+            retry_after = None
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(self.api_url, headers=headers, json=payload)
-                    response.raise_for_status()
-
-                    result = response.json()
-
-                    # Extract and parse the JSON string from the response
-                    json_string = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text')
-
-                    if not json_string:
-                        logger.error("Gemini response was missing text content.")
-                        raise ValueError("Gemini API response format invalid: Missing text content.")
-
-                    parsed_json = json.loads(json_string)
-
-                    categories = self.load_document_categories()
-                    existing_codes = {cat.get("code", "").upper(): cat for cat in categories}
-
-                    final_category_id = None
-                    final_category_code = parsed_json.get("category_code", "").upper().strip()
-                    is_new_category = False
-
-                    if final_category_code == "NEW_CATEGORY":
-                        new_name = parsed_json.get("new_category_name", "")
-                        new_code = parsed_json.get("new_category_code", "").upper().strip()
-                        new_description = parsed_json.get("new_category_description", "")
-
-                        if not new_code or not is_allowed_category_type(new_code):
-                            logger.warning(
-                                f"AI returned invalid new_category_code '{new_code}'. Using first available canonical code.")
-                            new_code = ALLOWED_CATEGORY_TYPES[0] if ALLOWED_CATEGORY_TYPES else "TAX"
-
-                        if not new_name or not new_description:
-                            logger.error(
-                                "NEW_CATEGORY specified but missing name or description. Using canonical suggestion.")
-                            suggestion = get_category_suggestion(new_code)
-                            new_name = suggestion.get("name", new_code)
-                            new_description = suggestion.get("description",
-                                                             f"Category for documents classified as {new_code}")
-
-                        new_category = self.ensure_category_exists(code=new_code, name=new_name,
-                                                                   description=new_description)
-                        final_category_code = new_category["code"]
-                        final_category_id = new_category["id"]
-                        logger.info(
-                            f"Ensured category exists: {final_category_code} ({new_name}) with ID {final_category_id}")
-                        is_new_category = True
-
-                    elif final_category_code in existing_codes:
-                        final_category_id = existing_codes[final_category_code]["id"]
-
-                    elif is_allowed_category_type(final_category_code):
-                        logger.info(
-                            f"Canonical code '{final_category_code}' does not exist. Creating new category using suggestion.")
-                        suggestion = get_category_suggestion(final_category_code)
-                        new_name = suggestion.get("name", final_category_code)
+                response = await self._client.post(self.api_url, headers=headers, json=payload)
+                response.raise_for_status()
+
+                result = response.json()
+
+                # Extract and parse the JSON string from the response
+                json_string = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text')
+
+                if not json_string:
+                    logger.error("Gemini response was missing text content.")
+                    raise ValueError("Gemini API response format invalid: Missing text content.")
+
+                parsed_json = json.loads(json_string)
+
+                categories = self.load_document_categories()
+                existing_codes = {cat.get("code", "").upper(): cat for cat in categories}
+
+                final_category_id = None
+                final_category_code = parsed_json.get("category_code", "").upper().strip()
+                is_new_category = False
+
+                if final_category_code == "NEW_CATEGORY":
+                    new_name = parsed_json.get("new_category_name", "")
+                    new_code = parsed_json.get("new_category_code", "").upper().strip()
+                    new_description = parsed_json.get("new_category_description", "")
+
+                    if not new_code or not is_allowed_category_type(new_code):
+                        logger.warning(
+                            f"AI returned invalid new_category_code '{new_code}'. Using first available canonical code.")
+                        new_code = ALLOWED_CATEGORY_TYPES[0] if ALLOWED_CATEGORY_TYPES else "TAX"
+
+                    if not new_name or not new_description:
+                        logger.error(
+                            "NEW_CATEGORY specified but missing name or description. Using canonical suggestion.")
+                        suggestion = get_category_suggestion(new_code)
+                        new_name = suggestion.get("name", new_code)
                         new_description = suggestion.get("description",
-                                                         f"Category for documents classified as {final_category_code}")
-                        new_category = self.ensure_category_exists(code=final_category_code, name=new_name,
-                                                                   description=new_description)
-                        final_category_code = new_category["code"]
-                        final_category_id = new_category["id"]
-                        is_new_category = True
+                                                         f"Category for documents classified as {new_code}")
+
+                    new_category = self.ensure_category_exists(code=new_code, name=new_name,
+                                                               description=new_description)
+                    final_category_code = new_category["code"]
+                    final_category_id = new_category["id"]
+                    logger.info(
+                        f"Ensured category exists: {final_category_code} ({new_name}) with ID {final_category_id}")
+                    is_new_category = True
+
+                elif final_category_code in existing_codes:
+                    final_category_id = existing_codes[final_category_code]["id"]
+
+                elif is_allowed_category_type(final_category_code):
+                    logger.info(
+                        f"Canonical code '{final_category_code}' does not exist. Creating new category using suggestion.")
+                    suggestion = get_category_suggestion(final_category_code)
+                    new_name = suggestion.get("name", final_category_code)
+                    new_description = suggestion.get("description",
+                                                     f"Category for documents classified as {final_category_code}")
+                    new_category = self.ensure_category_exists(code=final_category_code, name=new_name,
+                                                               description=new_description)
+                    final_category_code = new_category["code"]
+                    final_category_id = new_category["id"]
+                    is_new_category = True
+
+                else:
+                    logger.error(
+                        f"Final category code '{final_category_code}' is neither NEW_CATEGORY nor an existing/canonical code.")
+                    raise ValueError(f"Failed to resolve category code: {final_category_code}")
+
+                parsed_json["category_id"] = final_category_id
+                parsed_json["category_code"] = final_category_code
+
+                assigned_location_id = None
+                assigned_location_name = None
+                if locations:
+                    valid_location_ids = {loc.get("id") for loc in locations}
 
+                    preferred_location_id = self.get_preferred_location_for_category(final_category_id)
+                    if preferred_location_id and preferred_location_id in valid_location_ids:
+                        assigned_location_id = preferred_location_id
                     else:
-                        logger.error(
-                            f"Final category code '{final_category_code}' is neither NEW_CATEGORY nor an existing/canonical code.")
-                        raise ValueError(f"Failed to resolve category code: {final_category_code}")
-
-                    parsed_json["category_id"] = final_category_id
-                    parsed_json["category_code"] = final_category_code
-
-                    assigned_location_id = None
-                    assigned_location_name = None
-                    if locations:
-                        valid_location_ids = {loc.get("id") for loc in locations}
-
-                        preferred_location_id = self.get_preferred_location_for_category(final_category_id)
-                        if preferred_location_id and preferred_location_id in valid_location_ids:
-                            assigned_location_id = preferred_location_id
-                        else:
-                            assigned_location_id = self.find_best_unused_location(final_category_code, locations,
-                                                                                  used_location_ids)
-                            if assigned_location_id:
-                                used_location_ids.add(assigned_location_id)
-
-                            if not assigned_location_id:
-                                assigned_location_id = self.find_best_location_any(final_category_code, locations)
-
-                        if assigned_location_id and assigned_location_id in valid_location_ids:
-                            matched_location = location_lookup.get(assigned_location_id)
-                            assigned_location_name = matched_location.get("name",
-                                                                          f"Location {assigned_location_id}") if matched_location else f"Location {assigned_location_id}"
-                        else:
-                            assigned_location_id = locations[0].get("id")
-                            assigned_location_name = locations[0].get("name", f"Location {assigned_location_id}")
-
-                        parsed_json["suggested_location_id"] = assigned_location_id
-                        parsed_json["suggested_location_name"] = assigned_location_name
-                        # Also set location_id and location_name for compatibility with router.py and ingestion.py
-                        parsed_json["location_id"] = assigned_location_id
-                        parsed_json["location_name"] = assigned_location_name
-
-                        if final_category_id and assigned_location_id and (
-                                is_new_category or not preferred_location_id):
-                            self.ensure_location_mapping(final_category_id, assigned_location_id)
+                        assigned_location_id = self.find_best_unused_location(final_category_code, locations,
+                                                                              used_location_ids)
+                        if assigned_location_id:
+                            used_location_ids.add(assigned_location_id)
+
+                        if not assigned_location_id:
+                            assigned_location_id = self.find_best_location_any(final_category_code, locations)
+
+                    if assigned_location_id and assigned_location_id in valid_location_ids:
+                        matched_location = location_lookup.get(assigned_location_id)
+                        assigned_location_name = matched_location.get("name",
+                                                                      f"Location {assigned_location_id}") if matched_location else f"Location {assigned_location_id}"
                     else:
-                        # If no locations available, set to None explicitly
-                        parsed_json["suggested_location_id"] = None
-                        parsed_json["suggested_location_name"] = None
-                        parsed_json["location_id"] = None
-                        parsed_json["location_name"] = None
-                        logger.warning("No locations available. Location recommendation set to None.")
-
-                    return {
-                        "status": "llm_success",
-                        "recommendation": parsed_json
-                    }
+                        assigned_location_id = locations[0].get("id")
+                        assigned_location_name = locations[0].get("name", f"Location {assigned_location_id}")
+
+                    parsed_json["suggested_location_id"] = assigned_location_id
+                    parsed_json["suggested_location_name"] = assigned_location_name
+                    # Also set location_id and location_name for compatibility with router.py and ingestion.py
+                    parsed_json["location_id"] = assigned_location_id
+                    parsed_json["location_name"] = assigned_location_name
+
+                    if final_category_id and assigned_location_id and (
+                            is_new_category or not preferred_location_id):
+                        self.ensure_location_mapping(final_category_id, assigned_location_id)
+                else:
+                    # If no locations available, set to None explicitly
+                    parsed_json["suggested_location_id"] = None
+                    parsed_json["suggested_location_name"] = None
+                    parsed_json["location_id"] = None
+                    parsed_json["location_name"] = None
+                    logger.warning("No locations available. Location recommendation set to None.")
+
+                return {
+                    "status": "llm_success",
+                    "recommendation": parsed_json
+                }
 
             except httpx.HTTPStatusError as e:
                 logger.error(f"HTTP error on attempt {attempt + 1}: {e.response.status_code} - {e.response.text}")
+                if e.response.status_code == 429:
+                    retry_after = self._parse_retry_after(e.response.headers.get("Retry-After"))
             except Exception as e:
                 logger.error(f"Error on attempt {attempt + 1}: {e}")
 
-                # Exponential backoff
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(delay)
-                    delay *= 2
+            # Capped exponential backoff with jitter (server-provided Retry-After wins, up to
+            # max_retry_after so a huge value cannot stall the request while it holds a slot)
+            if attempt < max_retries - 1:
+                if retry_after is not None:
+                    delay = min(retry_after, max_retry_after)
                 else:
-                    logger.error("Max retries reached. Failed to generate recommendation.")
-                    return {
-                        "status": "llm_error",
-                        "error": "Failed to generate recommendation after multiple retries."
-                    }
+                    delay = min(max_delay, base_delay * (2 ** attempt)) + random.uniform(0, 1)
+                logger.warning(f"Retrying recommendation in {delay:.2f}s (Attempt {attempt + 1}/{max_retries})...")
+                await asyncio.sleep(delay)
+
+        logger.error("Max retries reached. Failed to generate recommendation.")
+        return {
+            "status": "llm_error",
+            "error": "Failed to generate recommendation after multiple retries."
+        }
 
-        return {"status": "llm_error", "error": "Failed to generate recommendation due to an unknown issue."}
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header given in seconds or as an HTTP date.
+
+        :param value: Raw header value (may be None).
+        :return: Delay in seconds, or None if absent or unparseable.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring unparseable Retry-After header: {value!r}")
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 # Default instance for backward compatibility
 _default_generator = RecommendationGenerator()
@@ -661,3 +721,8 @@ async def generate_recommendation(
     :return: Dictionary containing the structured recommendation with category_id and category_code, or error info.
     """
     return await _default_generator.generate(document_text, owner_id, existing_locations)
+
+
+def recommendation_context_fingerprint() -> str:
+    """Fingerprint of the files the default RecommendationGenerator builds its results from."""
+    return _default_generator.context_fingerprint()
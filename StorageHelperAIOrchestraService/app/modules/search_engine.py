@@ -2,11 +2,12 @@
 Similarity search engine for finding documents using vector embeddings.
 Supports both low-level embedding-based search and high-level text query search.
 """
+import asyncio
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import logging
 
-from app.storage.local_storage import get_all_embeddings, get_embedding, get_document
+from app.storage.local_storage import load_embedding_matrix, get_embedding, get_document
 from app.modules.embedding import EmbeddingGenerator
 
 logger = logging.getLogger(__name__)
@@ -69,7 +70,7 @@ class SearchEngine:
     
     async def search(
         self,
-        query_embedding: List[float],
+        query_embedding: Union[List[float], np.ndarray],
         owner_id: Optional[int] = None,
         top_k: int = 5,
         min_score: float = 0.0
@@ -83,42 +84,114 @@ class SearchEngine:
         :param min_score: Minimum similarity score threshold (0-1)
         :return: List of search results with document IDs and scores, sorted by score (descending)
         """
-        if not query_embedding:
+        if query_embedding is None or len(query_embedding) == 0:
             logger.warning("Empty query embedding provided")
             return []
         
         logger.info(f"Similarity search: owner_id={owner_id}, top_k={top_k}, min_score={min_score}")
         
-        # Get all documents with embeddings
-        documents = get_all_embeddings(owner_id=owner_id)
+        # Load the memory-mapped (N, D) embedding matrix and its row metadata
+        rows, matrix = load_embedding_matrix(owner_id=owner_id)
         
-        if not documents:
+        if not rows:
             logger.warning("No documents with embeddings found")
             return []
         
-        # Calculate similarity scores for all documents
-        scored_results = []
-        for doc in documents:
-            doc_embedding = doc.get("embedding")
-            if not doc_embedding:
-                continue
-            
-            similarity = cosine_similarity(query_embedding, doc_embedding)
-            
-            if similarity >= min_score:
-                scored_results.append({
-                    "document_id": doc["id"],
-                    "score": similarity,
-                    "metadata": doc.get("metadata", {}),
-                })
-        
-        # Sort by score (descending) and return top_k
-        scored_results.sort(key=lambda x: x["score"], reverse=True)
-        top_results = scored_results[:top_k]
+        query = np.asarray(query_embedding, dtype=matrix.dtype)
+        if query.shape[0] != matrix.shape[1]:
+            logger.warning(f"Vector dimension mismatch: {query.shape[0]} vs {matrix.shape[1]}")
+            return []
+        
+        # Matrix rows are stored unit-length, so cosine similarity is a dot product with
+        # the normalized query (a no-op for queries the search pipeline already normalized)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return []
+        query = query / query_norm
+        
+        # Score every document in one matrix-vector product
+        scores = matrix @ query
+        
+        # Keep documents above threshold; partially select the top_k, then sort just those
+        candidates = np.flatnonzero(scores >= min_score)
+        if 0 < top_k < len(candidates):
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+        top_results = self._build_results(rows, scores, order)
         
         logger.info(f"Similarity search completed: found {len(top_results)} results above threshold")
         return top_results
     
+    async def search_batch(
+        self,
+        query_embeddings: List[Union[List[float], np.ndarray]],
+        owner_id: Optional[int] = None,
+        top_k: int = 5,
+        min_score: float = 0.0
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform similarity search for several query embeddings at once.
+        
+        All queries are scored against the embedding matrix in a single matrix-matrix
+        product, so the matrix is streamed once instead of once per query.
+        
+        :param query_embeddings: List of query vector embeddings
+        :param owner_id: Optional owner ID to filter documents
+        :param top_k: Number of top results to return per query
+        :param min_score: Minimum similarity score threshold (0-1)
+        :return: One result list per query, in input order, each sorted by score (descending)
+        """
+        batch_results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+        if not query_embeddings or top_k <= 0:
+            return batch_results
+        
+        logger.info(f"Batch similarity search: {len(query_embeddings)} queries, owner_id={owner_id}, top_k={top_k}")
+        
+        rows, matrix = load_embedding_matrix(owner_id=owner_id)
+        
+        if not rows:
+            logger.warning("No documents with embeddings found")
+            return batch_results
+        
+        # Only score queries that match the matrix dimension
+        dimension = matrix.shape[1]
+        valid = [i for i, q in enumerate(query_embeddings) if q is not None and len(q) == dimension]
+        if len(valid) < len(query_embeddings):
+            logger.warning(f"Skipping {len(query_embeddings) - len(valid)} empty or mismatched query embeddings")
+        if not valid:
+            return batch_results
+        
+        queries = np.asarray([query_embeddings[i] for i in valid], dtype=matrix.dtype)
+        
+        # (B, D) @ (D, N) -> (B, N) cosine scores against the unit-length matrix rows
+        query_norms = np.linalg.norm(queries, axis=1)
+        scores = (queries / np.maximum(query_norms, np.finfo(matrix.dtype).tiny)[:, None]) @ matrix.T
+        
+        k = min(top_k, len(rows))
+        for row_scores, query_norm, position in zip(scores, query_norms, valid):
+            if query_norm == 0:
+                continue
+            # Partial selection of the top k, then sort just those
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            top = top[row_scores[top] >= min_score]
+            batch_results[position] = self._build_results(rows, row_scores, top)
+        
+        logger.info(f"Batch similarity search completed for {len(valid)} queries")
+        return batch_results
+    
+    @staticmethod
+    def _build_results(rows: List[Dict[str, Any]], scores: np.ndarray, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """Build search result dicts for the given matrix row indices."""
+        return [
+            {
+                "document_id": rows[i]["id"],
+                "score": float(scores[i]),
+                "metadata": rows[i].get("metadata", {}),
+            }
+            for i in indices
+        ]
+    
     async def search_by_text(
         self,
         query: str,
@@ -163,19 +236,22 @@ class SearchEngine:
         
         # Enrich results with full document data if requested
         if enrich_results:
+            # Fetch all documents concurrently so latency is bounded by the slowest fetch
+            full_docs = await asyncio.gather(*[
+                asyncio.to_thread(get_document, str(result["document_id"]), include_embedding=False)
+                if result.get("document_id") else asyncio.sleep(0)
+                for result in results
+            ])
             enriched_results = []
-            for result in results:
-                doc_id = result.get("document_id")
-                if doc_id:
-                    full_doc = get_document(str(doc_id), include_embedding=False)
-                    if full_doc:
-                        result.update({
-                            "text_preview": full_doc.get("extracted_text", "")[:200],
-                            "full_text": full_doc.get("extracted_text", ""),
-                            "source": full_doc.get("source"),
-                            "created_at": full_doc.get("created_at"),
-                            "recommendation_data": full_doc.get("recommendation_data"),
-                        })
+            for result, full_doc in zip(results, full_docs):
+                if full_doc:
+                    result.update({
+                        "text_preview": full_doc.get("extracted_text", "")[:200],
+                        "full_text": full_doc.get("extracted_text", ""),
+                        "source": full_doc.get("source"),
+                        "created_at": full_doc.get("created_at"),
+                        "recommendation_data": full_doc.get("recommendation_data"),
+                    })
                 enriched_results.append(result)
             logger.info(f"Text query search completed: found {len(enriched_results)} enriched results")
             return enriched_results
@@ -187,6 +263,11 @@ class SearchEngine:
 _default_engine = SearchEngine()
 
 
+def get_default_engine() -> SearchEngine:
+    """Get default search engine instance (shares its embedding generator across pipelines)"""
+    return _default_engine
+
+
 async def run_similarity_search(
     embedding: List[float],
     owner_id: Optional[int] = None,
@@ -201,8 +282,7 @@ async def run_similarity_search(
     :param top_k: Number of top results to return
     :return: List of search results with document IDs and scores
     """
-    engine = SearchEngine()
-    return await engine.search(embedding, owner_id=owner_id, top_k=top_k)
+    return await _default_engine.search(embedding, owner_id=owner_id, top_k=top_k)
 
 
 async def semantic_search(
@@ -219,5 +299,4 @@ async def semantic_search(
     :param top_k: Number of top results to return
     :return: List of search results with scores and document data
     """
-    engine = SearchEngine()
-    return await engine.search_by_text(query, owner_id=owner_id, top_k=top_k, enrich_results=True)
\ No newline at end of file
+    return await _default_engine.search_by_text(query, owner_id=owner_id, top_k=top_k, enrich_results=True)
\ No newline at end of file
@@ -15,6 +15,7 @@ Integration Pattern:
 """
 
 import os
+import re
 import logging
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
@@ -27,6 +28,14 @@ import random
 
 logger = logging.getLogger(__name__)
 
+# Keyword sets used to classify vision descriptions (matched against word tokens,
+# so plural/derived forms are listed explicitly)
+_WORD_RE = re.compile(r"[a-z]+")
+PHOTO_WORDS = frozenset({'photo', 'photos', 'photograph', 'photographs', 'image', 'images', 'picture', 'pictures'})
+LOGO_WORDS = frozenset({'logo', 'logos', 'brand', 'brands', 'branding', 'branded'})
+CHART_WORDS = frozenset({'chart', 'charts', 'graph', 'graphs', 'diagram', 'diagrams'})
+TEXT_WORDS = frozenset({'text', 'texts', 'textual', 'written', 'printed'})
+
 
 @dataclass
 class VisionResult:
@@ -72,6 +81,13 @@ class VisionAnalyzer:
         # Gemini API endpoint
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent"
         
+        # Shared pooled client: reuses TCP/TLS connections across requests
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+        
         logger.info(f"VisionAnalyzer initialized with model: {model_name}, enabled: {enable_vision}")
     
     async def analyze_image(
@@ -144,10 +160,9 @@ class VisionAnalyzer:
         
         # Check if it's a URL
         if image_source.startswith(('http://', 'https://')):
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(image_source)
-                response.raise_for_status()
-                return response.content
+            response = await self._client.get(image_source)
+            response.raise_for_status()
+            return response.content
         
         # Otherwise treat as file path
         with open(image_source, 'rb') as f:
@@ -158,18 +173,19 @@ class VisionAnalyzer:
         # Optionally resize large images to reduce API cost
         try:
             image = Image.open(io.BytesIO(image_data))
-            
+
             # Resize if too large (max 1024x1024 for cost efficiency)
             max_size = 1024
             if image.width > max_size or image.height > max_size:
                 image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                
-                # Convert back to bytes
-                buffer = io.BytesIO()
-                image.save(buffer, format=image.format or 'PNG')
-                image_data = buffer.getvalue()
+
+            # Always re-encode as JPEG: the payload declares image/jpeg, and
+            # JPEG is several times smaller than PNG for photos/scans
+            buffer = io.BytesIO()
+            image.convert('RGB').save(buffer, format='JPEG', quality=85, optimize=True)
+            image_data = buffer.getvalue()
         except Exception as e:
-            logger.warning(f"Image resize failed, using original: {str(e)}")
+            logger.warning(f"Image re-encoding failed, using original: {str(e)}")
         
         return base64.b64encode(image_data).decode('utf-8')
     
@@ -243,18 +259,17 @@ Provide a structured, comprehensive description that captures both text and visu
         
         for attempt in range(max_retries + 1):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(url_with_key, json=payload, headers=headers)
-                    
-                    # If 429, explicitly raise it to catch below
-                    if response.status_code == 429:
-                        response.raise_for_status()
-                    
-                    # For other errors, raise normally
+                response = await self._client.post(url_with_key, json=payload, headers=headers)
+                
+                # If 429, explicitly raise it to catch below
+                if response.status_code == 429:
                     response.raise_for_status()
-                    
-                    return response.json()
-                    
+                
+                # For other errors, raise normally
+                response.raise_for_status()
+                
+                return response.json()
+                
             except httpx.HTTPStatusError as e:
                 # Handle Rate Limiting (429)
                 if e.response.status_code == 429:
@@ -285,6 +300,10 @@ Provide a structured, comprehensive description that captures both text and visu
                 logger.error(f"Network error calling Gemini: {str(e)}")
                 raise e
     
+    async def close(self) -> None:
+        """Close the shared HTTP client (call on application shutdown)"""
+        await self._client.aclose()
+    
     def _parse_response(self, response: Dict[str, Any]) -> VisionResult:
         """Parse Gemini API response into VisionResult"""
         try:
@@ -305,16 +324,17 @@ Provide a structured, comprehensive description that captures both text and visu
             detected_elements = []
             has_text = False
             
-            description_lower = description.lower()
+            # Tokenize once, then classify with set intersections
+            words = set(_WORD_RE.findall(description.lower()))
             
             # Check for various visual elements
-            if any(word in description_lower for word in ['photo', 'image', 'picture']):
+            if words & PHOTO_WORDS:
                 detected_elements.append('photo')
-            if any(word in description_lower for word in ['logo', 'brand']):
+            if words & LOGO_WORDS:
                 detected_elements.append('logo')
-            if any(word in description_lower for word in ['chart', 'graph', 'diagram']):
+            if words & CHART_WORDS:
                 detected_elements.append('chart')
-            if any(word in description_lower for word in ['text', 'written', 'printed']):
+            if words & TEXT_WORDS:
                 has_text = True
                 detected_elements.append('text')
             
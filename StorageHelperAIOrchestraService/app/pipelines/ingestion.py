@@ -1,27 +1,94 @@
-from typing import Dict, Any, Optional, Union, Callable
+from typing import Dict, Any, Optional, Union, Callable, List, Tuple, Iterable, AsyncIterable, AsyncIterator, Awaitable
 import logging
 from dataclasses import dataclass, field
+from enum import IntEnum
+
+import numpy as np
 
 # Import module types
 from app.modules.ocr import OCRResult, extract_text_advanced
 from app.modules.cleaning import process_text
-from app.modules.recommendation import generate_recommendation
-from app.modules.embedding import EmbeddingGenerator
+from app.modules.recommendation import generate_recommendation, recommendation_context_fingerprint
+from app.modules.embedding import EmbeddingGenerator, BatchedEmbedder, get_default_embedder
 from app.modules.vision import VisionAnalyzer, VisionResult
 from app.integrations.storage_client import persist_document
-from app.storage.local_storage import LocalStorage, save_document, save_error_document
+from app.storage.local_storage import LocalStorage, save_document, save_error_document, bulk_insert, find_duplicate
+from app.storage.vector_codec import encode_embedding, quantize_int8, l2_normalize
+from app.storage.recommendation_cache import RecommendationCache, get_default_cache as get_default_recommendation_cache
 from app.core.config import settings
 import asyncio
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# End-of-stream marker passed between run_stream stages
+_STREAM_END = object()
+
+# Vision analyzer configured from settings, shared by all pipelines (holds a pooled HTTP client)
+_vision_analyzer: Optional[VisionAnalyzer] = None
+
+
+def get_vision_analyzer() -> VisionAnalyzer:
+    """Get the settings-configured vision analyzer instance"""
+    global _vision_analyzer
+    if _vision_analyzer is None:
+        _vision_analyzer = VisionAnalyzer(
+            api_key=settings.VISION_API_KEY or settings.GEMINI_LLM_API_KEY,
+            model_name=settings.VISION_MODEL,
+            timeout=int(settings.VISION_TIMEOUT),
+            enable_vision=settings.VISION_ENABLE
+        )
+    return _vision_analyzer
+
 
-@dataclass
+class PipelineStatus(IntEnum):
+    """Ingestion pipeline status. Output dictionaries carry the lowercase name (see label)."""
+    INITIALIZED = 0
+    OCR_COMPLETED = 1
+    VISION_COMPLETED = 2
+    CLEANING_COMPLETED = 3
+    LLM_RECOMMENDATION_COMPLETED = 4
+    COMPLETED = 5
+    
+    # Failure statuses
+    FAILED = 90  # OCR failed
+    OCR_FAILED = 91
+    CLEANING_FAILED = 92
+    RECOMMENDATION_FAILED = 93
+    EMBEDDING_FAILED = 94
+    PERSISTENCE_FAILED = 95
+    
+    @property
+    def label(self) -> str:
+        """Lowercase status name, as emitted in pipeline output."""
+        return self.name.lower()
+
+
+# Step that failed, by failure status
+_FAILED_STEP_MAP = {
+    PipelineStatus.FAILED: "OCR",
+    PipelineStatus.OCR_FAILED: "OCR",
+    PipelineStatus.CLEANING_FAILED: "Cleaning",
+    PipelineStatus.RECOMMENDATION_FAILED: "Recommendation",
+    PipelineStatus.EMBEDDING_FAILED: "Embedding",
+    PipelineStatus.PERSISTENCE_FAILED: "Persistence",
+}
+
+# Statuses after which the document is saved to the error directory
+_CRITICAL_FAILURES = frozenset({
+    PipelineStatus.FAILED,
+    PipelineStatus.OCR_FAILED,
+    PipelineStatus.RECOMMENDATION_FAILED,
+    PipelineStatus.EMBEDDING_FAILED,  # Optional but tracked
+})
+
+
+@dataclass(slots=True)
 class PipelineState:
     """State container for pipeline execution data."""
     image_url: str
     owner_id: int
-    document_id: Optional[Union[int, str]] = None  # Can be int (from DB) or str (UUID from local storage)
+    document_id: Optional[Union[int, str]] = None  # Can be int (from DB) or str (UUID, assigned in __post_init__)
     file_type: Optional[str] = None  # "image" or "pdf"
     
     # Processing results
@@ -30,23 +97,36 @@ class PipelineState:
     cleaned_text: Optional[str] = None
     cleaning_info: Optional[Dict[str, Any]] = None
     recommendation_result: Optional[Dict[str, Any]] = None
-    embedding: Optional[list] = None
+    embedding: Optional[np.ndarray] = None  # float32 vector
     embedding_status: str = "pending"
     
     # Pipeline metadata
-    processing_steps: list = field(default_factory=list)
-    status: str = "initialized"
+    processing_steps: Tuple[str, ...] = ()  # Immutable: steps extend it with +=
+    status: PipelineStatus = PipelineStatus.INITIALIZED
     error: Optional[str] = None
     
+    # Encoded embedding fields, computed once per assigned embedding
+    _embedding_fields: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        # Assign the document ID up front so every step (and persistence) already has it
+        if self.document_id is None:
+            self.document_id = str(uuid.uuid4())
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name == "embedding":
+            object.__setattr__(self, "_embedding_fields", None)
+    
     def to_output_dict(self) -> Dict[str, Any]:
         """Convert pipeline state to output dictionary."""
         output = {
-            "status": self.status,
+            "status": self.status.label,
             "owner_id": self.owner_id,
             "source": self.image_url,
             "file_type": self.file_type or "image",
             "document_id": str(self.document_id) if self.document_id is not None else None,
-            "processing_steps": self.processing_steps.copy(),
+            "processing_steps": self.processing_steps,
         }
         
         if self.ocr_result:
@@ -74,12 +154,18 @@ class PipelineState:
             else:
                 output["recommendation_error"] = self.recommendation_result.get("error")
         
-        if self.embedding:
-            output.update({
-                "embedding": self.embedding,
-                "embedding_dimension": len(self.embedding),
-                "embedding_status": self.embedding_status,
-            })
+        if self.embedding is not None:
+            if self._embedding_fields is None:
+                # Vectors are emitted as base64 float32 bytes, plus an int8 copy for quantized persistence
+                quantized, scale = quantize_int8(self.embedding)
+                self._embedding_fields = {
+                    "embedding_b64": encode_embedding(self.embedding),
+                    "embedding_dimension": int(self.embedding.shape[0]),
+                    "embedding_int8_b64": encode_embedding(quantized),
+                    "embedding_scale": scale,
+                }
+            output.update(self._embedding_fields)
+            output["embedding_status"] = self.embedding_status
         
         if self.error:
             output["error"] = self.error
@@ -92,20 +178,32 @@ class IngestionPipeline:
     Modular ingestion pipeline for processing document images.
     
     This class orchestrates the document ingestion flow:
-    OCR -> Recommendation -> Embedding -> Persistence
+    OCR -> (Cleaning -> Recommendation || Embedding) -> Persistence
     
     All modules are injected via constructor, making the pipeline
     highly testable and configurable.
     """
     
+    # Maximum concurrent OCR steps within one run_batch call
+    BATCH_OCR_CONCURRENCY = 4
+    
+    # run_stream tuning: workers per stage, queue bound between stages, embedding micro-batches
+    STREAM_WORKERS = {"ocr": 4, "cleaning": 2, "recommendation": 8, "persistence": 4}
+    STREAM_QUEUE_SIZE = 8
+    STREAM_EMBED_BATCH_SIZE = 32
+    STREAM_EMBED_WAIT = 0.05  # seconds to wait for more documents before embedding a partial batch
+    
     def __init__(
         self,
         ocr_extractor: Optional[Callable] = None,
         text_cleaner: Optional[Callable] = None,
         recommendation_generator: Optional[Callable] = None,
-        embedding_generator: Optional[EmbeddingGenerator] = None,
+        embedding_generator: Optional[Union[EmbeddingGenerator, BatchedEmbedder]] = None,
         vision_analyzer: Optional[VisionAnalyzer] = None,
         storage_client: Optional[Callable] = None,
+        max_concurrent_recommendations: int = 8,
+        max_concurrent_embeddings: int = 32,
+        recommendation_cache: Optional[RecommendationCache] = None,
     ):
         """
         Initialize the ingestion pipeline with module dependencies.
@@ -113,28 +211,31 @@ class IngestionPipeline:
         :param ocr_extractor: Function/class for OCR text extraction. Defaults to extract_text_advanced.
         :param text_cleaner: Function for cleaning OCR text. Defaults to process_text from cleaning module.
         :param recommendation_generator: Function for generating recommendations. Defaults to generate_recommendation.
-        :param embedding_generator: EmbeddingGenerator instance. Defaults to new EmbeddingGenerator().
-        :param vision_analyzer: VisionAnalyzer instance for multimodal understanding. Defaults to new VisionAnalyzer().
+        :param embedding_generator: EmbeddingGenerator instance. Defaults to the shared BatchedEmbedder, which coalesces concurrent calls.
+        :param vision_analyzer: VisionAnalyzer instance for multimodal understanding. Defaults to the shared, settings-configured VisionAnalyzer.
         :param storage_client: Function for persisting documents. Defaults to persist_document.
+        :param max_concurrent_recommendations: Maximum in-flight LLM recommendation calls across all runs.
+        :param max_concurrent_embeddings: Maximum in-flight embedding calls across all runs.
+        :param recommendation_cache: Cache for LLM recommendations. Defaults to the shared cache if RECOMMENDATION_CACHE_ENABLE is set.
         """
         # Set defaults for module dependencies
         self.ocr_extractor = ocr_extractor or extract_text_advanced
         self.text_cleaner = text_cleaner or process_text
         self.recommendation_generator = recommendation_generator or generate_recommendation
-        self.embedding_generator = embedding_generator or EmbeddingGenerator()
-        
-        # Initialize vision analyzer with configuration
-        vision_api_key = settings.VISION_API_KEY or settings.GEMINI_LLM_API_KEY
-        self.vision_analyzer = vision_analyzer or VisionAnalyzer(
-            api_key=vision_api_key,
-            model_name=settings.VISION_MODEL,
-            timeout=int(settings.VISION_TIMEOUT),
-            enable_vision=settings.VISION_ENABLE
-        )
+        self.embedding_generator = embedding_generator or get_default_embedder()
+        self.vision_analyzer = vision_analyzer or get_vision_analyzer()
         
         self.storage_client = storage_client or persist_document
         
-        logger.info(f"IngestionPipeline initialized with module dependencies (Vision: {'Enabled' if settings.VISION_ENABLE else 'Disabled'})")
+        # Bound concurrent calls to external services when many documents are ingested in parallel
+        self._rec_sem = asyncio.Semaphore(max_concurrent_recommendations)
+        self._emb_sem = asyncio.Semaphore(max_concurrent_embeddings)
+        
+        self.recommendation_cache = recommendation_cache or (
+            get_default_recommendation_cache() if settings.RECOMMENDATION_CACHE_ENABLE else None
+        )
+        
+        logger.info("IngestionPipeline initialized with module dependencies (Vision: %s)", 'Enabled' if settings.VISION_ENABLE else 'Disabled')
     
     async def step_ocr(self, state: PipelineState) -> bool:
         """
@@ -143,30 +244,31 @@ class IngestionPipeline:
         :param state: Pipeline state to update.
         :return: True if successful, False otherwise.
         """
-        logger.info(f"STEP 1 (OCR): Processing image from {state.image_url}")
+        logger.info("STEP 1 (OCR): Processing image from %s", state.image_url)
         
         try:
             state.ocr_result = await self.ocr_extractor(state.image_url)
             
             if not state.ocr_result or not state.ocr_result.text:
-                state.status = "failed"
+                state.status = PipelineStatus.FAILED
                 state.error = "OCR Extraction Failed or returned empty text."
-                logger.warning(f"OCR failed for {state.image_url}. Stopping pipeline.")
+                logger.warning("OCR failed for %s. Stopping pipeline.", state.image_url)
                 return False
             
-            state.processing_steps.append("OCR")
-            confidence_str = f"{state.ocr_result.confidence:.2f}" if state.ocr_result.confidence else "N/A"
-            logger.info(
-                f"STEP 1 (OCR) Complete. Text length: {len(state.ocr_result.text)}, "
-                f"Confidence: {confidence_str}"
-            )
-            state.status = "ocr_completed"
+            state.processing_steps += ("OCR",)
+            if logger.isEnabledFor(logging.INFO):
+                confidence_str = f"{state.ocr_result.confidence:.2f}" if state.ocr_result.confidence else "N/A"
+                logger.info(
+                    "STEP 1 (OCR) Complete. Text length: %s, Confidence: %s",
+                    len(state.ocr_result.text), confidence_str
+                )
+            state.status = PipelineStatus.OCR_COMPLETED
             return True
             
         except Exception as e:
-            state.status = "failed"
+            state.status = PipelineStatus.FAILED
             state.error = f"OCR step failed: {str(e)}"
-            logger.error(f"STEP 1 (OCR) Failed: {e}", exc_info=True)
+            logger.error("STEP 1 (OCR) Failed: %s", e, exc_info=True)
             return False
     
     async def step_vision_enhancement(self, state: PipelineState) -> bool:
@@ -202,29 +304,30 @@ class IngestionPipeline:
             
             if ocr_confidence >= threshold:
                 logger.info(
-                    f"STEP 1B (Vision): Skipped (OCR confidence {ocr_confidence:.2f} >= threshold {threshold})"
+                    "STEP 1B (Vision): Skipped (OCR confidence %.2f >= threshold %s)", ocr_confidence, threshold
                 )
                 return True
             
             logger.info(
-                f"STEP 1B (Vision): Triggered due to low OCR confidence "
-                f"({ocr_confidence:.2f} < {threshold})"
+                "STEP 1B (Vision): Triggered due to low OCR confidence (%.2f < %s)", ocr_confidence, threshold
             )
         else:
             logger.info("STEP 1B (Vision): Running for all documents (auto-trigger disabled)")
         
         try:
             # Run vision analysis
-            logger.info(f"STEP 1B (Vision): Analyzing image with Gemini Vision API...")
+            logger.info("STEP 1B (Vision): Analyzing image with Gemini Vision API...")
             state.vision_result = await self.vision_analyzer.analyze_image(state.image_url)
             
             if state.vision_result and state.vision_result.description:
-                state.processing_steps.append("Vision Enhancement")
-                logger.info(
-                    f"STEP 1B (Vision) Complete. Description length: {len(state.vision_result.description)}, "
-                    f"Confidence: {state.vision_result.confidence:.2f}, "
-                    f"Elements: {', '.join(state.vision_result.detected_elements)}"
-                )
+                state.processing_steps += ("Vision Enhancement",)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "STEP 1B (Vision) Complete. Description length: %s, Confidence: %.2f, Elements: %s",
+                        len(state.vision_result.description),
+                        state.vision_result.confidence,
+                        ", ".join(state.vision_result.detected_elements)
+                    )
                 
                 # Merge vision description with OCR text for richer understanding
                 if state.ocr_result and state.ocr_result.text:
@@ -240,7 +343,7 @@ class IngestionPipeline:
                     state.ocr_result.text = merged_text
                     logger.info("Vision description merged with OCR text for enhanced understanding")
                 
-                state.status = "vision_completed"
+                state.status = PipelineStatus.VISION_COMPLETED
                 return True
             else:
                 logger.warning("STEP 1B (Vision): No description returned, continuing without vision enhancement")
@@ -248,7 +351,7 @@ class IngestionPipeline:
                 
         except Exception as e:
             # Vision failure is not critical - continue pipeline with OCR only
-            logger.error(f"STEP 1B (Vision) Failed: {e}", exc_info=True)
+            logger.error("STEP 1B (Vision) Failed: %s", e, exc_info=True)
             logger.info("Continuing pipeline with OCR text only (graceful degradation)")
             return True  # Don't fail pipeline on vision errors
     
@@ -278,20 +381,20 @@ class IngestionPipeline:
             
             state.cleaned_text = cleaned_text
             state.cleaning_info = cleaning_info
-            state.processing_steps.append("Cleaning")
+            state.processing_steps += ("Cleaning",)
             
             logger.info(
-                f"STEP 2 (Cleaning) Complete. "
-                f"Original length: {cleaning_info.get('original_length', 0)}, "
-                f"Cleaned length: {cleaning_info.get('cleaned_length', 0)}"
+                "STEP 2 (Cleaning) Complete. Original length: %s, Cleaned length: %s",
+                cleaning_info.get('original_length', 0),
+                cleaning_info.get('cleaned_length', 0)
             )
-            state.status = "cleaning_completed"
+            state.status = PipelineStatus.CLEANING_COMPLETED
             return True
             
         except Exception as e:
-            state.status = "cleaning_failed"
+            state.status = PipelineStatus.CLEANING_FAILED
             state.error = f"Cleaning step failed: {str(e)}"
-            logger.error(f"STEP 2 (Cleaning) Failed: {e}", exc_info=True)
+            logger.error("STEP 2 (Cleaning) Failed: %s", e, exc_info=True)
             # Don't fail the pipeline, just use original text
             state.cleaned_text = state.ocr_result.text
             return True  # Continue pipeline even if cleaning fails
@@ -313,46 +416,67 @@ class IngestionPipeline:
         logger.info("STEP 3 (Recommendation): Generating structured storage recommendation using LLM...")
         
         try:
-            state.recommendation_result = await self.recommendation_generator(
-                document_text=text_to_use,
-                owner_id=state.owner_id
-            )
+            # Reuse a cached result for the same owner, model and text, as long as the categories,
+            # locations and mappings it was assigned from are unchanged (SQLite lookup off the event loop)
+            cached = None
+            if self.recommendation_cache:
+                cache_key = self.recommendation_cache.make_key(
+                    state.owner_id, settings.GEMINI_LLM_MODEL, text_to_use, recommendation_context_fingerprint()
+                )
+                cached = await asyncio.to_thread(self.recommendation_cache.get, cache_key)
+            
+            if cached:
+                logger.info("STEP 3 (Recommendation): Using cached recommendation")
+                state.recommendation_result = cached
+            else:
+                async with self._rec_sem:
+                    state.recommendation_result = await self.recommendation_generator(
+                        document_text=text_to_use,
+                        owner_id=state.owner_id
+                    )
+                # Only successful results are cached; failures should be retried. The key is rebuilt
+                # because generating may have added a location mapping
+                if self.recommendation_cache and state.recommendation_result.get("status") == "llm_success":
+                    cache_key = self.recommendation_cache.make_key(
+                        state.owner_id, settings.GEMINI_LLM_MODEL, text_to_use, recommendation_context_fingerprint()
+                    )
+                    await asyncio.to_thread(self.recommendation_cache.put, cache_key, state.recommendation_result)
             
-            state.processing_steps.append("Recommendation")
+            state.processing_steps += ("Recommendation",)
             
             if state.recommendation_result.get("status") == "llm_success":
-                state.status = "llm_recommendation_completed"
+                state.status = PipelineStatus.LLM_RECOMMENDATION_COMPLETED
                 llm_data = state.recommendation_result.get("recommendation", {})
                 suggested_location_id = llm_data.get("location_id")
                 suggested_location_name = llm_data.get("location_name") or llm_data.get("suggested_location_name", "Unknown")
                 category_code = llm_data.get("category_code", "Unknown")
                 logger.info(
-                    f"STEP 3 (Recommendation) Complete. "
-                    f"Category: {category_code}, "
-                    f"Location: {suggested_location_name} (ID: {suggested_location_id})"
+                    "STEP 3 (Recommendation) Complete. Category: %s, Location: %s (ID: %s)",
+                    category_code, suggested_location_name, suggested_location_id
                 )
                 return True
             else:
-                state.status = "recommendation_failed"
+                state.status = PipelineStatus.RECOMMENDATION_FAILED
                 error_msg = state.recommendation_result.get("error", "Unknown LLM error.")
-                logger.error(f"STEP 3 (Recommendation) Failed: {error_msg}")
+                logger.error("STEP 3 (Recommendation) Failed: %s", error_msg)
                 return False
                 
         except Exception as e:
-            state.status = "recommendation_failed"
+            state.status = PipelineStatus.RECOMMENDATION_FAILED
             state.error = f"Recommendation step failed: {str(e)}"
-            logger.error(f"STEP 3 (Recommendation) Failed: {e}", exc_info=True)
+            logger.error("STEP 3 (Recommendation) Failed: %s", e, exc_info=True)
             return False
     
-    async def step_embedding(self, state: PipelineState) -> bool:
+    async def step_embedding(self, state: PipelineState, text: Optional[str] = None) -> bool:
         """
         Step 3: Generate vector embedding for semantic search.
         
         :param state: Pipeline state to update.
+        :param text: Text to embed. Defaults to cleaned text, falling back to OCR text.
         :return: True if successful, False otherwise.
         """
         # Use cleaned text if available, otherwise fall back to OCR text
-        text_to_use = state.cleaned_text or (state.ocr_result.text if state.ocr_result else None)
+        text_to_use = text or state.cleaned_text or (state.ocr_result.text if state.ocr_result else None)
         
         if not text_to_use:
             logger.error("Cannot generate embedding without text.")
@@ -361,23 +485,36 @@ class IngestionPipeline:
         logger.info("STEP 3 (Embedding): Generating document vector embedding...")
         
         try:
-            state.embedding = await self.embedding_generator.generate(text_to_use)
-            
-            if state.embedding:
-                state.embedding_status = "success"
-                state.processing_steps.append("Embedding")
-                logger.info(f"STEP 3 (Embedding) Complete. Vector dimension: {len(state.embedding)}")
-                return True
-            else:
-                state.embedding_status = "failed"
-                state.error = "Embedding generation failed, returned empty vector."
-                logger.error("STEP 3 (Embedding) Failed: Empty vector returned.")
-                return False
+            async with self._emb_sem:
+                embedding = await self.embedding_generator.generate(text_to_use)
+            return self._apply_embedding(state, embedding)
                 
         except Exception as e:
             state.embedding_status = "failed"
             state.error = f"Embedding step failed: {str(e)}"
-            logger.error(f"STEP 3 (Embedding) Failed: {e}", exc_info=True)
+            logger.error("STEP 3 (Embedding) Failed: %s", e, exc_info=True)
+            return False
+    
+    def _apply_embedding(self, state: PipelineState, embedding: Optional[List[float]]) -> bool:
+        """
+        Store a generated embedding on the pipeline state.
+        
+        :param state: Pipeline state to update.
+        :param embedding: Embedding vector returned by the generator (empty on failure).
+        :return: True if the embedding is usable, False otherwise.
+        """
+        # Stored unit-length, so search scores it with a plain dot product
+        state.embedding = l2_normalize(embedding) if embedding else None
+        
+        if state.embedding is not None:
+            state.embedding_status = "success"
+            state.processing_steps += ("Embedding",)
+            logger.info("STEP 3 (Embedding) Complete. Vector dimension: %s", len(state.embedding))
+            return True
+        else:
+            state.embedding_status = "failed"
+            state.error = "Embedding generation failed, returned empty vector."
+            logger.error("STEP 3 (Embedding) Failed: Empty vector returned.")
             return False
     
     async def step_persist(self, state: PipelineState, is_error: bool = False) -> bool:
@@ -403,45 +540,81 @@ class IngestionPipeline:
             if is_error:
                 # Save to error directory with full context
                 error_info = {
-                    "status": state.status,
+                    "status": state.status.label,
                     "error": state.error,
                     "failed_step": self._get_failed_step(state),
                     "processing_steps": state.processing_steps
                 }
                 error_doc_id = save_error_document(document_data, error_info)
                 state.document_id = error_doc_id
-                logger.warning(f"⚠️  Failed document saved to error directory: {error_doc_id}")
-                logger.warning(f"    This document can be reviewed and retried later.")
+                logger.warning("⚠️  Failed document saved to error directory: %s", error_doc_id)
+                logger.warning("    This document can be reviewed and retried later.")
                 return True
             else:
-                # Save to normal storage (tmp folder) - this generates and returns a UUID string
-                # The save_document function will also save the image to images/ directory
-                local_doc_id = save_document(document_data)
-                logger.info(f"✓ Document saved to local storage: {local_doc_id}")
+                # The document ID was assigned with the state, so the local save (tmp folder, which
+                # also copies the image to images/) and the storage client call can run concurrently
+                local_doc_id = document_data["document_id"]
+                
+                # A duplicate (same owner, source file and text) is detected before anything is
+                # sent, so the storage client never receives an ID that local storage does not keep
+                existing_doc_id = await asyncio.to_thread(find_duplicate, document_data)
+                if existing_doc_id and existing_doc_id != local_doc_id:
+                    logger.info("✓ Duplicate of existing local document %s, not persisted again", existing_doc_id)
+                    state.document_id = existing_doc_id
+                    state.processing_steps += ("Persistence",)
+                    state.status = PipelineStatus.COMPLETED
+                    return True
                 
-                # Always use the local UUID as the document_id (local storage generates UUID strings)
-                # If remote storage returns an ID, we could use it, but for consistency, use local UUID
-                state.document_id = local_doc_id
+                # Local disk I/O runs in a worker thread alongside the remote persist (if available)
+                saved_doc_id, persisted_id = await asyncio.gather(
+                    asyncio.to_thread(save_document, document_data, local_doc_id),
+                    self.storage_client(document_data) if self.storage_client else asyncio.sleep(0)
+                )
+                if saved_doc_id != local_doc_id:
+                    # A concurrent save of the same content won the race; the storage client already
+                    # has this ID, so keep it rather than pointing the result at the other document
+                    logger.warning("Document %s duplicates %s, saved concurrently; kept out of local storage", local_doc_id, saved_doc_id)
+                else:
+                    logger.info("✓ Document saved to local storage: %s", local_doc_id)
                 
-                # Also persist using storage client (if available)
-                persisted_id = None
-                if self.storage_client:
-                    # Update document_data with the new document_id before sending to storage client
-                    document_data["document_id"] = local_doc_id
-                    persisted_id = await self.storage_client(document_data)
-                    # Note: We keep using local_doc_id (UUID string) even if persisted_id is returned
-                    # This ensures consistency with the saved document file
-                state.processing_steps.append("Persistence")
-                state.status = "completed"
-                logger.info(f"STEP 4 (Persistence) Complete. Local Document ID: {local_doc_id}, Remote ID: {persisted_id}")
+                # The state's document_id is kept even if the storage client returns its own ID,
+                # for consistency with the saved document file
+                state.processing_steps += ("Persistence",)
+                state.status = PipelineStatus.COMPLETED
+                logger.info("STEP 4 (Persistence) Complete. Local Document ID: %s, Remote ID: %s", local_doc_id, persisted_id)
                 return True
                 
         except Exception as e:
-            state.status = "persistence_failed"
+            state.status = PipelineStatus.PERSISTENCE_FAILED
             state.error = f"Persistence step failed: {str(e)}"
-            logger.error(f"STEP 4 (Persistence) Failed: {e}", exc_info=True)
+            logger.error("STEP 4 (Persistence) Failed: %s", e, exc_info=True)
             return False
     
+    async def _clean_then_recommend(self, state: PipelineState) -> bool:
+        """
+        Run cleaning followed by recommendation, which needs the cleaned text.
+        
+        :param state: Pipeline state to update.
+        :return: Result of the recommendation step.
+        """
+        await self.step_cleaning(state)
+        return await self.step_recommendation(state)
+    
+    @staticmethod
+    def _log_task_errors(eg: BaseExceptionGroup, label: str) -> str:
+        """
+        Log every exception of a failed TaskGroup.
+        Runs in its own frame, so no exception (with its traceback and the frames holding
+        the pipeline state) stays referenced from the caller's locals.
+        
+        :param eg: Exception group raised by the TaskGroup.
+        :param label: Description of the failed tasks for the log message.
+        :return: Message of the first exception.
+        """
+        for exc in eg.exceptions:
+            logger.error("%s failed: %s", label, exc, exc_info=exc)
+        return str(eg.exceptions[0])
+    
     def _get_failed_step(self, state: PipelineState) -> str:
         """
         Determine which step failed based on pipeline state.
@@ -449,18 +622,7 @@ class IngestionPipeline:
         :param state: Pipeline state
         :return: Name of the failed step
         """
-        if state.status in ["failed", "ocr_failed"]:
-            return "OCR"
-        elif state.status == "cleaning_failed":
-            return "Cleaning"
-        elif state.status == "recommendation_failed":
-            return "Recommendation"
-        elif state.status == "embedding_failed":
-            return "Embedding"
-        elif state.status == "persistence_failed":
-            return "Persistence"
-        else:
-            return "Unknown"
+        return _FAILED_STEP_MAP.get(state.status, "Unknown")
     
     async def run(
         self,
@@ -475,7 +637,7 @@ class IngestionPipeline:
         
         :param image_url: URL or path of the file to process (image or PDF).
         :param owner_id: ID of the user who owns the document.
-        :param document_id: Optional existing document ID.
+        :param document_id: Optional existing document ID. A UUID is assigned if not provided.
         :param skip_persist: If True, skip the persistence step.
         :param file_type: Type of file ("image" or "pdf"), auto-detected if not provided.
         :return: Dictionary containing the processed document data.
@@ -493,7 +655,7 @@ class IngestionPipeline:
             file_type=file_type
         )
         
-        logger.info(f"Pipeline started for document_id={document_id}, processing {file_type} from: {image_url}")
+        logger.info("Pipeline started for document_id=%s, processing %s from: %s", state.document_id, file_type, image_url)
         
         # Step 1: OCR
         if not await self.step_ocr(state):
@@ -503,52 +665,276 @@ class IngestionPipeline:
         # Enhances understanding with multimodal AI - can see photos, logos, charts beyond OCR
         await self.step_vision_enhancement(state)
         
-        # Step 2: Cleaning (after OCR+Vision, before recommendation/embedding)
-        await self.step_cleaning(state)
+        # Steps 2-3: Cleaning -> Recommendation chain, in parallel with Embedding
+        # Embedding starts right away on the OCR text instead of waiting for cleaning;
+        # only recommendation depends on the cleaned text.
+        logger.info("STEP 2-3: Running Cleaning -> Recommendation in parallel with Embedding...")
         
-        # Step 3: Recommendation and Embedding (run in parallel)
-        logger.info("STEP 3: Running Recommendation and Embedding in parallel...")
+        # Steps handle their own errors; anything escaping them is unexpected and surfaced here
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._clean_then_recommend(state))
+                tg.create_task(self.step_embedding(state, text=state.ocr_result.text))
+        except* Exception as eg:
+            first_error = self._log_task_errors(eg, "STEP 2-3 task")
+            state.error = state.error or f"Parallel step failed: {first_error}"
         
-        # Run recommendation and embedding concurrently
-        recommendation_task = asyncio.create_task(self.step_recommendation(state))
-        embedding_task = asyncio.create_task(self.step_embedding(state))
+        logger.info("STEP 3: Recommendation and Embedding completed (parallel execution)")
         
-        # Wait for both to complete (they can fail independently)
-        recommendation_result, embedding_result = await asyncio.gather(
-            recommendation_task,
-            embedding_task,
-            return_exceptions=True
-        )
+        # Step 4: Persistence
+        if not skip_persist:
+            await self._persist_result(state)
         
-        # Log results
-        if isinstance(recommendation_result, Exception):
-            logger.error(f"Recommendation task failed: {recommendation_result}")
-        if isinstance(embedding_result, Exception):
-            logger.error(f"Embedding task failed: {embedding_result}")
+        logger.info("Pipeline completed with status: %s", state.status.label)
+        return state.to_output_dict()
+    
+    async def _persist_result(self, state: PipelineState) -> bool:
+        """
+        Step 4 dispatch: persist normally, or to the error directory if a critical step failed.
         
-        logger.info("STEP 3: Recommendation and Embedding completed (parallel execution)")
+        :param state: Pipeline state to persist.
+        :return: Result of the persistence step.
+        """
+        # Check if pipeline failed at any critical step
+        if state.status in _CRITICAL_FAILURES:
+            logger.error("Pipeline failed with status: %s", state.status.label)
+            logger.warning("Saving to error directory for debugging and potential retry...")
+            # Save to error directory
+            return await self.step_persist(state, is_error=True)
+        
+        # Normal persistence
+        return await self.step_persist(state, is_error=False)
+    
+    async def run_batch(
+        self,
+        items: List[Tuple[str, int, Optional[Union[int, str]], Optional[str]]],
+        skip_persist: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute the ingestion pipeline for several documents at once.
         
-        # Step 4: Persistence
+        OCR (and vision) runs concurrently across the batch, all OCR texts are embedded
+        with a single batch call, and cleaning -> recommendation runs per document
+        alongside it (bounded by the recommendation semaphore).
+        
+        :param items: List of (image_url, owner_id, document_id, file_type) tuples. document_id and
+                      file_type may be None to assign a UUID / auto-detect the type, as in run.
+        :param skip_persist: If True, skip the persistence step.
+        :return: List of output dictionaries, in input order.
+        """
+        from app.modules.ocr import detect_file_type
+        
+        states = [
+            PipelineState(
+                image_url=image_url,
+                owner_id=owner_id,
+                document_id=document_id,
+                file_type=file_type or detect_file_type(image_url)
+            )
+            for image_url, owner_id, document_id, file_type in items
+        ]
+        
+        logger.info("Batch pipeline started for %s documents", len(states))
+        
+        # Step 1/1B: OCR and vision, concurrently across the batch
+        ocr_sem = asyncio.Semaphore(self.BATCH_OCR_CONCURRENCY)
+        
+        async def ocr(state: PipelineState) -> bool:
+            async with ocr_sem:
+                if not await self.step_ocr(state):
+                    return False
+                await self.step_vision_enhancement(state)
+                return True
+        
+        ocr_ok = await asyncio.gather(*[ocr(state) for state in states])
+        active = [state for state, ok in zip(states, ocr_ok) if ok]
+        
+        # Step 3 (Embedding): one batch call for every document that passed OCR
+        async def embed_all() -> None:
+            logger.info("STEP 3 (Embedding): Generating %s document embeddings in one batch...", len(active))
+            try:
+                async with self._emb_sem:
+                    embeddings = await self.embedding_generator.generate_batch(
+                        [state.ocr_result.text for state in active]
+                    )
+            except Exception as e:
+                logger.error("STEP 3 (Embedding) Batch failed: %s", e, exc_info=True)
+                embeddings = [[] for _ in active]
+            for state, embedding in zip(active, embeddings):
+                self._apply_embedding(state, embedding)
+        
+        # Steps 2-3: per-document Cleaning -> Recommendation, in parallel with the embedding batch
+        if active:
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(embed_all())
+                    for state in active:
+                        tg.create_task(self._clean_then_recommend(state))
+            except* Exception as eg:
+                self._log_task_errors(eg, "STEP 2-3 batch task")
+        
+        # Step 4: Persistence (this batch's local index entries are written in one transaction at the end)
         if not skip_persist:
-            # Check if pipeline failed at any critical step
-            is_failed = state.status in [
-                "failed",              # OCR failed
-                "ocr_failed",          # OCR failed explicitly
-                "recommendation_failed",  # Recommendation failed
-                "embedding_failed"     # Embedding failed (optional but tracked)
-            ]
+            with bulk_insert():
+                for state in active:
+                    await self._persist_result(state)
+        
+        logger.info("Batch pipeline completed: %s/%s completed", sum(1 for s in states if s.status == PipelineStatus.COMPLETED), len(states))
+        return [state.to_output_dict() for state in states]
+    
+    async def run_stream(
+        self,
+        items: Union[Iterable[Tuple[str, int]], AsyncIterable[Tuple[str, int]]],
+        skip_persist: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the ingestion pipeline over a stream of documents.
+        
+        Stages (OCR -> Cleaning -> Embedding -> Recommendation -> Persistence) run as worker
+        pools connected by bounded queues, so different documents occupy different stages
+        at the same time. Full queues throttle the source, and the embedding stage embeds
+        up to STREAM_EMBED_BATCH_SIZE queued documents per call.
+        
+        :param items: Iterable or async iterable of (image_url, owner_id) pairs.
+        :param skip_persist: If True, skip the persistence step.
+        :return: Async iterator of output dictionaries, in completion order.
+        """
+        from app.modules.ocr import detect_file_type
+        
+        ocr_q, clean_q, embed_q, rec_q, persist_q, done_q = (
+            asyncio.Queue(maxsize=self.STREAM_QUEUE_SIZE) for _ in range(6)
+        )
+        
+        async def produce() -> None:
+            try:
+                if hasattr(items, "__aiter__"):
+                    async for image_url, owner_id in items:
+                        await ocr_q.put(PipelineState(image_url=image_url, owner_id=owner_id, file_type=detect_file_type(image_url)))
+                else:
+                    for image_url, owner_id in items:
+                        await ocr_q.put(PipelineState(image_url=image_url, owner_id=owner_id, file_type=detect_file_type(image_url)))
+            finally:
+                await ocr_q.put(_STREAM_END)
+        
+        async def ocr(state: PipelineState) -> bool:
+            # Documents failing OCR skip the remaining stages, as in run()
+            if not await self.step_ocr(state):
+                return False
+            await self.step_vision_enhancement(state)
+            return True
+        
+        async def cleaning(state: PipelineState) -> bool:
+            await self.step_cleaning(state)
+            return True
+        
+        async def recommendation(state: PipelineState) -> bool:
+            await self.step_recommendation(state)
+            return True
+        
+        async def persistence(state: PipelineState) -> bool:
+            if not skip_persist:
+                await self._persist_result(state)
+            return True
+        
+        producer = asyncio.create_task(produce())
+        stages = [
+            asyncio.create_task(self._run_stage(ocr_q, clean_q, done_q, ocr, self.STREAM_WORKERS["ocr"])),
+            asyncio.create_task(self._run_stage(clean_q, embed_q, done_q, cleaning, self.STREAM_WORKERS["cleaning"])),
+            asyncio.create_task(self._run_embedding_stage(embed_q, rec_q)),
+            asyncio.create_task(self._run_stage(rec_q, persist_q, done_q, recommendation, self.STREAM_WORKERS["recommendation"])),
+            asyncio.create_task(self._run_stage(persist_q, done_q, done_q, persistence, self.STREAM_WORKERS["persistence"])),
+        ]
+        
+        logger.info("Stream pipeline started")
+        try:
+            while (state := await done_q.get()) is not _STREAM_END:
+                yield state.to_output_dict()
+            # Surface errors raised by the source iterator
+            await producer
+        finally:
+            for task in (producer, *stages):
+                task.cancel()
+        logger.info("Stream pipeline completed")
+    
+    async def _run_stage(
+        self,
+        in_q: asyncio.Queue,
+        out_q: asyncio.Queue,
+        done_q: asyncio.Queue,
+        handler: Callable[[PipelineState], Awaitable[bool]],
+        workers: int
+    ) -> None:
+        """
+        Run one run_stream stage with a pool of workers.
+        
+        :param in_q: Queue of states to process.
+        :param out_q: Queue for the next stage.
+        :param done_q: Output queue, for states whose handler returned False.
+        :param handler: Stage function; returns whether the state continues to the next stage.
+        :param workers: Number of concurrent workers.
+        """
+        async def worker() -> None:
+            while (state := await in_q.get()) is not _STREAM_END:
+                try:
+                    ok = await handler(state)
+                except Exception as e:
+                    logger.error("Stream stage failed for %s: %s", state.image_url, e, exc_info=True)
+                    state.error = state.error or f"Stream stage failed: {str(e)}"
+                    ok = False
+                await (out_q if ok else done_q).put(state)
+            # Hand the end marker on to sibling workers
+            await in_q.put(_STREAM_END)
+        
+        await asyncio.gather(*[worker() for _ in range(workers)])
+        await out_q.put(_STREAM_END)
+    
+    async def _run_embedding_stage(self, in_q: asyncio.Queue, out_q: asyncio.Queue) -> None:
+        """
+        Run the run_stream embedding stage: collect queued states into batches of up to
+        STREAM_EMBED_BATCH_SIZE, waiting at most STREAM_EMBED_WAIT for more, and embed each
+        batch with one call.
+        
+        :param in_q: Queue of cleaned states.
+        :param out_q: Queue for the recommendation stage.
+        """
+        loop = asyncio.get_running_loop()
+        finished = False
+        
+        while not finished:
+            state = await in_q.get()
+            if state is _STREAM_END:
+                break
             
-            if is_failed:
-                logger.error(f"Pipeline failed with status: {state.status}")
-                logger.warning("Saving to error directory for debugging and potential retry...")
-                # Save to error directory
-                await self.step_persist(state, is_error=True)
-            else:
-                # Normal persistence
-                await self.step_persist(state, is_error=False)
+            batch = [state]
+            deadline = loop.time() + self.STREAM_EMBED_WAIT
+            while len(batch) < self.STREAM_EMBED_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    state = await asyncio.wait_for(in_q.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if state is _STREAM_END:
+                    finished = True
+                    break
+                batch.append(state)
+            
+            logger.info("STEP 3 (Embedding): Generating %s streamed document embeddings in one batch...", len(batch))
+            try:
+                async with self._emb_sem:
+                    embeddings = await self.embedding_generator.generate_batch(
+                        [state.ocr_result.text for state in batch]
+                    )
+            except Exception as e:
+                logger.error("STEP 3 (Embedding) Batch failed: %s", e, exc_info=True)
+                embeddings = [[] for _ in batch]
+            
+            for state, embedding in zip(batch, embeddings):
+                self._apply_embedding(state, embedding)
+                await out_q.put(state)
         
-        logger.info(f"Pipeline completed with status: {state.status}")
-        return state.to_output_dict()
+        await out_q.put(_STREAM_END)
 
 
 # Default pipeline instance for backward compatibility
@@ -572,3 +958,16 @@ async def run_ingestion_pipeline(
     :return: Dictionary containing the processed document data.
     """
     return await _default_pipeline.run(image_url, owner_id, document_id, file_type=file_type)
+
+
+async def run_ingestion_batch(
+    items: List[Tuple[str, int, Optional[Union[int, str]], Optional[str]]]
+) -> List[Dict[str, Any]]:
+    """
+    Batch variant of run_ingestion_pipeline.
+    Uses the default IngestionPipeline instance.
+    
+    :param items: List of (image_url, owner_id, document_id, file_type) tuples.
+    :return: List of dictionaries containing the processed document data, in input order.
+    """
+    return await _default_pipeline.run_batch(items)
@@ -1,17 +1,20 @@
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Union, Tuple
 import logging
 from dataclasses import dataclass, field
 
+import numpy as np
+
 # Import module types
-from app.modules.query_processor import QueryProcessor, normalize_query
-from app.modules.embedding import EmbeddingGenerator
-from app.modules.search_engine import SearchEngine, run_similarity_search
-from app.modules.assembler import ResultAssembler, assemble_search_results
+from app.modules.query_processor import QueryProcessor, normalize_query, get_default_processor
+from app.modules.embedding import EmbeddingGenerator, BatchedEmbedder, get_default_embedder
+from app.modules.search_engine import SearchEngine, run_similarity_search, get_default_engine
+from app.modules.assembler import ResultAssembler, assemble_search_results, get_default_assembler
+from app.storage.vector_codec import l2_normalize
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchPipelineState:
     """State container for search pipeline execution data."""
     query: str
@@ -20,12 +23,12 @@ class SearchPipelineState:
     
     # Processing results
     normalized_query: Optional[str] = None
-    query_embedding: Optional[List[float]] = None
+    query_embedding: Optional[np.ndarray] = None  # float32 vector
     similarity_results: List[Dict[str, Any]] = field(default_factory=list)
     assembled_results: List[Dict[str, Any]] = field(default_factory=list)
     
     # Pipeline metadata
-    processing_steps: list = field(default_factory=list)
+    processing_steps: Tuple[str, ...] = ()  # Immutable: steps extend it with +=
     status: str = "initialized"
     error: Optional[str] = None
 
@@ -44,23 +47,24 @@ class SearchPipeline:
     def __init__(
         self,
         query_processor: Optional[QueryProcessor] = None,
-        embedding_generator: Optional[EmbeddingGenerator] = None,
+        embedding_generator: Optional[Union[EmbeddingGenerator, BatchedEmbedder]] = None,
         search_engine: Optional[SearchEngine] = None,
         result_assembler: Optional[ResultAssembler] = None,
     ):
         """
         Initialize the search pipeline with module dependencies.
         
-        :param query_processor: QueryProcessor instance for query normalization. Defaults to new QueryProcessor().
-        :param embedding_generator: EmbeddingGenerator instance. Defaults to new EmbeddingGenerator().
-        :param search_engine: SearchEngine instance. Defaults to new SearchEngine().
-        :param result_assembler: ResultAssembler instance. Defaults to new ResultAssembler().
+        :param query_processor: QueryProcessor instance for query normalization. Defaults to the shared QueryProcessor.
+        :param embedding_generator: EmbeddingGenerator instance. Defaults to the shared BatchedEmbedder, which coalesces concurrent calls.
+        :param search_engine: SearchEngine instance. Defaults to the shared SearchEngine.
+        :param result_assembler: ResultAssembler instance. Defaults to the shared ResultAssembler.
         """
-        # Set defaults for module dependencies
-        self.query_processor = query_processor or QueryProcessor()
-        self.embedding_generator = embedding_generator or EmbeddingGenerator()
-        self.search_engine = search_engine or SearchEngine()
-        self.result_assembler = result_assembler or ResultAssembler()
+        # Set defaults for module dependencies (process-wide instances, so extra
+        # pipelines do not duplicate embedder workers or search matrix caches)
+        self.query_processor = query_processor or get_default_processor()
+        self.embedding_generator = embedding_generator or get_default_embedder()
+        self.search_engine = search_engine or get_default_engine()
+        self.result_assembler = result_assembler or get_default_assembler()
         
         logger.info("SearchPipeline initialized with module dependencies")
     
@@ -71,7 +75,7 @@ class SearchPipeline:
         :param state: Pipeline state to update.
         :return: True if successful, False otherwise.
         """
-        logger.info(f"STEP 1 (Query Normalization): Processing query '{state.query}'")
+        logger.info("STEP 1 (Query Normalization): Processing query '%s'", state.query)
         
         try:
             state.normalized_query = self.query_processor.normalize(state.query)
@@ -82,15 +86,15 @@ class SearchPipeline:
                 logger.warning("Query normalization failed: empty result.")
                 return False
             
-            state.processing_steps.append("QueryNormalization")
-            logger.info(f"STEP 1 (Query Normalization) Complete. Normalized: '{state.normalized_query}'")
+            state.processing_steps += ("QueryNormalization",)
+            logger.info("STEP 1 (Query Normalization) Complete. Normalized: '%s'", state.normalized_query)
             state.status = "query_normalized"
             return True
             
         except Exception as e:
             state.status = "failed"
             state.error = f"Query normalization step failed: {str(e)}"
-            logger.error(f"STEP 1 (Query Normalization) Failed: {e}", exc_info=True)
+            logger.error("STEP 1 (Query Normalization) Failed: %s", e, exc_info=True)
             return False
     
     async def step_generate_embedding(self, state: SearchPipelineState) -> bool:
@@ -107,23 +111,25 @@ class SearchPipeline:
         logger.info("STEP 2 (Embedding): Generating query embedding...")
         
         try:
-            state.query_embedding = await self.embedding_generator.generate(state.normalized_query)
+            embedding = await self.embedding_generator.generate(state.normalized_query)
+            # Normalized once here; document vectors are stored unit-length
+            state.query_embedding = l2_normalize(embedding) if embedding else None
             
-            if not state.query_embedding:
+            if state.query_embedding is None:
                 state.status = "failed"
                 state.error = "Embedding generation failed, returned empty vector."
                 logger.error("STEP 2 (Embedding) Failed: Empty vector returned.")
                 return False
             
-            state.processing_steps.append("Embedding")
-            logger.info(f"STEP 2 (Embedding) Complete. Vector dimension: {len(state.query_embedding)}")
+            state.processing_steps += ("Embedding",)
+            logger.info("STEP 2 (Embedding) Complete. Vector dimension: %s", len(state.query_embedding))
             state.status = "embedding_generated"
             return True
             
         except Exception as e:
             state.status = "failed"
             state.error = f"Embedding step failed: {str(e)}"
-            logger.error(f"STEP 2 (Embedding) Failed: {e}", exc_info=True)
+            logger.error("STEP 2 (Embedding) Failed: %s", e, exc_info=True)
             return False
     
     async def step_similarity_search(self, state: SearchPipelineState) -> bool:
@@ -133,7 +139,7 @@ class SearchPipeline:
         :param state: Pipeline state to update.
         :return: True if successful, False otherwise.
         """
-        if not state.query_embedding:
+        if state.query_embedding is None:
             logger.error("Cannot perform similarity search without query embedding.")
             return False
         
@@ -147,21 +153,21 @@ class SearchPipeline:
                 min_score=0.0  # No minimum threshold for now
             )
             
-            state.processing_steps.append("SimilaritySearch")
+            state.processing_steps += ("SimilaritySearch",)
             
             if not state.similarity_results:
                 logger.warning("STEP 3 (Similarity Search) found no results")
                 state.status = "no_results"
                 return True  # This is not a failure, just no results
             else:
-                logger.info(f"STEP 3 (Similarity Search) Complete. Found {len(state.similarity_results)} results")
+                logger.info("STEP 3 (Similarity Search) Complete. Found %s results", len(state.similarity_results))
                 state.status = "search_completed"
                 return True
                 
         except Exception as e:
             state.status = "failed"
             state.error = f"Similarity search step failed: {str(e)}"
-            logger.error(f"STEP 3 (Similarity Search) Failed: {e}", exc_info=True)
+            logger.error("STEP 3 (Similarity Search) Failed: %s", e, exc_info=True)
             return False
     
     async def step_assemble_results(self, state: SearchPipelineState) -> bool:
@@ -187,15 +193,15 @@ class SearchPipeline:
             # Results are already sorted by score from search_engine
             # Additional ranking can be applied here if needed
             
-            state.processing_steps.append("ResultAssembly")
+            state.processing_steps += ("ResultAssembly",)
             state.status = "completed"
-            logger.info(f"STEP 4 (Result Assembly) Complete. Assembled {len(state.assembled_results)} results")
+            logger.info("STEP 4 (Result Assembly) Complete. Assembled %s results", len(state.assembled_results))
             return True
             
         except Exception as e:
             state.status = "failed"
             state.error = f"Result assembly step failed: {str(e)}"
-            logger.error(f"STEP 4 (Result Assembly) Failed: {e}", exc_info=True)
+            logger.error("STEP 4 (Result Assembly) Failed: %s", e, exc_info=True)
             return False
     
     async def run(
@@ -219,7 +225,7 @@ class SearchPipeline:
             top_k=top_k
         )
         
-        logger.info(f"Search pipeline started: query='{query}', owner_id={owner_id}, top_k={top_k}")
+        logger.info("Search pipeline started: query='%s', owner_id=%s, top_k=%s", query, owner_id, top_k)
         
         # Execute pipeline steps in sequence
         if not await self.step_normalize_query(state):
@@ -233,7 +239,7 @@ class SearchPipeline:
         
         await self.step_assemble_results(state)
         
-        logger.info(f"Search pipeline completed. Status: {state.status}, Results: {len(state.assembled_results)}")
+        logger.info("Search pipeline completed. Status: %s, Results: %s", state.status, len(state.assembled_results))
         return state.assembled_results
 
 
@@ -6,14 +6,22 @@ from app.storage.local_storage import (
     save_document, 
     get_document, 
     get_embedding,
-    get_all_embeddings
+    get_all_embeddings,
+    get_all_embeddings_soa,
+    load_embedding_matrix
 )
+from app.storage.embedding_cache import EmbeddingCache
+from app.storage.recommendation_cache import RecommendationCache
 
 __all__ = [
     "LocalStorage", 
     "save_document", 
     "get_document", 
     "get_embedding",
-    "get_all_embeddings"
+    "get_all_embeddings",
+    "get_all_embeddings_soa",
+    "load_embedding_matrix",
+    "EmbeddingCache",
+    "RecommendationCache"
 ]
 
@@ -0,0 +1,124 @@
+"""
+Persistent embedding cache keyed by a hash of (model, task type, text).
+Stored in a local SQLite file so repeated texts skip the embedding API across restarts.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default cache location, next to the local storage data
+CACHE_FILE = Path(__file__).parent.parent.parent / "tmp" / "embedding_cache.sqlite"
+
+
+class EmbeddingCache:
+    """
+    Key-value cache mapping text hashes to float32 embedding vectors.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        """
+        Initialize the embedding cache.
+
+        :param cache_file: Path to the SQLite cache file. Defaults to project_root/tmp/embedding_cache.sqlite
+        """
+        self.cache_file = cache_file or CACHE_FILE
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, task_type: str, text: str) -> str:
+        """
+        Build the cache key for a text.
+
+        :param model_name: Embedding model name
+        :param task_type: Embedding task type (vectors differ per task type)
+        :param text: Text being embedded
+        :return: Hex digest identifying the (model, task type, text) triple
+        """
+        data = f"{model_name}\0{task_type}\0{text.strip()}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding.
+
+        :param key: Cache key from make_key
+        :return: Embedding vector, or None on miss
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up several cached embeddings in one query.
+
+        :param keys: Cache keys from make_key
+        :return: Dictionary of key -> embedding vector for the keys that were found
+        """
+        if not keys:
+            return {}
+
+        placeholders = ",".join("?" * len(keys))
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Embedding cache lookup failed: {e}")
+            return {}
+
+        return {key: np.frombuffer(vector, dtype=np.float32).tolist() for key, vector in rows}
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        """
+        Store an embedding.
+
+        :param key: Cache key from make_key
+        :param embedding: Embedding vector
+        """
+        self.put_many({key: embedding})
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        Store several embeddings in one transaction. Empty vectors are not cached.
+
+        :param items: Dictionary of key -> embedding vector
+        """
+        rows = [
+            (key, np.asarray(embedding, dtype=np.float32).tobytes())
+            for key, embedding in items.items()
+            if embedding
+        ]
+        if not rows:
+            return
+
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+        except sqlite3.Error as e:
+            logger.error(f"Embedding cache write failed: {e}")
+
+
+# Default instance shared by embedding generators
+_default_cache: Optional[EmbeddingCache] = None
+
+
+def get_default_cache() -> EmbeddingCache:
+    """Get default embedding cache instance"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = EmbeddingCache()
+    return _default_cache
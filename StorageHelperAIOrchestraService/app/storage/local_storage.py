@@ -2,14 +2,28 @@
 Local file-based storage for documents, embeddings, and metadata.
 Used as a simple temporary database for development and testing.
 """
-import json
+import hashlib
+import mmap
 import os
+import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterator
 from datetime import datetime
 import logging
 import uuid
 
+import numpy as np
+import orjson
+import zstandard as zstd
+
+from app.storage.vector_codec import embedding_from_document, l2_normalize, quantize_int8
+
 logger = logging.getLogger(__name__)
 
 # Default storage directory
@@ -19,21 +33,187 @@ EMBEDDINGS_DIR = STORAGE_DIR / "embeddings"  # Separate directory for embeddings
 IMAGES_DIR = STORAGE_DIR / "images"  # Directory for storing document images
 PDFS_DIR = STORAGE_DIR / "pdfs"  # Directory for storing PDF files
 ERROR_DIR = STORAGE_DIR / "error"  # Directory for failed ingestion documents
-INDEX_FILE = STORAGE_DIR / "index.json"
+INDEX_FILE = STORAGE_DIR / "index.json"  # Legacy document index; still holds location_mappings
+INDEX_DB_FILE = STORAGE_DIR / "index.sqlite"
+
+# Index mutations are appended to SQLite's write-ahead log; it is folded back into the database
+# once it reaches this many pages (~16 MB at 4 KB pages), keeping bulk ingests to sequential appends
+INDEX_WAL_AUTOCHECKPOINT = 4000
+
+# Per-document embeddings: raw little-endian vector plus a small JSON sidecar.
+# EMBEDDING_PRECISION picks the stored element type (file suffix, numpy dtype); int8 files
+# start with the float32 scale of a symmetric quantization, followed by the int8 vector.
+EMBEDDING_PRECISIONS = {
+    "fp32": (".f32", "<f4"),
+    "fp16": (".f16", "<f2"),
+    "int8": (".i8", "i1"),
+}
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "fp32").lower()
+EMBEDDING_META_SUFFIX = ".meta.json"
+
+# Stacked embedding matrix: append-only unit-length float32 rows plus one JSON line per row
+# (matrices written before rows were normalized used other names and are rebuilt on first use)
+MATRIX_FILE_NAME = "matrix.unit.f32"
+MATRIX_META_FILE_NAME = "matrix.unit.meta.jsonl"
+MATRIX_DTYPE = np.float32
+
+# In-process LRU capacities for parsed documents and embedding vectors (0 disables a cache)
+DOC_CACHE_CAP = int(os.getenv("DOC_CACHE_CAP", "512"))
+EMB_CACHE_CAP = int(os.getenv("EMB_CACHE_CAP", "2048"))
+
+# Read size when streaming downloaded files to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Upper bound on threads reading document files concurrently in get_all_embeddings
+LOAD_WORKERS = 32
+
+# orjson serializes numpy arrays natively; non-str keys can appear in OCR page info
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Document files are zstd-compressed compact JSON; files ending in plain ".json" are read as-is
+DOCUMENT_FILE_SUFFIX = ".json.zst"
+ZSTD_SUFFIX = ".zst"
+ZSTD_LEVEL = 3
+
+# zstd contexts are not safe to share between threads, so each thread keeps its own pair
+_zstd_local = threading.local()
+
+
+def _zstd_contexts() -> Tuple[zstd.ZstdCompressor, zstd.ZstdDecompressor]:
+    """Get this thread's zstd compressor and decompressor."""
+    contexts = getattr(_zstd_local, "contexts", None)
+    if contexts is None:
+        contexts = _zstd_local.contexts = (zstd.ZstdCompressor(level=ZSTD_LEVEL), zstd.ZstdDecompressor())
+    return contexts
+
+
+def _read_json(path: Union[str, Path]) -> Any:
+    """Read a JSON file, decompressing it first if its name ends in .zst."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if os.fspath(path).endswith(ZSTD_SUFFIX):
+        data = _zstd_contexts()[1].decompress(data)
+    return orjson.loads(data)
+
+
+# Parsed JSON files keyed by path, reused while the file's mtime and size are unchanged
+_json_cache: Dict[Path, Tuple[int, int, Any]] = {}
+_json_cache_lock = threading.Lock()
+
+
+def read_json_cached(path: Path) -> Any:
+    """
+    Read a JSON file, reusing the parsed result while the file is unchanged.
+    The returned object is shared between callers and must not be mutated.
+    """
+    stat = os.stat(path)
+    with _json_cache_lock:
+        cached = _json_cache.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+    
+    data = _read_json(path)
+    with _json_cache_lock:
+        _json_cache[path] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def _fast_copy(src: Path, dst: Path):
+    """
+    Copy file contents without round-tripping through userspace buffers where possible:
+    copy_file_range (reflink on filesystems that support it), then sendfile,
+    then a plain buffered copy. File metadata is not copied.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        remaining = os.fstat(src_fd).st_size
+        
+        for copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if copy is None:
+                continue
+            try:
+                while remaining > 0:
+                    if copy is os.sendfile:
+                        copied = os.sendfile(dst_fd, src_fd, None, remaining)
+                    else:
+                        copied = copy(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                # Unsupported for this pair of files; continue from the current offsets
+                continue
+        
+        shutil.copyfileobj(fsrc, fdst, length=1 << 20)
+
+
+def _unlink_quiet(path: Union[str, Path]) -> bool:
+    """Remove a file without a prior existence check. Returns False if it did not exist."""
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _atomic_write_bytes(path: Union[str, Path], data: bytes):
+    """
+    Write a file in one call to a temporary sibling, fsync it and os.replace it into place,
+    so a crash never leaves a truncated file behind.
+    """
+    tmp_path = f"{os.fspath(path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        _unlink_quiet(tmp_path)
+        raise
+
+
+def _write_json(path: Union[str, Path], data: Any, indent: bool = True):
+    """
+    Write a JSON file (UTF-8, non-ASCII kept as-is).
+    Paths ending in .zst are written compact and zstd-compressed, ignoring indent.
+    """
+    if os.fspath(path).endswith(ZSTD_SUFFIX):
+        payload = _zstd_contexts()[0].compress(orjson.dumps(data, option=JSON_OPTIONS))
+    else:
+        payload = orjson.dumps(data, option=JSON_OPTIONS | orjson.OPT_INDENT_2 if indent else JSON_OPTIONS)
+    _atomic_write_bytes(path, payload)
 
 
 class LocalStorage:
     """
     Simple file-based storage system for documents and embeddings.
-    Stores documents as JSON files and maintains an index for quick lookups.
+    Stores documents as JSON files and maintains a SQLite index for quick lookups.
     """
     
-    def __init__(self, storage_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        storage_dir: Optional[Path] = None,
+        doc_cache_cap: int = DOC_CACHE_CAP,
+        emb_cache_cap: int = EMB_CACHE_CAP,
+        embedding_precision: str = EMBEDDING_PRECISION,
+        open_index: bool = True
+    ):
         """
         Initialize local storage.
         
         :param storage_dir: Root directory for storage. Defaults to project_root/tmp
+        :param doc_cache_cap: Number of parsed documents kept in the in-process LRU cache
+        :param emb_cache_cap: Number of embedding vectors kept in the in-process LRU cache
+        :param embedding_precision: Element type of new embedding files ("fp32", "fp16" or "int8")
+        :param open_index: If False, skip opening (and migrating) the SQLite index. Only methods
+                           that work on document and embedding files directly may then be used.
         """
+        if embedding_precision not in EMBEDDING_PRECISIONS:
+            logger.warning(f"Unknown embedding precision {embedding_precision!r}, using fp32")
+            embedding_precision = "fp32"
+        self.embedding_precision = embedding_precision
         self.storage_dir = storage_dir or STORAGE_DIR
         self.documents_dir = self.storage_dir / "documents"
         self.embeddings_dir = self.storage_dir / "embeddings"  # Separate embeddings directory
@@ -41,6 +221,13 @@ class LocalStorage:
         self.pdfs_dir = self.storage_dir / "pdfs"  # Directory for storing PDF files
         self.error_dir = self.storage_dir / "error"  # Directory for failed documents
         self.index_file = self.storage_dir / "index.json"
+        self.index_db_file = self.storage_dir / "index.sqlite"
+        self.matrix_file = self.embeddings_dir / MATRIX_FILE_NAME
+        self.matrix_meta_file = self.embeddings_dir / MATRIX_META_FILE_NAME
+        
+        # Per-document file paths are joined as strings on hot paths instead of building Path objects
+        self._documents_dir_str = str(self.documents_dir)
+        self._embeddings_dir_str = str(self.embeddings_dir)
         
         # Create directories if they don't exist
         self.documents_dir.mkdir(parents=True, exist_ok=True)
@@ -49,78 +236,620 @@ class LocalStorage:
         self.pdfs_dir.mkdir(parents=True, exist_ok=True)
         self.error_dir.mkdir(parents=True, exist_ok=True)
         
+        # LRU caches for repeated get_document/get_embedding calls on the same IDs
+        self._cache_lock = threading.Lock()
+        self._doc_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._emb_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._doc_cache_cap = doc_cache_cap
+        self._emb_cache_cap = emb_cache_cap
+        self._cache_stats = {"doc_hits": 0, "doc_misses": 0, "emb_hits": 0, "emb_misses": 0}
+        
+        # Serializes appends to (and rebuilds of) the embedding matrix and its metadata file;
+        # reentrant because the first append rebuilds the matrix
+        self._matrix_lock = threading.RLock()
+        
         # Initialize index if it doesn't exist
-        self._ensure_index()
+        if open_index:
+            self._ensure_index()
+    
+    def _cache_get(self, cache: OrderedDict, key: str, kind: str) -> Any:
+        """Look up a cache entry, marking it most recently used and counting the hit or miss."""
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is None:
+                self._cache_stats[f"{kind}_misses"] += 1
+                return None
+            cache.move_to_end(key)
+            self._cache_stats[f"{kind}_hits"] += 1
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key: str, value: Any, capacity: int):
+        """Insert a cache entry, evicting the least recently used ones beyond capacity."""
+        if capacity <= 0:
+            return
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > capacity:
+                cache.popitem(last=False)
+    
+    def _invalidate_cache(self, doc_id: str):
+        """Drop a document's cached record and embedding after it is written or deleted."""
+        with self._cache_lock:
+            self._doc_cache.pop(doc_id, None)
+            self._emb_cache.pop(doc_id, None)
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters and current sizes of the document and embedding caches.
+        
+        :return: Dictionary of cache statistics
+        """
+        with self._cache_lock:
+            return {
+                **self._cache_stats,
+                "doc_cache_size": len(self._doc_cache),
+                "emb_cache_size": len(self._emb_cache),
+            }
     
     def _ensure_index(self):
-        """Ensure index file exists and is valid."""
+        """Open the SQLite document index, importing the legacy index.json entries once."""
+        self._index_lock = threading.Lock()
+        # Index entries collected by the bulk_insert() block open in the current context, if any
+        self._pending_entries: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar(
+            f"pending_index_entries_{id(self)}", default=None
+        )
+        self._index_conn = sqlite3.connect(str(self.index_db_file), check_same_thread=False)
+        self._index_conn.execute("PRAGMA journal_mode=WAL")
+        self._index_conn.execute("PRAGMA synchronous=NORMAL")
+        self._index_conn.execute(f"PRAGMA wal_autocheckpoint={INDEX_WAL_AUTOCHECKPOINT}")
+        self._index_conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id TEXT PRIMARY KEY, owner_id TEXT, created_at TEXT, has_embedding INTEGER NOT NULL, entry BLOB NOT NULL, "
+            "content_hash TEXT)"
+        )
+        # Indexes created before duplicate detection lack the content_hash column
+        columns = {row[1] for row in self._index_conn.execute("PRAGMA table_info(documents)")}
+        if "content_hash" not in columns:
+            self._index_conn.execute("ALTER TABLE documents ADD COLUMN content_hash TEXT")
+        self._index_conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_owner_id ON documents (owner_id)")
+        self._index_conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents (content_hash)")
+        self._index_conn.commit()
+        
+        self._migrate_legacy_index()
+    
+    def _migrate_legacy_index(self):
+        """
+        Move document entries from index.json into the SQLite index.
+        The migrated keys are removed from index.json, which keeps only the remaining data
+        (location mappings written by the recommendation module).
+        """
         if not self.index_file.exists():
-            self._write_index({})
-        else:
-            # Validate index file
-            try:
-                self._read_index()
-            except (json.JSONDecodeError, Exception) as e:
-                logger.warning(f"Index file corrupted, recreating: {e}")
-                self._write_index({})
+            return
+        
+        try:
+            legacy_index = _read_json(self.index_file)
+        except Exception as e:
+            logger.warning(f"Legacy index file unreadable, skipping migration: {e}")
+            return
+        
+        if not isinstance(legacy_index, dict) or "documents" not in legacy_index:
+            return
+        
+        entries = list((legacy_index.get("documents") or {}).values())
+        with self.bulk_insert():
+            for entry in entries:
+                self._index_document(entry)
+        
+        # Owner lists duplicate the global entries; drop them along with "documents"
+        owner_keys = {str(entry.get("owner_id")) for entry in entries}
+        remaining = {
+            key: value for key, value in legacy_index.items()
+            if key != "documents" and key not in owner_keys
+        }
+        _write_json(self.index_file, remaining)
+        self.compact_index()
+        
+        logger.info(f"Migrated {len(entries)} index entries from {self.index_file} to {self.index_db_file}")
+    
+    @contextmanager
+    def bulk_insert(self) -> Iterator["LocalStorage"]:
+        """
+        Collect the index entries of the save_document calls made in this block and write
+        them with one executemany in a single SQLite transaction when the outermost block exits.
+        
+        Collection is scoped to the current context (the running task and the worker threads
+        it starts with asyncio.to_thread), so saves made elsewhere meanwhile still commit
+        immediately. Collected entries become visible to index reads once they are written.
+        
+        Usage:
+            with storage.bulk_insert():
+                for document_data in documents:
+                    storage.save_document(document_data)
+        """
+        if self._pending_entries.get() is not None:
+            # Nested block: the outermost one writes the entries
+            yield self
+            return
+        
+        token = self._pending_entries.set([])
+        try:
+            yield self
+        finally:
+            self.flush()
+            self._pending_entries.reset(token)
+    
+    def flush(self):
+        """Write the index entries collected so far by the bulk_insert block open in the current context."""
+        pending = self._pending_entries.get()
+        if pending:
+            entries = pending[:]
+            del pending[:len(entries)]
+            self._index_documents(entries)
+    
+    def compact_index(self):
+        """
+        Fold the index's write-ahead log into the database file and truncate the log.
+        Runs automatically as the log grows; call after large imports to reclaim log space at once.
+        """
+        with self._index_lock:
+            self._index_conn.commit()
+            self._index_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def _index_document(self, entry: Dict[str, Any]):
+        """Insert or replace a document entry in the index, or collect it for an open bulk_insert block."""
+        pending = self._pending_entries.get()
+        if pending is not None:
+            pending.append(entry)
+            return
+        self._index_documents([entry])
+    
+    def _index_documents(self, entries: List[Dict[str, Any]]):
+        """Insert or replace document entries in the index in one transaction."""
+        if not entries:
+            return
+        with self._index_lock:
+            self._index_conn.executemany(
+                "INSERT OR REPLACE INTO documents (id, owner_id, created_at, has_embedding, entry, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        entry["id"],
+                        str(entry.get("owner_id")),
+                        entry.get("created_at"),
+                        1 if entry.get("has_embedding") else 0,
+                        orjson.dumps(entry, option=JSON_OPTIONS),
+                        entry.get("content_hash"),
+                    )
+                    for entry in entries
+                ]
+            )
+            self._index_conn.commit()
+    
+    def _unindex_document(self, doc_id: str) -> bool:
+        """Remove a document entry from the index (and any open bulk_insert block). Returns True if it was indexed."""
+        pending = self._pending_entries.get()
+        was_pending = False
+        if pending:
+            kept = [entry for entry in pending if entry["id"] != doc_id]
+            was_pending = len(kept) < len(pending)
+            pending[:] = kept
+        with self._index_lock:
+            cursor = self._index_conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            self._index_conn.commit()
+        return cursor.rowcount > 0 or was_pending
+    
+    def _index_entries(self, owner_id: Optional[int] = None, with_embedding: bool = False) -> List[Dict[str, Any]]:
+        """
+        Read index entries in insertion order.
+        
+        :param owner_id: Optional owner ID to filter by
+        :param with_embedding: If True, only return documents that have an embedding
+        :return: List of document index entries
+        """
+        query = "SELECT entry FROM documents"
+        conditions, params = [], []
+        if owner_id is not None:
+            conditions.append("owner_id = ?")
+            params.append(str(owner_id))
+        if with_embedding:
+            conditions.append("has_embedding = 1")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY rowid"
+        
+        with self._index_lock:
+            rows = self._index_conn.execute(query, params).fetchall()
+        return [orjson.loads(row[0]) for row in rows]
     
-    def _read_index(self) -> Dict[str, Any]:
-        """Read the index file."""
-        with open(self.index_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def _index_entry(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Read a single index entry, or None if the document is not indexed."""
+        with self._index_lock:
+            row = self._index_conn.execute("SELECT entry FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return orjson.loads(row[0]) if row else None
     
-    def _write_index(self, index: Dict[str, Any]):
-        """Write the index file."""
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(index, f, indent=2, ensure_ascii=False)
+    @staticmethod
+    def _source_digest(document_data: Dict[str, Any]) -> str:
+        """
+        Hash a document's source file bytes, or the source string itself when it is not
+        a local file (e.g. a URL, which is only downloaded while saving).
+        """
+        source = document_data.get("image_path") or document_data.get("pdf_path") or document_data.get("source")
+        if not source:
+            return ""
+        source_path = Path(str(source))
+        try:
+            if source_path.is_file():
+                with open(source_path, "rb") as f:
+                    return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+        except OSError as e:
+            logger.warning(f"Could not hash source file {source_path}: {e}")
+        return hashlib.blake2b(str(source).encode("utf-8"), digest_size=16).hexdigest()
     
-    def _save_embedding(self, doc_id: str, embedding: List[float], embedding_dimension: int) -> bool:
+    @classmethod
+    def _content_hash(cls, document_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Hash a document's owner, source file and whitespace-normalized extracted text for
+        duplicate detection. Documents without text (e.g. OCR found nothing) are never
+        treated as duplicates.
+        """
+        text = " ".join((document_data.get("extracted_text") or "").split())
+        if not text:
+            return None
+        data = f"{document_data.get('owner_id')}\0{cls._source_digest(document_data)}\0{text}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    
+    def find_duplicate(self, document_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the ID of a stored document that save_document would treat as a duplicate
+        of document_data (same owner, source file and extracted text), if any.
+        
+        :param document_data: Document data as passed to save_document
+        :return: Existing document ID, or None
+        """
+        content_hash = self._cached_content_hash(document_data)
+        return self._find_duplicate(content_hash) if content_hash else None
+    
+    def _cached_content_hash(self, document_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Content hash of document_data, stored in its "content_hash" key so find_duplicate
+        followed by save_document reads and hashes the source file only once.
+        """
+        if "content_hash" not in document_data:
+            document_data["content_hash"] = self._content_hash(document_data)
+        return document_data["content_hash"]
+    
+    def _find_duplicate(self, content_hash: str) -> Optional[str]:
+        """Return the ID of an indexed (or bulk_insert-collected) document with the given content hash, if any."""
+        for entry in self._pending_entries.get() or ():
+            if entry.get("content_hash") == content_hash:
+                return entry["id"]
+        with self._index_lock:
+            row = self._index_conn.execute(
+                "SELECT id FROM documents WHERE content_hash = ? LIMIT 1", (content_hash,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _indexed_ids(self) -> set:
+        """Return the IDs of all indexed documents."""
+        with self._index_lock:
+            rows = self._index_conn.execute("SELECT id FROM documents").fetchall()
+        return {row[0] for row in rows}
+    
+    def _save_embedding(
+        self,
+        doc_id: str,
+        embedding: Union[List[float], np.ndarray],
+        embedding_dimension: int,
+        owner_id: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """
         Save embedding separately from document.
+        The vector is also appended to the stacked embedding matrix used for search.
         
         :param doc_id: Document ID to associate with embedding
         :param embedding: Embedding vector
         :param embedding_dimension: Dimension of the embedding vector
+        :param owner_id: Owner ID, recorded in the matrix metadata for filtering
+        :param metadata: Document metadata returned alongside search hits
         :return: True if saved successfully
         """
-        if not embedding or embedding_dimension == 0:
+        if embedding is None or len(embedding) == 0 or embedding_dimension == 0:
             logger.warning(f"No embedding to save for document {doc_id}")
             return False
         
-        # Create embedding record (reference to document)
-        embedding_record = {
+        embedding_file = self._save_embedding_bin(doc_id, embedding, embedding_dimension)
+        logger.info(f"Embedding saved separately: {doc_id} -> {embedding_file}")
+        
+        self._append_to_matrix(doc_id, embedding, owner_id=owner_id, metadata=metadata)
+        return True
+    
+    def _save_embedding_bin(
+        self,
+        doc_id: str,
+        embedding: Union[List[float], np.ndarray],
+        embedding_dimension: int,
+        created_at: Optional[str] = None
+    ) -> Path:
+        """
+        Write an embedding as a raw vector file in the configured precision
+        ({doc_id}.f32, .f16 or .i8) plus a JSON sidecar ({doc_id}.meta.json) with the
+        document link, dimension, precision and creation time.
+        
+        :param doc_id: Document ID to associate with embedding
+        :param embedding: Embedding vector
+        :param embedding_dimension: Dimension of the embedding vector
+        :param created_at: Creation timestamp (ISO format). Defaults to now.
+        :return: Path of the vector file
+        """
+        suffix, dtype = EMBEDDING_PRECISIONS[self.embedding_precision]
+        embedding_file = f"{self._embeddings_dir_str}/{doc_id}{suffix}"
+        embedding_meta = {
             "document_id": doc_id,  # Link to document
-            "embedding": embedding,
             "dimension": embedding_dimension,
-            "created_at": datetime.now().isoformat()
+            "dtype": self.embedding_precision,
+            "created_at": created_at or datetime.now().isoformat()
         }
         
-        # Save embedding file (same ID as document for easy lookup)
-        embedding_file = self.embeddings_dir / f"{doc_id}.json"
-        with open(embedding_file, 'w', encoding='utf-8') as f:
-            json.dump(embedding_record, f, indent=2, ensure_ascii=False)
+        if self.embedding_precision == "int8":
+            quantized, scale = quantize_int8(embedding)
+            embedding_meta["scale"] = scale
+            _atomic_write_bytes(embedding_file, np.float32(scale).astype("<f4").tobytes() + quantized.tobytes())
+        else:
+            _atomic_write_bytes(embedding_file, np.asarray(embedding, dtype=dtype).tobytes())
+        
+        # A document keeps a single vector file; drop one left from another precision
+        for path in self._embedding_files(doc_id):
+            if path != embedding_file:
+                _unlink_quiet(path)
+        self._invalidate_cache(doc_id)
+        
+        _write_json(f"{self._embeddings_dir_str}/{doc_id}{EMBEDDING_META_SUFFIX}", embedding_meta, indent=False)
+        return embedding_file
+    
+    def _read_matrix_meta(self) -> List[Dict[str, Any]]:
+        """Read the per-row metadata of the embedding matrix."""
+        if not self.matrix_meta_file.exists():
+            return []
+        
+        rows = []
+        with open(self.matrix_meta_file, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    rows.append(orjson.loads(line))
+        return rows
+    
+    def _append_to_matrix(
+        self,
+        doc_id: str,
+        embedding: Union[List[float], np.ndarray],
+        owner_id: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Append one embedding row to the stacked matrix file. Rows are stored normalized,
+        so similarity search is a dot product.
+        
+        Each metadata line records the row it points at, so a row written without
+        its metadata line (e.g. after a crash) is simply never referenced.
+        
+        :param doc_id: Document ID of the row
+        :param embedding: Embedding vector
+        :param owner_id: Owner ID of the document
+        :param metadata: Document metadata to keep with the row
+        :return: True if the row was appended
+        """
+        vector = l2_normalize(embedding).astype(MATRIX_DTYPE, copy=False)
+        
+        # Saves run on worker threads: the row and its metadata line are appended as one unit
+        with self._matrix_lock:
+            # Seed the matrix with documents saved before it existed
+            if not self.matrix_meta_file.exists():
+                self.rebuild_embedding_matrix()
+            
+            # All rows share the dimension of the first row
+            dimension = vector.shape[0]
+            if self.matrix_meta_file.exists():
+                with open(self.matrix_meta_file, 'rb') as f:
+                    first_line = f.readline()
+                if first_line.strip():
+                    dimension = orjson.loads(first_line)["dim"]
+            if vector.shape[0] != dimension:
+                logger.warning(
+                    f"Embedding dimension {vector.shape[0]} does not match matrix dimension {dimension}, "
+                    f"not adding {doc_id} to the embedding matrix"
+                )
+                return False
+            
+            row_bytes = dimension * vector.itemsize
+            with open(self.matrix_file, 'ab') as f:
+                row = f.tell() // row_bytes
+                # Drop any partially written row before appending
+                f.truncate(row * row_bytes)
+                f.write(vector.tobytes())
+            
+            meta_row = {
+                "id": doc_id,
+                "row": row,
+                "dim": dimension,
+                "owner_id": owner_id,
+                "metadata": metadata or {},
+            }
+            with open(self.matrix_meta_file, 'ab') as f:
+                f.write(orjson.dumps(meta_row, option=JSON_OPTIONS) + b"\n")
         
-        logger.info(f"Embedding saved separately: {doc_id} -> {embedding_file}")
         return True
     
-    def _load_embedding(self, doc_id: str) -> Optional[Dict[str, Any]]:
+    def rebuild_embedding_matrix(self) -> int:
+        """
+        Rebuild the stacked embedding matrix from the per-document embedding files.
+        Drops rows of deleted documents and picks up documents saved before the matrix existed.
+        
+        :return: Number of rows written
+        """
+        with self._matrix_lock:
+            return self._rebuild_embedding_matrix()
+    
+    def _rebuild_embedding_matrix(self) -> int:
+        """Rebuild the embedding matrix files. Caller holds the matrix lock."""
+        # Write to temporary files and swap them in once complete
+        tmp_matrix = self.matrix_file.with_suffix(".f32.tmp")
+        tmp_meta = self.matrix_meta_file.with_suffix(".jsonl.tmp")
+        dimension = None
+        rows = 0
+        
+        with open(tmp_matrix, 'wb') as matrix_f, open(tmp_meta, 'wb') as meta_f:
+            for doc_info in self._index_entries(with_embedding=True):
+                doc_id = doc_info["id"]
+                embedding = self.get_embedding(doc_id)
+                if embedding is None or len(embedding) == 0:
+                    continue
+                
+                vector = l2_normalize(embedding).astype(MATRIX_DTYPE, copy=False)
+                if dimension is None:
+                    dimension = vector.shape[0]
+                if vector.shape[0] != dimension:
+                    logger.warning(f"Skipping {doc_id}: embedding dimension {vector.shape[0]} != {dimension}")
+                    continue
+                
+                document = self.get_document(doc_id, include_embedding=False) or {}
+                matrix_f.write(vector.tobytes())
+                meta_row = {
+                    "id": doc_id,
+                    "row": rows,
+                    "dim": dimension,
+                    "owner_id": doc_info.get("owner_id"),
+                    "metadata": document.get("metadata", {}),
+                }
+                meta_f.write(orjson.dumps(meta_row, option=JSON_OPTIONS) + b"\n")
+                rows += 1
+        
+        os.replace(tmp_matrix, self.matrix_file)
+        os.replace(tmp_meta, self.matrix_meta_file)
+        
+        logger.info(f"Embedding matrix rebuilt with {rows} rows")
+        return rows
+    
+    def load_embedding_matrix(self, owner_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """
+        Load the stacked embedding matrix for similarity search.
+        
+        The matrix file is memory-mapped, so vectors are read through the page cache
+        instead of being parsed into Python lists. Rows of deleted documents, and rows
+        superseded by a later save of the same document ID, are skipped.
+        
+        :param owner_id: Optional owner ID to filter by
+        :return: Tuple of (row metadata list, (N, D) float32 matrix of unit rows aligned with it)
+        """
+        # Under the lock, so no half-written metadata line is read
+        with self._matrix_lock:
+            if not self.matrix_meta_file.exists():
+                self.rebuild_embedding_matrix()
+            meta_rows = self._read_matrix_meta()
+        
+        if not meta_rows or not self.matrix_file.exists():
+            return [], np.empty((0, 0), dtype=MATRIX_DTYPE)
+        
+        dimension = meta_rows[0]["dim"]
+        total_rows = os.path.getsize(self.matrix_file) // (dimension * np.dtype(MATRIX_DTYPE).itemsize)
+        if total_rows == 0:
+            return [], np.empty((0, dimension), dtype=MATRIX_DTYPE)
+        
+        matrix = np.memmap(self.matrix_file, dtype=MATRIX_DTYPE, mode='r', shape=(total_rows, dimension))
+        
+        # Owner-filtered loads gather scattered rows, so read-ahead would mostly fetch unused pages
+        if owner_id is not None and hasattr(mmap, "MADV_RANDOM"):
+            matrix._mmap.madvise(mmap.MADV_RANDOM)
+        
+        live_documents = self._indexed_ids()
+        owner_key = str(owner_id) if owner_id is not None else None
+        
+        # A re-saved document appends a new row; only its last row is live
+        seen = set()
+        selected = []
+        for meta in reversed(meta_rows):
+            if meta["row"] >= total_rows or meta["id"] in seen:
+                continue
+            seen.add(meta["id"])
+            if meta["id"] in live_documents and (owner_key is None or str(meta.get("owner_id")) == owner_key):
+                selected.append(meta)
+        selected.reverse()
+        
+        # Avoid copying when every row is selected in order
+        if len(selected) == total_rows and all(meta["row"] == i for i, meta in enumerate(selected)):
+            return selected, matrix
+        
+        return selected, np.asarray(matrix[[meta["row"] for meta in selected]])
+    
+    def _document_files(self, doc_id: str) -> List[str]:
+        """Possible files of a document: compressed, then the uncompressed layout of older saves."""
+        return [
+            f"{self._documents_dir_str}/{doc_id}{DOCUMENT_FILE_SUFFIX}",
+            f"{self._documents_dir_str}/{doc_id}.json",
+        ]
+    
+    def _read_document_file(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Read a document file in either layout, or return None if there is none."""
+        for path in self._document_files(doc_id):
+            try:
+                return _read_json(path)
+            except FileNotFoundError:
+                continue
+        return None
+    
+    def _embedding_files(self, doc_id: str) -> List[str]:
+        """Candidate vector files of a document, the configured precision first."""
+        precisions = [self.embedding_precision] + [p for p in EMBEDDING_PRECISIONS if p != self.embedding_precision]
+        return [f"{self._embeddings_dir_str}/{doc_id}{EMBEDDING_PRECISIONS[p][0]}" for p in precisions]
+    
+    @staticmethod
+    def _read_embedding_file(path: str) -> np.ndarray:
+        """Read a raw vector file of any precision, dequantized to float32."""
+        if path.endswith(EMBEDDING_PRECISIONS["int8"][0]):
+            raw = np.fromfile(path, dtype=np.uint8)
+            scale = raw[:4].view("<f4")[0]
+            return raw[4:].view(np.int8).astype(np.float32) * scale
+        if path.endswith(EMBEDDING_PRECISIONS["fp16"][0]):
+            return np.fromfile(path, dtype="<f2").astype(np.float32)
+        return np.fromfile(path, dtype="<f4")
+    
+    def _load_embedding(self, doc_id: str) -> Optional[np.ndarray]:
         """
         Load embedding for a document.
+        Reads the raw vector file (dequantizing fp16/int8 to float32), falling back to the
+        legacy JSON embedding record. Loaded vectors are kept in the LRU cache and returned read-only.
         
         :param doc_id: Document ID
-        :return: Embedding record or None if not found
+        :return: float32 embedding vector or None if not found
         """
-        embedding_file = self.embeddings_dir / f"{doc_id}.json"
-        
-        if not embedding_file.exists():
-            return None
+        cached = self._cache_get(self._emb_cache, doc_id, "emb")
+        if cached is not None:
+            return cached
         
+        embedding = None
         try:
-            with open(embedding_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Open candidates directly and let a missing file raise, rather than stat first
+            for embedding_file in self._embedding_files(doc_id):
+                try:
+                    embedding = self._read_embedding_file(embedding_file)
+                    break
+                except FileNotFoundError:
+                    continue
+            else:
+                try:
+                    values = _read_json(f"{self._embeddings_dir_str}/{doc_id}.json").get("embedding")
+                    embedding = np.asarray(values, dtype=np.float32) if values else None
+                except FileNotFoundError:
+                    pass
         except Exception as e:
             logger.error(f"Error reading embedding for {doc_id}: {e}")
             return None
+        
+        if embedding is not None:
+            embedding.setflags(write=False)
+            self._cache_put(self._emb_cache, doc_id, embedding, self._emb_cache_cap)
+        return embedding
     
     def save_file(self, file_path: str, doc_id: str, file_type: str = "image") -> Optional[str]:
         """
@@ -132,7 +861,6 @@ class LocalStorage:
         :return: Path to the saved file, or None if saving failed
         """
         try:
-            import shutil
             import httpx
             
             source_path = Path(file_path)
@@ -162,20 +890,21 @@ class LocalStorage:
             
             # If source is a local file, copy it
             if source_path.exists() and source_path.is_file():
-                shutil.copy2(source_path, dest_path)
+                _fast_copy(source_path, dest_path)
                 logger.info(f"File copied from {source_path} to {dest_path}")
                 return str(dest_path)
-            # If source is a URL, download it synchronously
+            # If source is a URL, download it synchronously, streaming the body to disk in chunks
             elif file_path.startswith(('http://', 'https://')):
                 try:
-                    with httpx.Client(timeout=30.0) as client:
-                        response = client.get(file_path)
+                    with httpx.Client(timeout=30.0) as client, client.stream("GET", file_path) as response:
                         response.raise_for_status()
                         with open(dest_path, 'wb') as f:
-                            f.write(response.content)
+                            for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
                     logger.info(f"File downloaded from {file_path} to {dest_path}")
                     return str(dest_path)
                 except Exception as e:
+                    dest_path.unlink(missing_ok=True)  # Don't leave a partial download behind
                     logger.error(f"Failed to download file from URL {file_path}: {e}")
                     return None
             else:
@@ -196,20 +925,32 @@ class LocalStorage:
         """
         return self.save_file(image_path, doc_id, file_type="image")
     
-    def save_document(self, document_data: Dict[str, Any]) -> str:
+    def save_document(self, document_data: Dict[str, Any], doc_id: Optional[str] = None) -> str:
         """
         Save a document with its embedding and metadata to local storage.
         Embedding is saved separately in embeddings/ folder and linked via doc_id.
         
+        If the same owner already has a document with the same source file and extracted text,
+        nothing is written and the existing document's ID is returned instead.
+        
         :param document_data: Dictionary containing document data (text, embedding, metadata, etc.)
-        :return: Document ID (UUID string)
+        :param doc_id: Pre-generated document ID (UUID string). A new UUID is generated if not provided.
+        :return: Document ID (UUID string); differs from doc_id when a duplicate was found
         """
         # Generate unique document ID
-        doc_id = str(uuid.uuid4())
+        doc_id = doc_id or str(uuid.uuid4())
+        
+        # Skip all writes for content that is already stored
+        content_hash = self._cached_content_hash(document_data)
+        if content_hash:
+            existing_id = self._find_duplicate(content_hash)
+            if existing_id and existing_id != doc_id:
+                logger.info(f"Duplicate of document {existing_id}, not saving {doc_id}")
+                return existing_id
         
         # Extract embedding before saving document (to save separately)
-        embedding = document_data.get("embedding", [])
-        embedding_dimension = document_data.get("embedding_dimension", len(embedding) if embedding else 0)
+        embedding = embedding_from_document(document_data)
+        embedding_dimension = document_data.get("embedding_dimension", len(embedding) if embedding is not None else 0)
         
         # Detect file type from source
         source_path = document_data.get("source") or document_data.get("image_path")
@@ -233,12 +974,13 @@ class LocalStorage:
             "source": document_data.get("source"),  # Original source (URL or path)
             "file_type": file_type,  # "image" or "pdf"
             "file_path": saved_file_path,  # Path to saved file in images/ or pdfs/ directory
+            "file_ext": Path(saved_file_path).suffix if saved_file_path else None,  # Lets delete_document skip probing
             "image_path": saved_file_path if file_type == "image" else None,  # Backward compatibility
             "pdf_path": saved_file_path if file_type == "pdf" else None,
             "extracted_text": document_data.get("extracted_text", ""),
             "ocr_confidence": document_data.get("ocr_confidence"),
             # Note: embedding is NOT stored in document file, only reference via doc_id
-            "has_embedding": len(embedding) > 0,
+            "has_embedding": embedding is not None,
             "embedding_dimension": embedding_dimension,
             "recommendation_data": document_data.get("recommendation_data"),
             "recommendation_status": document_data.get("recommendation_status"),
@@ -249,19 +991,22 @@ class LocalStorage:
             }
         }
         
-        # Save document file (without embedding)
-        doc_file = self.documents_dir / f"{doc_id}.json"
-        with open(doc_file, 'w', encoding='utf-8') as f:
-            json.dump(document_record, f, indent=2, ensure_ascii=False)
+        # Save document file (without embedding), compressed
+        doc_file = self._document_files(doc_id)[0]
+        _write_json(doc_file, document_record)
+        self._invalidate_cache(doc_id)
         
         logger.info(f"Document saved: {doc_id} -> {doc_file}")
         
         # Save embedding separately if available
-        if embedding:
-            self._save_embedding(doc_id, embedding, embedding_dimension)
-        
-        # Update index
-        index = self._read_index()
+        if embedding is not None:
+            self._save_embedding(
+                doc_id,
+                embedding,
+                embedding_dimension,
+                owner_id=document_record["owner_id"],
+                metadata=document_record["metadata"]
+            )
         
         # Create index entry
         index_entry = {
@@ -269,6 +1014,9 @@ class LocalStorage:
             "owner_id": document_record["owner_id"],
             "created_at": document_record["created_at"],
             "has_embedding": document_record.get("has_embedding", False),
+            "file_type": file_type,
+            "file_ext": document_record["file_ext"],
+            "content_hash": content_hash,
             "text_preview": document_record["extracted_text"][:200] if document_record["extracted_text"] else "",
         }
         
@@ -278,20 +1026,8 @@ class LocalStorage:
             index_entry["suggested_location"] = rec_data.get("suggested_location")
             index_entry["suggested_tags"] = rec_data.get("suggested_tags", [])
         
-        # Store by owner_id for easy filtering
-        owner_id = str(document_record["owner_id"])
-        if owner_id not in index:
-            index[owner_id] = []
-        
-        index[owner_id].append(index_entry)
-        
-        # Also create a global index for quick lookup by doc_id
-        if "documents" not in index:
-            index["documents"] = {}
-        index["documents"][doc_id] = index_entry
-        
-        # Update index file
-        self._write_index(index)
+        # Update index (indexed by owner_id for filtering)
+        self._index_document(index_entry)
         
         return doc_id
     
@@ -355,8 +1091,7 @@ class LocalStorage:
         
         # Save error document file
         error_file = self.error_dir / f"{error_id}.json"
-        with open(error_file, 'w', encoding='utf-8') as f:
-            json.dump(error_record, f, indent=2, ensure_ascii=False)
+        _write_json(error_file, error_record)
         
         logger.warning(f"⚠️  Failed document saved to error directory: {error_id} -> {error_file}")
         logger.warning(f"    Error: {error_info.get('error', 'Unknown error')}")
@@ -396,45 +1131,43 @@ class LocalStorage:
     def get_document(self, doc_id: str, include_embedding: bool = False) -> Optional[Dict[str, Any]]:
         """
         Retrieve a document by ID.
+        Parsed records are kept in the LRU cache; each call returns a fresh top-level dict,
+        but nested values are shared with the cache and must not be mutated.
         
         :param doc_id: Document ID (UUID string)
         :param include_embedding: If True, load embedding from separate file and include in result
         :return: Document data dictionary or None if not found
         """
-        doc_file = self.documents_dir / f"{doc_id}.json"
-        
-        if not doc_file.exists():
-            logger.warning(f"Document not found: {doc_id}")
-            return None
+        document = self._cache_get(self._doc_cache, doc_id, "doc")
         
         try:
-            with open(doc_file, 'r', encoding='utf-8') as f:
-                document = json.load(f)
+            if document is None:
+                document = self._read_document_file(doc_id)
+                if document is None:
+                    logger.warning(f"Document not found: {doc_id}")
+                    return None
+                self._cache_put(self._doc_cache, doc_id, document, self._doc_cache_cap)
+            
+            document = dict(document)
             
             # Load embedding separately if requested
             if include_embedding:
-                embedding_record = self._load_embedding(doc_id)
-                if embedding_record:
-                    document["embedding"] = embedding_record.get("embedding", [])
-                else:
-                    document["embedding"] = []
+                embedding = self._load_embedding(doc_id)
+                document["embedding"] = embedding.tolist() if embedding is not None else []
             
             return document
         except Exception as e:
             logger.error(f"Error reading document {doc_id}: {e}")
             return None
     
-    def get_embedding(self, doc_id: str) -> Optional[List[float]]:
+    def get_embedding(self, doc_id: str) -> Optional[np.ndarray]:
         """
         Retrieve embedding for a document.
         
         :param doc_id: Document ID
-        :return: Embedding vector or None if not found
+        :return: float32 embedding vector or None if not found
         """
-        embedding_record = self._load_embedding(doc_id)
-        if embedding_record:
-            return embedding_record.get("embedding")
-        return None
+        return self._load_embedding(doc_id)
     
     def list_documents(self, owner_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -443,58 +1176,101 @@ class LocalStorage:
         :param owner_id: Optional owner ID to filter by
         :return: List of document index entries
         """
-        index = self._read_index()
-        
-        if owner_id is not None:
-            owner_key = str(owner_id)
-            return index.get(owner_key, [])
-        
-        # Return all documents from global index
-        return list(index.get("documents", {}).values())
+        return self._index_entries(owner_id=owner_id)
     
-    def get_all_embeddings(self, owner_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    def get_all_embeddings_soa(
+        self,
+        owner_id: Optional[int] = None,
+        include_full_text: bool = False
+    ) -> Tuple[List[str], List[str], np.ndarray, List[Dict[str, Any]]]:
         """
-        Get all documents with their embeddings for similarity search.
-        Embeddings are loaded from separate embedding files.
+        Get all documents with embeddings as parallel arrays for similarity search:
+        document IDs, texts, one (N, D) float32 matrix of unit-length embeddings, and
+        per-document info ({"metadata", "recommendation"}). Row i of the matrix belongs to ids[i].
+        
+        The matrix is the memory-mapped embedding matrix (or a gathered copy of its rows),
+        so no per-document embedding files are read and callers can compute E @ q directly.
+        
+        By default text and recommendation are projected from the index entry (text preview,
+        suggested location and tags) and metadata from the matrix row, so no document files
+        are read either. With include_full_text, document files are read on a thread pool
+        (file reads and orjson release the GIL) for the full text and recommendation data.
         
         :param owner_id: Optional owner ID to filter by
-        :return: List of documents with embeddings
+        :param include_full_text: If True, load each document file for its full extracted text
+        :return: Tuple of (ids, texts, embedding matrix, info)
         """
-        documents = []
+        ids: List[str] = []
+        texts: List[str] = []
+        info: List[Dict[str, Any]] = []
+        kept_rows: List[int] = []
         
-        if owner_id is not None:
-            # Get document IDs from owner index
-            index = self._read_index()
-            owner_key = str(owner_id)
-            owner_docs = index.get(owner_key, [])
-            doc_ids = [doc["id"] for doc in owner_docs if doc.get("has_embedding")]
+        rows, matrix = self.load_embedding_matrix(owner_id=owner_id)
+        if not rows:
+            return ids, texts, matrix, info
+        
+        if not include_full_text:
+            entries = {entry["id"]: entry for entry in self._index_entries(owner_id=owner_id, with_embedding=True)}
+            for i, meta in enumerate(rows):
+                entry = entries.get(meta["id"])
+                if entry is None:
+                    continue
+                
+                has_recommendation = "suggested_location" in entry or "suggested_tags" in entry
+                kept_rows.append(i)
+                ids.append(meta["id"])
+                texts.append(entry.get("text_preview", ""))
+                info.append({
+                    "metadata": meta.get("metadata", {}),
+                    "recommendation": {
+                        "suggested_location": entry.get("suggested_location"),
+                        "suggested_tags": entry.get("suggested_tags", []),
+                    } if has_recommendation else None,
+                })
         else:
-            # Get all document IDs with embeddings
-            index = self._read_index()
-            all_docs = index.get("documents", {})
-            doc_ids = [doc_id for doc_id, doc_info in all_docs.items() if doc_info.get("has_embedding")]
-        
-        # Load documents and embeddings separately
-        for doc_id in doc_ids:
-            # Load document (without embedding)
-            doc = self.get_document(doc_id, include_embedding=False)
-            if not doc:
-                continue
+            # Load documents (without embedding) for their text and recommendation; map keeps row order
+            doc_ids = [meta["id"] for meta in rows]
+            with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(doc_ids))) as executor:
+                loaded = list(executor.map(self.get_document, doc_ids))
             
-            # Load embedding from separate file
-            embedding = self.get_embedding(doc_id)
-            if not embedding:
-                continue  # Skip documents without embeddings
-            
-            documents.append({
-                "id": doc["id"],
-                "text": doc.get("extracted_text", ""),
-                "embedding": embedding,  # Loaded from separate file
-                "metadata": doc.get("metadata", {}),
-                "recommendation": doc.get("recommendation_data"),
-            })
+            for i, doc in enumerate(loaded):
+                if not doc:
+                    continue
+                
+                kept_rows.append(i)
+                ids.append(doc["id"])
+                texts.append(doc.get("extracted_text", ""))
+                info.append({
+                    "metadata": doc.get("metadata", {}),
+                    "recommendation": doc.get("recommendation_data"),
+                })
         
-        return documents
+        # Only gather (copy) rows when some documents were dropped
+        if len(kept_rows) != len(rows):
+            matrix = np.asarray(matrix[kept_rows])
+        
+        return ids, texts, matrix, info
+    
+    def get_all_embeddings(self, owner_id: Optional[int] = None, include_full_text: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all documents with their embeddings for similarity search, one dict per document.
+        Wrapper around get_all_embeddings_soa; each "embedding" is a row view of its matrix.
+        
+        :param owner_id: Optional owner ID to filter by
+        :param include_full_text: If True, load each document file for its full extracted text
+        :return: List of documents with embeddings
+        """
+        ids, texts, matrix, info = self.get_all_embeddings_soa(owner_id, include_full_text=include_full_text)
+        return [
+            {
+                "id": doc_id,
+                "text": text,
+                "embedding": embedding,  # Row of the embedding matrix
+                "metadata": doc_info["metadata"],
+                "recommendation": doc_info["recommendation"],
+            }
+            for doc_id, text, embedding, doc_info in zip(ids, texts, matrix, info)
+        ]
     
     def delete_document(self, doc_id: str) -> bool:
         """
@@ -503,58 +1279,48 @@ class LocalStorage:
         :param doc_id: Document ID to delete
         :return: True if deleted successfully, False otherwise
         """
-        doc_file = self.documents_dir / f"{doc_id}.json"
-        embedding_file = self.embeddings_dir / f"{doc_id}.json"
+        embedding_files = self._embedding_files(doc_id) + [
+            f"{self._embeddings_dir_str}/{doc_id}{EMBEDDING_META_SUFFIX}",
+            f"{self._embeddings_dir_str}/{doc_id}.json",  # Legacy JSON embedding
+        ]
         
-        if not doc_file.exists():
-            logger.warning(f"Document not found for deletion: {doc_id}")
+        try:
+            # The index entry records the saved file's type and extension; documents
+            # saved before those fields existed fall back to the path in the document file
+            entry = self._index_entry(doc_id) or {}
+            document = self._read_document_file(doc_id) if "file_ext" not in entry else None
+            if document is not None:
+                file_path = document.get("file_path") or document.get("image_path") or document.get("pdf_path")
+                entry = {
+                    "file_type": document.get("file_type", "image"),
+                    "file_ext": Path(file_path).suffix if file_path else None,
+                }
+            
+            # Remove document file (compressed, or uncompressed from older saves)
+            found = [_unlink_quiet(doc_file) for doc_file in self._document_files(doc_id)]
+            if not any(found):
+                logger.warning(f"Document not found for deletion: {doc_id}")
+                return False
+            self._invalidate_cache(doc_id)
+        except Exception as e:
+            logger.error(f"Error deleting document {doc_id}: {e}")
             return False
         
         try:
-            # Remove document file
-            doc_file.unlink()
-            
-            # Remove embedding file if exists
-            if embedding_file.exists():
-                embedding_file.unlink()
-                logger.info(f"Embedding deleted: {doc_id}")
-            
-            # Remove image/PDF file if exists (try common extensions)
-            image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff', '.tif']
-            pdf_extensions = ['.pdf']
+            # Remove embedding files if they exist
+            for path in embedding_files:
+                _unlink_quiet(path)
+            logger.info(f"Embedding files removed: {doc_id}")
             
-            # Try image files
-            for ext in image_extensions:
-                image_file = self.images_dir / f"{doc_id}{ext}"
-                if image_file.exists():
-                    image_file.unlink()
-                    logger.info(f"Image deleted: {doc_id}{ext}")
-                    break
-            
-            # Try PDF files
-            for ext in pdf_extensions:
-                pdf_file = self.pdfs_dir / f"{doc_id}{ext}"
-                if pdf_file.exists():
-                    pdf_file.unlink()
-                    logger.info(f"PDF deleted: {doc_id}{ext}")
-                    break
+            # Remove image/PDF file saved under the recorded extension
+            file_ext = entry.get("file_ext")
+            if file_ext:
+                target_dir = self.pdfs_dir if entry.get("file_type") == "pdf" else self.images_dir
+                _unlink_quiet(f"{target_dir}/{doc_id}{file_ext}")
+                logger.info(f"File deleted: {doc_id}{file_ext}")
             
             # Remove from index
-            index = self._read_index()
-            
-            # Remove from global index
-            if "documents" in index and doc_id in index["documents"]:
-                doc_entry = index["documents"][doc_id]
-                owner_id = str(doc_entry.get("owner_id"))
-                
-                # Remove from owner index
-                if owner_id in index:
-                    index[owner_id] = [d for d in index[owner_id] if d["id"] != doc_id]
-                
-                # Remove from global index
-                del index["documents"][doc_id]
-                
-                self._write_index(index)
+            self._unindex_document(doc_id)
             
             logger.info(f"Document deleted: {doc_id}")
             return True
@@ -564,31 +1330,66 @@ class LocalStorage:
             return False
 
 
-# Default instance for easy access
-_default_storage = LocalStorage()
+# Default instance for easy access, created on first use so importing this module
+# does not create the index files
+_default_storage: Optional[LocalStorage] = None
+_default_storage_lock = threading.Lock()
 
 
-def save_document(document_data: Dict[str, Any]) -> str:
+def get_default_storage() -> LocalStorage:
+    """Get default local storage instance"""
+    global _default_storage
+    if _default_storage is None:
+        with _default_storage_lock:
+            if _default_storage is None:
+                _default_storage = LocalStorage()
+    return _default_storage
+
+
+def save_document(document_data: Dict[str, Any], doc_id: Optional[str] = None) -> str:
     """Convenience function to save document using default storage."""
-    return _default_storage.save_document(document_data)
+    return get_default_storage().save_document(document_data, doc_id=doc_id)
+
+
+def find_duplicate(document_data: Dict[str, Any]) -> Optional[str]:
+    """Convenience function to look up an already stored duplicate using default storage."""
+    return get_default_storage().find_duplicate(document_data)
+
+
+def bulk_insert():
+    """Convenience function to group index writes of the default storage into one transaction."""
+    return get_default_storage().bulk_insert()
 
 
 def save_error_document(document_data: Dict[str, Any], error_info: Dict[str, Any]) -> str:
     """Convenience function to save error document using default storage."""
-    return _default_storage.save_error_document(document_data, error_info)
+    return get_default_storage().save_error_document(document_data, error_info)
 
 
 def get_document(doc_id: str, include_embedding: bool = False) -> Optional[Dict[str, Any]]:
     """Convenience function to get document using default storage."""
-    return _default_storage.get_document(doc_id, include_embedding=include_embedding)
+    return get_default_storage().get_document(doc_id, include_embedding=include_embedding)
 
 
-def get_embedding(doc_id: str) -> Optional[List[float]]:
+def get_embedding(doc_id: str) -> Optional[np.ndarray]:
     """Convenience function to get embedding for a document."""
-    return _default_storage.get_embedding(doc_id)
+    return get_default_storage().get_embedding(doc_id)
 
 
-def get_all_embeddings(owner_id: Optional[int] = None) -> List[Dict[str, Any]]:
+def get_all_embeddings(owner_id: Optional[int] = None, include_full_text: bool = False) -> List[Dict[str, Any]]:
     """Convenience function to get all embeddings using default storage."""
-    return _default_storage.get_all_embeddings(owner_id)
+    return get_default_storage().get_all_embeddings(owner_id, include_full_text=include_full_text)
+
+
+def get_all_embeddings_soa(
+    owner_id: Optional[int] = None,
+    include_full_text: bool = False
+) -> Tuple[List[str], List[str], np.ndarray, List[Dict[str, Any]]]:
+    """Convenience function to get all embeddings as parallel arrays using default storage."""
+    return get_default_storage().get_all_embeddings_soa(owner_id, include_full_text=include_full_text)
+
+
+def load_embedding_matrix(owner_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Convenience function to load the memory-mapped embedding matrix using default storage."""
+    return get_default_storage().load_embedding_matrix(owner_id)
 
@@ -2,16 +2,95 @@
 Migration utility to separate embeddings from documents.
 
 This script migrates existing documents that have embeddings stored inline
-to the new format where embeddings are stored separately.
+to the new format where embeddings are stored separately, and converts
+separate JSON embedding files to the raw float32 (.f32 + .meta.json) layout.
 """
-import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-from app.storage.local_storage import LocalStorage, STORAGE_DIR, DOCUMENTS_DIR
+from typing import List, Dict, Any, Optional, Tuple
+from app.storage.local_storage import (
+    LocalStorage, DOCUMENTS_DIR, EMBEDDING_META_SUFFIX, _read_json, _write_json
+)
 
 logger = logging.getLogger(__name__)
 
+# Storage instance of each worker process, created by _init_worker
+_worker_storage: Optional[LocalStorage] = None
+
+
+def _init_worker():
+    """
+    Create the worker process's storage instance once, not per file.
+    Workers only write embedding files, so they skip the SQLite index; _run_parallel
+    opens (and migrates) it once in the parent before starting the pool.
+    """
+    global _worker_storage
+    _worker_storage = LocalStorage(open_index=False)
+
+
+def _run_parallel(worker, paths: List[Path], dry_run: bool) -> List[Tuple[str, str]]:
+    """
+    Run a per-file migration function over all paths on a process pool.
+    Files are independent, so JSON parsing is spread over all cores.
+    
+    :param worker: Module-level function taking (path, dry_run) and returning (outcome, doc_id)
+    :param paths: Files to process
+    :param dry_run: Passed through to the worker
+    :return: List of (outcome, doc_id) in input order
+    """
+    if not paths:
+        return []
+    # Run index creation and legacy migration once here, not concurrently in every worker
+    LocalStorage()
+    workers = min(os.cpu_count() or 1, len(paths))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(worker, paths, [dry_run] * len(paths), chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def _migrate_document_file(doc_file: Path, dry_run: bool) -> Tuple[str, str]:
+    """
+    Move the inline embedding of one document file to a separate embedding file.
+    
+    :param doc_file: Document JSON file
+    :param dry_run: If True, only report what would be migrated
+    :return: Tuple of (outcome, doc_id); outcome is "migrated", "exists", "skipped" or "error"
+    """
+    doc_id = doc_file.stem
+    try:
+        document = _read_json(doc_file)
+        doc_id = document.get("id") or doc_file.stem
+        
+        # Check if document has inline embedding
+        embedding = document.get("embedding")
+        
+        if not embedding or not isinstance(embedding, list) or len(embedding) == 0:
+            return "skipped", doc_id
+        
+        # Check if embedding already exists separately (binary or legacy JSON)
+        if any(os.path.exists(path) for path in _worker_storage._embedding_files(doc_id)) or \
+                (_worker_storage.embeddings_dir / f"{doc_id}.json").exists():
+            return "exists", doc_id
+        
+        if not dry_run:
+            # Save embedding separately (the stacked matrix is rebuilt once afterwards)
+            embedding_dimension = len(embedding)
+            _worker_storage._save_embedding_bin(doc_id, embedding, embedding_dimension)
+            
+            # Remove embedding from document
+            document.pop("embedding", None)
+            document["has_embedding"] = True
+            document["embedding_dimension"] = embedding_dimension
+            
+            # Save updated document (without embedding)
+            _write_json(doc_file, document, indent=False)
+        
+        return "migrated", doc_id
+    except Exception as e:
+        logger.error(f"Error processing {doc_file}: {e}")
+        return "error", doc_id
+
 
 def migrate_document_embeddings(dry_run: bool = True) -> Dict[str, Any]:
     """
@@ -28,7 +107,6 @@ def migrate_document_embeddings(dry_run: bool = True) -> Dict[str, Any]:
         "skipped": 0
     }
     
-    storage = LocalStorage()
     documents_dir = DOCUMENTS_DIR
     
     if not documents_dir.exists():
@@ -41,52 +119,90 @@ def migrate_document_embeddings(dry_run: bool = True) -> Dict[str, Any]:
     
     logger.info(f"Found {stats['total_documents']} documents to check for migration")
     
-    for doc_file in document_files:
-        try:
-            # Read document
-            with open(doc_file, 'r', encoding='utf-8') as f:
-                document = json.load(f)
-            
-            doc_id = document.get("id") or doc_file.stem
-            
-            # Check if document has inline embedding
-            embedding = document.get("embedding")
-            
-            if not embedding or not isinstance(embedding, list) or len(embedding) == 0:
-                stats["skipped"] += 1
-                continue
-            
+    for outcome, doc_id in _run_parallel(_migrate_document_file, document_files, dry_run):
+        if outcome == "migrated":
             stats["documents_with_embeddings"] += 1
-            
-            # Check if embedding already exists separately
-            embedding_file = storage.embeddings_dir / f"{doc_id}.json"
-            if embedding_file.exists():
-                logger.info(f"Embedding already exists for {doc_id}, skipping")
-                stats["skipped"] += 1
-                continue
-            
-            if dry_run:
-                logger.info(f"[DRY RUN] Would migrate embedding for {doc_id}")
-                stats["migrated"] += 1
-            else:
-                # Save embedding separately
-                embedding_dimension = len(embedding)
-                storage._save_embedding(doc_id, embedding, embedding_dimension)
-                
-                # Remove embedding from document
-                document.pop("embedding", None)
-                document["has_embedding"] = True
-                document["embedding_dimension"] = embedding_dimension
-                
-                # Save updated document (without embedding)
-                with open(doc_file, 'w', encoding='utf-8') as f:
-                    json.dump(document, f, indent=2, ensure_ascii=False)
-                
-                logger.info(f"Migrated embedding for {doc_id}")
-                stats["migrated"] += 1
-                
-        except Exception as e:
-            logger.error(f"Error processing {doc_file}: {e}")
+            stats["migrated"] += 1
+            logger.info(f"{'[DRY RUN] Would migrate' if dry_run else 'Migrated'} embedding for {doc_id}")
+        elif outcome == "exists":
+            stats["documents_with_embeddings"] += 1
+            stats["skipped"] += 1
+            logger.info(f"Embedding already exists for {doc_id}, skipping")
+        elif outcome == "skipped":
+            stats["skipped"] += 1
+        else:
+            stats["errors"] += 1
+    
+    if stats["migrated"] and not dry_run:
+        LocalStorage().rebuild_embedding_matrix()
+    
+    return stats
+
+
+def _convert_embedding_file(embedding_file: Path, dry_run: bool) -> Tuple[str, str]:
+    """
+    Convert one JSON embedding file to the raw float32 layout.
+    
+    :param embedding_file: JSON embedding file
+    :param dry_run: If True, only report what would be converted
+    :return: Tuple of (outcome, doc_id); outcome is "converted", "skipped" or "error"
+    """
+    doc_id = embedding_file.stem
+    try:
+        record = _read_json(embedding_file)
+        
+        doc_id = record.get("document_id") or embedding_file.stem
+        embedding = record.get("embedding")
+        
+        if not embedding or not isinstance(embedding, list):
+            return "skipped", doc_id
+        
+        if not dry_run:
+            _worker_storage._save_embedding_bin(
+                doc_id,
+                embedding,
+                record.get("dimension") or len(embedding),
+                created_at=record.get("created_at")
+            )
+            embedding_file.unlink()
+        
+        return "converted", doc_id
+    except Exception as e:
+        logger.error(f"Error processing {embedding_file}: {e}")
+        return "error", doc_id
+
+
+def migrate_embedding_files(dry_run: bool = True) -> Dict[str, Any]:
+    """
+    Convert JSON embedding files ({doc_id}.json in the embeddings directory) to the
+    raw float32 layout ({doc_id}.f32 plus {doc_id}.meta.json) in a single pass.
+    
+    :param dry_run: If True, only report what would be converted without making changes
+    :return: Conversion statistics
+    """
+    stats = {
+        "total_files": 0,
+        "converted": 0,
+        "errors": 0,
+        "skipped": 0
+    }
+    
+    storage = LocalStorage()
+    embedding_files = [
+        path for path in storage.embeddings_dir.glob("*.json")
+        if not path.name.endswith(EMBEDDING_META_SUFFIX)
+    ]
+    stats["total_files"] = len(embedding_files)
+    
+    logger.info(f"Found {stats['total_files']} JSON embedding files to convert")
+    
+    for outcome, doc_id in _run_parallel(_convert_embedding_file, embedding_files, dry_run):
+        if outcome == "converted":
+            stats["converted"] += 1
+            logger.info(f"{'[DRY RUN] Would convert' if dry_run else 'Converted'} embedding for {doc_id}")
+        elif outcome == "skipped":
+            stats["skipped"] += 1
+        else:
             stats["errors"] += 1
     
     return stats
@@ -118,6 +234,7 @@ if __name__ == "__main__":
     
     print()
     stats = migrate_document_embeddings(dry_run=dry_run)
+    file_stats = migrate_embedding_files(dry_run=dry_run)
     
     print("\n" + "=" * 60)
     print("Migration Statistics")
@@ -127,6 +244,9 @@ if __name__ == "__main__":
     print(f"Migrated: {stats['migrated']}")
     print(f"Skipped: {stats['skipped']}")
     print(f"Errors: {stats['errors']}")
+    print(f"JSON embedding files: {file_stats['total_files']}")
+    print(f"Converted to float32: {file_stats['converted']}")
+    print(f"Conversion errors: {file_stats['errors']}")
     
     if dry_run:
         print("\n⚠️  This was a dry run. Run without --dry-run to apply changes.")
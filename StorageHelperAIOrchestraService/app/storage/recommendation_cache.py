@@ -0,0 +1,108 @@
+"""
+Persistent cache of LLM recommendation results keyed by a hash of (owner, model, text)
+plus a fingerprint of the category, location and mapping files the result was built from.
+Stored in a local SQLite file with a TTL, so reprocessed documents skip the LLM call.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Default cache location, next to the local storage data
+CACHE_FILE = Path(__file__).parent.parent.parent / "tmp" / "recommendation_cache.sqlite"
+
+
+class RecommendationCache:
+    """
+    Key-value cache mapping text hashes to recommendation results, with expiry.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, ttl_seconds: float = 86400.0):
+        """
+        Initialize the recommendation cache.
+
+        :param cache_file: Path to the SQLite cache file. Defaults to project_root/tmp/recommendation_cache.sqlite
+        :param ttl_seconds: How long a cached recommendation stays valid
+        """
+        self.cache_file = cache_file or CACHE_FILE
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS recommendations (key TEXT PRIMARY KEY, result BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(owner_id: Any, model_name: str, text: str, context: str = "") -> str:
+        """
+        Build the cache key for a recommendation request.
+
+        :param owner_id: Owner ID (recommendations depend on the owner's locations)
+        :param model_name: LLM model name
+        :param text: Document text sent to the LLM
+        :param context: Fingerprint of the categories, locations and mappings the result was built from
+        :return: Hex digest identifying the request
+        """
+        data = f"{owner_id}\0{model_name}\0{context}\0{text}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached recommendation result.
+
+        :param key: Cache key from make_key
+        :return: Recommendation result, or None on miss or expiry
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT result FROM recommendations WHERE key = ? AND expires_at > ?", (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Recommendation cache lookup failed: {e}")
+            return None
+
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a recommendation result.
+
+        :param key: Cache key from make_key
+        :param result: Recommendation result dictionary
+        """
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO recommendations (key, result, expires_at) VALUES (?, ?, ?)",
+                    (key, orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS), time.time() + self.ttl_seconds)
+                )
+        except (sqlite3.Error, TypeError) as e:
+            logger.error(f"Recommendation cache write failed: {e}")
+
+
+# Default instance shared by ingestion pipelines
+_default_cache: Optional[RecommendationCache] = None
+
+
+def get_default_cache() -> RecommendationCache:
+    """Get default recommendation cache instance"""
+    global _default_cache
+    if _default_cache is None:
+        # Imported here: loading settings exits without an environment, which must not
+        # happen merely because app.storage was imported
+        from app.core.config import settings
+        _default_cache = RecommendationCache(ttl_seconds=settings.RECOMMENDATION_CACHE_TTL)
+    return _default_cache
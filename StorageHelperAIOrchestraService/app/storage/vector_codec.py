@@ -0,0 +1,77 @@
+"""
+Compact encodings for embedding vectors passed between pipeline steps and storage.
+Vectors travel as base64 of their raw float32 bytes instead of JSON lists of floats.
+"""
+import base64
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+def encode_embedding(embedding: np.ndarray) -> str:
+    """
+    Encode a vector as base64 of its raw bytes: int8 vectors as-is,
+    anything else as little-endian float32.
+
+    :param embedding: Embedding vector
+    :return: Base64 string
+    """
+    embedding = np.asarray(embedding)
+    if embedding.dtype != np.int8:
+        embedding = embedding.astype("<f4", copy=False)
+    return base64.b64encode(embedding.tobytes()).decode("ascii")
+
+
+def decode_embedding(data: str, dtype: str = "float32") -> np.ndarray:
+    """
+    Decode a base64 vector produced by encode_embedding.
+
+    :param data: Base64 string
+    :param dtype: Element type of the encoded vector ("float32" or "int8")
+    :return: 1-D numpy array
+    """
+    return np.frombuffer(base64.b64decode(data), dtype="<f4" if dtype == "float32" else np.int8)
+
+
+def l2_normalize(embedding: np.ndarray) -> np.ndarray:
+    """
+    Scale a vector to unit length, so cosine similarity becomes a plain dot product.
+    Zero vectors are returned unchanged.
+
+    :param embedding: Embedding vector
+    :return: float32 unit vector
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(embedding))
+    return embedding / norm if norm > 0 else embedding
+
+
+def quantize_int8(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Symmetric int8 quantization: embedding ~= quantized * scale.
+
+    :param embedding: float32 embedding vector
+    :return: Tuple of (int8 vector, scale)
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    max_abs = float(np.max(np.abs(embedding))) if embedding.size else 0.0
+    if max_abs == 0.0:
+        return np.zeros(embedding.shape, dtype=np.int8), 1.0
+    scale = max_abs / 127.0
+    return np.round(embedding / scale).astype(np.int8), scale
+
+
+def embedding_from_document(document_data: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    Extract the float32 embedding from pipeline output, accepting both the
+    base64 form ("embedding_b64") and a plain list ("embedding").
+
+    :param document_data: Pipeline output / document dictionary
+    :return: float32 vector, or None if the document has no embedding
+    """
+    if document_data.get("embedding_b64"):
+        return decode_embedding(document_data["embedding_b64"])
+    embedding = document_data.get("embedding")
+    if embedding is not None and len(embedding) > 0:
+        return np.asarray(embedding, dtype=np.float32)
+    return None
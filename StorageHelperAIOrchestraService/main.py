@@ -1,11 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.router import api_router
+from app.modules import embedding, recommendation, vision
+from app.pipelines import ingestion
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 关闭时释放共享实例的 HTTP 连接池和后台批处理任务
+    await ingestion.get_vision_analyzer().close()
+    if vision._default_analyzer is not None:
+        await vision._default_analyzer.close()
+    await recommendation._default_generator.close()
+    await embedding.get_default_embedder().close()
+
+
 app = FastAPI(
     title="家用 AI 文件管家 (Orchestra Service)",
     description="处理 OCR、文件分类、搜索和位置推荐的核心服务",
-    version="v1"
+    version="v1",
+    lifespan=lifespan
 )
 
 # 挂载 API 路由到 /api/v1 前缀下
@@ -0,0 +1,53 @@
+"""
+Tests for the local document and embedding storage.
+"""
+import threading
+
+import numpy as np
+
+from app.storage.local_storage import LocalStorage
+
+
+def test_resaved_document_id_keeps_only_latest_embedding(tmp_path):
+    """Saving a document ID again replaces its embedding row instead of adding a second one."""
+    storage = LocalStorage(storage_dir=tmp_path)
+    storage.save_document({"owner_id": 1, "extracted_text": "first scan", "embedding": [1.0, 0.0]}, doc_id="abc")
+    storage.save_document({"owner_id": 1, "extracted_text": "second scan", "embedding": [0.0, 1.0]}, doc_id="abc")
+
+    rows, matrix = storage.load_embedding_matrix()
+    assert [row["id"] for row in rows] == ["abc"]
+    np.testing.assert_allclose(matrix[0], [0.0, 1.0])
+
+    assert [document["id"] for document in storage.get_all_embeddings()] == ["abc"]
+    assert [row["id"] for row in storage.load_embedding_matrix(owner_id=1)[0]] == ["abc"]
+
+
+def test_duplicate_detection_includes_source_file(tmp_path):
+    """Scans with the same text are only merged when their source files are identical."""
+    storage = LocalStorage(storage_dir=tmp_path / "storage")
+    first_scan, second_scan = tmp_path / "first.jpg", tmp_path / "second.jpg"
+    first_scan.write_bytes(b"first image")
+    second_scan.write_bytes(b"second image")
+
+    first_id = storage.save_document({"owner_id": 1, "extracted_text": "Receipt", "image_path": str(first_scan)})
+    second_id = storage.save_document({"owner_id": 1, "extracted_text": "Receipt", "image_path": str(second_scan)})
+    assert second_id != first_id
+
+    repeat = {"owner_id": 1, "extracted_text": "Receipt", "image_path": str(first_scan)}
+    assert storage.find_duplicate(repeat) == first_id
+    assert storage.save_document(repeat) == first_id
+
+
+def test_bulk_insert_only_defers_its_own_context(tmp_path):
+    """A bulk_insert block collects its own index entries; saves from other threads commit immediately."""
+    storage = LocalStorage(storage_dir=tmp_path)
+    with storage.bulk_insert():
+        batch_id = storage.save_document({"owner_id": 1, "extracted_text": "batch scan"})
+        other = threading.Thread(
+            target=storage.save_document, args=({"owner_id": 2, "extracted_text": "other scan"}, "other")
+        )
+        other.start()
+        other.join()
+        assert storage._indexed_ids() == {"other"}
+
+    assert storage._indexed_ids() == {batch_id, "other"}
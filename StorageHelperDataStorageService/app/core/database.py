@@ -1,39 +1,83 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-# Create database engine
+
+def _json_serializer(value) -> str:
+    """Serialize JSON column values with orjson (non-ASCII kept as-is)."""
+    return orjson.dumps(value).decode("utf-8")
+
+
+# Create database engine (synchronous; used for schema creation and scripts)
+# MySQL already stores JSON columns in a parsed binary format; orjson replaces the
+# stdlib json module for the client-side encode/decode of metadata and embeddings
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     echo=False,  # Set to True for SQL logging
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+# Create async database engine (used by the API routes, so DB waits don't hold worker threads)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=False,  # Set to True for SQL logging
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
 
+# Objects stay usable after commit, since routes build responses from them
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Session:
+async def get_db() -> AsyncSession:
     """
     Dependency for getting database session
-    Usage in route: def route_function(db: Session = Depends(get_db))
+    Usage in route: async def route_function(db: AsyncSession = Depends(get_db))
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def ping_db():
+    """Run SELECT 1 on a pooled connection (raises if the database is unreachable)"""
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warmup_db():
+    """Open a pooled connection at startup so the first request doesn't pay the connect cost"""
+    await ping_db()
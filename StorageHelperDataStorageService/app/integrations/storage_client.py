@@ -2,9 +2,12 @@
 Storage client for local filesystem storage
 """
 import os
+import shutil
 import uuid
-from typing import Optional
-from io import BytesIO
+from typing import Optional, BinaryIO
+
+# Bytes copied per read/write when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 class StorageException(Exception):
@@ -16,12 +19,15 @@ class StorageClient:
     """Local filesystem storage client"""
     
     @staticmethod
-    def upload_image(file_content: BytesIO, filename: str, folder: str) -> str:
+    def upload_image(file_content: BinaryIO, filename: str, folder: str) -> str:
         """
         Upload image to local filesystem
         
+        The content is copied in fixed-size chunks, so large scans are never held
+        in memory in full.
+        
         Args:
-            file_content: File content (BytesIO)
+            file_content: Readable binary file object
             filename: Original filename
             folder: Folder path (e.g., "documents/user_1")
             
@@ -39,8 +45,9 @@ class StorageClient:
             
             local_file_path = os.path.join(storage_dir, full_path)
             
+            file_content.seek(0)
             with open(local_file_path, 'wb') as f:
-                f.write(file_content.getvalue())
+                shutil.copyfileobj(file_content, f, UPLOAD_CHUNK_SIZE)
             
             # Return file path
             return f"file://{local_file_path}"
@@ -8,6 +8,7 @@ from app.models.event import Event
 from app.models.document import Document
 from app.models.document_embedding import DocumentEmbedding
 from app.models.feedback_message import FeedbackMessage
+from app.models.embedding_cache import EmbeddingCache
 
 __all__ = [
     "User",
@@ -17,4 +18,5 @@ __all__ = [
     "Document",
     "DocumentEmbedding",
     "FeedbackMessage",
+    "EmbeddingCache",
 ]
@@ -1,8 +1,8 @@
 """
 Database model for Document
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, Index, TIMESTAMP, FetchedValue, text, func
+from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
@@ -10,6 +10,12 @@ from app.core.database import Base
 class Document(Base):
     """Document model - core entity for storing document metadata and references"""
     __tablename__ = "document"
+    __table_args__ = (
+        # Covers owner-filtered lookups of (id, title); InnoDB appends the primary key
+        Index("ix_document_owner_title", "owner_id", "title"),
+    )
+    # Server-generated timestamps are read back during the flush (no refresh after commit)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String(255), nullable=True, index=True)
@@ -26,8 +32,18 @@ class Document(Base):
     image_url = Column(Text, nullable=False)  # URL or path to document image
     ocr_text = Column(Text, nullable=True)  # Extracted text from OCR
     
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
+
+    # Related rows; loading is explicit (joinedload) since lazy loads can't run under AsyncSession
+    category = relationship("DocumentCategory", lazy="raise")
+    owner = relationship("User", lazy="raise")
+    event = relationship("Event", lazy="raise")
 
     def __repr__(self):
         return f"<Document(id={self.id}, title='{self.title}', owner_id={self.owner_id}, category_id={self.category_id})>"
@@ -1,8 +1,7 @@
 """
 Database model for DocumentCategory
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, FetchedValue, text, func
 
 from app.core.database import Base
 
@@ -16,8 +15,13 @@ class DocumentCategory(Base):
     name = Column(String(100), nullable=False)  # e.g. "Tax Documents", "Immigration Documents"
     description = Column(Text, nullable=True)
     classification = Column(Text, nullable=True)  # e.g. virtual/physical (placeholder)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
 
     def __repr__(self):
         return f"<DocumentCategory(id={self.id}, code='{self.code}', name='{self.name}')>"
@@ -1,7 +1,7 @@
 """
 Database model for DocumentEmbedding
 """
-from sqlalchemy import Column, Integer, ForeignKey, JSON
+from sqlalchemy import Column, Integer, ForeignKey, LargeBinary, Float
 
 from app.core.database import Base
 
@@ -11,7 +11,10 @@ class DocumentEmbedding(Base):
     __tablename__ = "document_embedding"
 
     document_id = Column(Integer, ForeignKey("document.id", ondelete="CASCADE"), primary_key=True)
-    embedding = Column(JSON, nullable=False)  # e.g. [0.123, -0.98, 0.456, ...]
+    embedding = Column(LargeBinary, nullable=False)  # Packed little-endian float32, 4 bytes per dimension
+    # int8 copy for the in-memory search index (embedding ~= embedding_i8 * embedding_scale)
+    embedding_i8 = Column(LargeBinary, nullable=True)
+    embedding_scale = Column(Float, nullable=True)
 
     def __repr__(self):
         return f"<DocumentEmbedding(document_id={self.document_id})>"
@@ -0,0 +1,18 @@
+"""
+Database model for EmbeddingCache
+"""
+from sqlalchemy import Column, String, BINARY, LargeBinary
+
+from app.core.database import Base
+
+
+class EmbeddingCache(Base):
+    """EmbeddingCache model - content-addressed embeddings, so identical text is embedded only once per model"""
+    __tablename__ = "embedding_cache"
+
+    content_hash = Column(BINARY(32), primary_key=True)  # blake2b-256 of model name + text
+    model = Column(String(100), nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # Packed little-endian float32, 4 bytes per dimension
+
+    def __repr__(self):
+        return f"<EmbeddingCache(model='{self.model}', content_hash={self.content_hash.hex()})>"
@@ -1,8 +1,7 @@
 """
 Database model for Event
 """
-from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, FetchedValue, text, func
 
 from app.core.database import Base
 
@@ -17,8 +16,13 @@ class Event(Base):
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
 
     def __repr__(self):
         return f"<Event(id={self.id}, name='{self.name}', category='{self.category}')>"
@@ -1,8 +1,7 @@
 """
 Database model for FeedbackMessage
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, func
 
 from app.core.database import Base
 
@@ -15,7 +14,7 @@ class FeedbackMessage(Base):
     document_id = Column(Integer, ForeignKey("document.id", ondelete="CASCADE"), nullable=True)
     feedback_type = Column(String(50), nullable=True)  # e.g. "type_fix", "location_error", "metadata_fix"
     note = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
 
     def __repr__(self):
         return f"<FeedbackMessage(id={self.id}, document_id={self.document_id}, feedback_type='{self.feedback_type}')>"
@@ -1,8 +1,7 @@
 """
 Database model for StorageLocation
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, FetchedValue, text, func
 
 from app.core.database import Base
 
@@ -16,8 +15,13 @@ class StorageLocation(Base):
     description = Column(Text, nullable=True)
     photo_url = Column(Text, nullable=True)
     parent_id = Column(Integer, ForeignKey("storage_location.id", ondelete="SET NULL"), nullable=True)  # For hierarchical locations
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
 
     def __repr__(self):
         return f"<StorageLocation(id={self.id}, name='{self.name}', parent_id={self.parent_id})>"
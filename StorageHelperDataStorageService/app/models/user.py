@@ -1,8 +1,7 @@
 """
 Database models for User
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, FetchedValue, text, func
 
 from app.core.database import Base
 
@@ -10,12 +9,19 @@ from app.core.database import Base
 class User(Base):
     """User model"""
     __tablename__ = "user"
+    # Server-generated timestamps are read back during the flush (no refresh after commit)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     display_name = Column(String(100), nullable=False)
     note = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
 
     def __repr__(self):
         return f"<User(id={self.id}, display_name='{self.display_name}')>"
@@ -4,17 +4,29 @@ Public API for external services (e.g., AI Orchestra Service)
 These endpoints expose high-level business operations.
 Internal schema details are completely hidden.
 """
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import hashlib
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-from io import BytesIO
 
 from app.core.database import get_db
 from app.services.document_service import DocumentService
+from app.services.embedding_cache_service import EmbeddingCacheService
+from app.services.embedding_index import as_embedding
 from app.models.document import Document
+from app.schemas.document import (
+    BatchEmbeddingItem, IngestItem, IngestResponse, UploadResponse, SaveOcrResponse, BatchSaveResponse, BulkLoadResponse,
+    DocumentDetailsResponse, SearchResponse, EmbeddingCacheResponse, StatusUpdateResponse
+)
 
 router = APIRouter(prefix="/api/v1", tags=["public-api"])
 
+# Document details may be reused by the same client for this long without revalidating
+DOCUMENT_CACHE_CONTROL = "private, max-age=60"
+
+_INGEST_ITEMS_ADAPTER = TypeAdapter(List[IngestItem])
+
 
 # ============================================================
 # Document Processing API for AI Service
@@ -22,7 +34,7 @@ router = APIRouter(prefix="/api/v1", tags=["public-api"])
 
 @router.post(
     "/documents/upload-and-process",
-    response_model=dict,
+    response_model=UploadResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Upload and register a new document",
     description="""
@@ -32,12 +44,12 @@ router = APIRouter(prefix="/api/v1", tags=["public-api"])
     Returns document metadata for further processing (OCR, embedding, etc.)
     """
 )
-def upload_and_process(
+async def upload_and_process(
     file: UploadFile = File(..., description="Document image file"),
     owner_id: int = Form(..., description="Document owner user ID"),
     category: str = Form(..., description="Document category (TAX, VISA, MED, INS, etc.)"),
     event_name: Optional[str] = Form(None, description="Associated event name"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload document file and create database record.
@@ -45,44 +57,61 @@ def upload_and_process(
     Returns only essential metadata (id, url, owner_id).
     Does not expose internal schema structure.
     """
-    try:
-        # Read file content
-        file_content = BytesIO(file.file.read())
-        
-        # Process document (upload + save)
-        document = DocumentService.process_new_document(
-            db=db,
-            file_content=file_content,
-            filename=file.filename,
-            owner_id=owner_id,
-            category_code=category,
-            event_name=event_name
-        )
-        
-        # Return minimal response (hide internal schema)
-        return {
-            "id": document.id,
-            "filename": document.title,
-            "url": document.image_url,
-            "owner_id": document.owner_id,
-            "created_at": document.created_at.isoformat()
-        }
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process document: {str(e)}"
-        )
+    # Process document (upload + save); the spooled upload is streamed to storage
+    # in chunks rather than read into memory first
+    document = await DocumentService.process_new_document(
+        db=db,
+        file_content=file.file,
+        filename=file.filename,
+        owner_id=owner_id,
+        category_code=category,
+        event_name=event_name
+    )
+    
+    # Return minimal response (hide internal schema)
+    return {
+        "id": document.id,
+        "filename": document.title,
+        "url": document.image_url,
+        "owner_id": document.owner_id,
+        "created_at": document.created_at
+    }
+
+
+@router.post(
+    "/documents/ingest-full",
+    response_model=IngestResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Register fully processed documents in one call",
+    description="""
+    Upload + document record + OCR text + embedding + status, for one or more
+    documents, in a single request and a single transaction.
+    
+    Send the files as repeated `files` parts and `items` as a JSON array with one
+    entry per file, in the same order. Accepts up to 100 documents per request.
+    """
+)
+async def ingest_full(
+    files: List[UploadFile] = File(..., description="Document image files"),
+    items: str = Form(..., description="JSON array of per-file fields (owner_id, category, ocr_text, embedding, ...)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ingest a batch of processed documents"""
+    documents = await DocumentService.ingest_documents(
+        db=db,
+        files=[(file.file, file.filename) for file in files],
+        items=_INGEST_ITEMS_ADAPTER.validate_json(items)
+    )
+    
+    return {
+        "count": len(documents),
+        "documents": documents
+    }
 
 
 @router.post(
     "/documents/{document_id}/save-ocr-and-embedding",
-    response_model=dict,
+    response_model=SaveOcrResponse,
     summary="Save OCR text and vector embedding",
     description="""
     Called by AI Service after OCR and embedding generation.
@@ -90,149 +119,200 @@ def upload_and_process(
     Saves extracted text and vector embeddings for semantic search.
     """
 )
-def save_ocr_and_embedding(
+async def save_ocr_and_embedding(
     document_id: int,
     ocr_text: str = Form(..., description="Extracted text from OCR"),
     embedding: List[float] = Form(..., description="Vector embedding"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Save OCR text and embedding to document"""
-    try:
-        embedding_record = DocumentService.save_embedding_and_ocr(
-            db=db,
-            document_id=document_id,
-            ocr_text=ocr_text,
-            embedding=embedding
-        )
-        
-        return {
-            "document_id": document_id,
-            "status": "saved",
-            "ocr_length": len(ocr_text),
-            "embedding_dimensions": len(embedding)
-        }
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    await DocumentService.save_embedding_and_ocr(
+        db=db,
+        document_id=document_id,
+        ocr_text=ocr_text,
+        embedding=as_embedding(embedding)
+    )
+    
+    return {
+        "document_id": document_id,
+        "status": "saved",
+        "ocr_length": len(ocr_text),
+        "embedding_dimensions": len(embedding)
+    }
+
+
+@router.post(
+    "/documents/save-ocr-and-embedding:batch",
+    response_model=BatchSaveResponse,
+    summary="Save OCR text and vector embeddings for many documents",
+    description="""
+    Bulk variant of save-ocr-and-embedding for backfills and initial indexing.
+    
+    Accepts up to 10,000 items and saves them in one transaction.
+    """
+)
+async def save_ocr_and_embedding_batch(
+    items: List[BatchEmbeddingItem],
+    db: AsyncSession = Depends(get_db)
+):
+    """Save OCR text and embeddings for a batch of documents"""
+    result = await DocumentService.save_embeddings_bulk(db=db, items=items)
+    
+    return {
+        "status": "saved",
+        "saved": result["saved"],
+        "missing_document_ids": result["missing_document_ids"]
+    }
+
+
+@router.post(
+    "/documents/bulk-load-embeddings",
+    response_model=BulkLoadResponse,
+    summary="Bulk-load embeddings from a packed binary file",
+    description="""
+    Admin route for initial indexing and backfills.
+    
+    File format: uint32 dimension D, then records of int32 document_id followed by
+    D float32 values (all little-endian). Existing embeddings are replaced.
+    """
+)
+async def bulk_load_embeddings(
+    file: UploadFile = File(..., description="Packed embedding records"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Load embeddings from a packed binary upload"""
+    loaded = await DocumentService.bulk_load_embeddings(db=db, stream=file.file)
+    
+    return {
+        "status": "loaded",
+        "loaded": loaded
+    }
 
 
 @router.get(
     "/documents/{document_id}",
-    response_model=dict,
+    response_model=DocumentDetailsResponse,
     summary="Get document details",
     description="Called by AI Service to retrieve document information"
 )
-def get_document_details(
+async def get_document_details(
     document_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get document details (minimal response, no schema details exposed)"""
-    try:
-        document = DocumentService.get_document_with_details(db, document_id)
-        
-        return {
-            "id": document.id,
-            "filename": document.title,
-            "url": document.image_url,
-            "owner_id": document.owner_id,
-            "ocr_text": document.ocr_text,
-            "created_at": document.created_at.isoformat()
-        }
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    """
+    Get document details (minimal response, no schema details exposed)
+    
+    Responses carry an ETag over the returned fields; a matching If-None-Match
+    gets an empty 304 instead of the serialized document.
+    """
+    document = await DocumentService.get_document_with_details(db, document_id)
+    
+    fingerprint = "\0".join(str(value) for value in (
+        document.id, document.title, document.image_url, document.owner_id,
+        document.ocr_text, document.created_at
+    ))
+    etag = f'W/"{hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": DOCUMENT_CACHE_CONTROL}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return {
+        "id": document.id,
+        "filename": document.title,
+        "url": document.image_url,
+        "owner_id": document.owner_id,
+        "ocr_text": document.ocr_text,
+        "created_at": document.created_at
+    }
 
 
 @router.post(
     "/documents/search-similar",
-    response_model=dict,
+    response_model=SearchResponse,
     summary="Search documents by vector similarity",
     description="Called by AI Service for semantic search"
 )
-def search_similar_documents(
+async def search_similar_documents(
     embedding: List[float] = Form(..., description="Query embedding vector"),
     limit: int = Form(10, description="Maximum results"),
     owner_id: Optional[int] = Form(None, description="Filter by owner"),
-    db: Session = Depends(get_db)
+    rescore_multiplier: int = Form(4, ge=1, description="int8 candidates re-ranked exactly per result"),
+    db: AsyncSession = Depends(get_db)
 ):
     """Search documents by vector similarity"""
-    try:
-        documents = DocumentService.search_by_embedding(
-            db=db,
-            embedding=embedding,
-            limit=limit,
-            owner_id=owner_id
-        )
-        
-        return {
-            "count": len(documents),
-            "documents": [
-                {
-                    "id": doc.id,
-                    "filename": doc.title,
-                    "owner_id": doc.owner_id
-                }
-                for doc in documents
-            ]
-        }
-        
-    except Exception as e:
+    documents = await DocumentService.search_by_embedding(
+        db=db,
+        embedding=as_embedding(embedding),
+        limit=limit,
+        owner_id=owner_id,
+        rescore_multiplier=rescore_multiplier
+    )
+    
+    return {
+        "count": len(documents),
+        "documents": documents
+    }
+
+
+@router.post(
+    "/embeddings/get-or-put",
+    response_model=EmbeddingCacheResponse,
+    summary="Get a cached embedding, or cache a new one",
+    description="""
+    Called by AI Service before embedding text.
+    
+    Returns the cached vector for (text, model) if present. Otherwise, when an
+    embedding is supplied it is stored and echoed back; without one, 404.
+    """
+)
+async def get_or_put_embedding(
+    text: str = Form(..., description="Text that is (or was) embedded"),
+    model: str = Form(..., description="Embedding model identifier"),
+    embedding: Optional[List[float]] = Form(None, description="Embedding to cache on a miss"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get or put a cached embedding"""
+    cached = await EmbeddingCacheService.get_embedding(db=db, text=text, model=model)
+    if cached is not None:
+        return {"hit": True, "embedding": cached}
+    
+    if not embedding:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Embedding not cached"
         )
+    
+    await EmbeddingCacheService.put_embedding(db=db, text=text, model=model, embedding=embedding)
+    return {"hit": False, "embedding": embedding}
 
 
 @router.patch(
     "/documents/{document_id}/status",
-    response_model=dict,
+    response_model=StatusUpdateResponse,
     summary="Update document processing status",
     description="Called by AI Service to update document status"
 )
-def update_document_status(
+async def update_document_status(
     document_id: int,
     status_value: str = Form(..., description="Processing status"),
     metadata: Optional[dict] = Form(None, description="Additional metadata"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update document status and metadata"""
-    try:
-        document = DocumentService.update_document_status(
-            db=db,
-            document_id=document_id,
-            status=status_value,
-            metadata_update=metadata
-        )
-        
-        return {
-            "id": document.id,
-            "status": status_value,
-            "updated_at": document.updated_at.isoformat()
-        }
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    document = await DocumentService.update_document_status(
+        db=db,
+        document_id=document_id,
+        status=status_value,
+        metadata_update=metadata
+    )
+    
+    return {
+        "id": document["id"],
+        "status": status_value,
+        "updated_at": document["updated_at"]
+    }
@@ -1,11 +1,11 @@
 """
 User management routes
 """
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from app.core.database import get_db
-from app.services.user_service import UserService
+from app.services.user_service import UserService, DEFAULT_USER_PAGE_SIZE, MAX_USER_PAGE_SIZE
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -18,50 +18,39 @@ router = APIRouter(prefix="/users", tags=["users"])
     summary="Create a new user",
     description="Create a new user in the system"
 )
-def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new user
     
     - **display_name**: User's display name (required, 1-100 characters)
     - **note**: Optional note about the user
     """
-    try:
-        return UserService.create_user(db, user_data)
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create user: {str(e)}"
-        )
+    return await UserService.create_user(db, user_data)
 
 
 @router.get(
     "",
     response_model=UserListResponse,
     summary="Get all users",
-    description="Retrieve all users in the system"
+    description="Retrieve users in pages ordered by ID; pass next_cursor back as cursor for the next page"
 )
-def get_users(db: Session = Depends(get_db)):
+async def get_users(
+    cursor: int = Query(0, ge=0, description="Last user ID of the previous page"),
+    limit: int = Query(DEFAULT_USER_PAGE_SIZE, ge=1, le=MAX_USER_PAGE_SIZE, description="Users per page"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Get all users
+    Get a page of users
     
-    Returns a list of all users and the total count
+    Returns the users after `cursor`, their count and the cursor for the next page
     """
-    try:
-        users = UserService.get_all_users(db)
-        return UserListResponse(
-            total=len(users),
-            users=users
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve users: {str(e)}"
-        )
+    users = await UserService.get_all_users(db, cursor=cursor, limit=limit)
+    next_cursor = users[-1].id if len(users) == limit else None
+    # Serialize the validated list in one pass, skipping FastAPI's re-validation
+    return Response(
+        content=UserListResponse(total=len(users), users=users, next_cursor=next_cursor).model_dump_json(),
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -70,29 +59,21 @@ def get_users(db: Session = Depends(get_db)):
     summary="Get user by ID",
     description="Retrieve a specific user by their ID"
 )
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a specific user by ID
     
     - **user_id**: The user's ID
     """
-    try:
-        user = UserService.get_user_by_id(db, user_id)
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User with ID {user_id} not found"
-            )
-        
-        return user
-    except HTTPException:
-        raise
-    except Exception as e:
+    user = await UserService.get_user_by_id(db, user_id)
+    
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve user: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found"
         )
+    
+    return user
 
 
 @router.patch(
@@ -101,30 +82,14 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
     summary="Update user",
     description="Update a specific user's information"
 )
-def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user_data: UserUpdate, db: AsyncSession = Depends(get_db)):
     """
     Update a specific user
     
     - **user_id**: The user's ID
     - **user_data**: Fields to update (all optional)
     """
-    try:
-        return UserService.update_user(db, user_id, user_data)
-    except ValueError as e:
-        if "not found" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=str(e)
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update user: {str(e)}"
-        )
+    return await UserService.update_user(db, user_id, user_data)
 
 
 @router.delete(
@@ -133,27 +98,11 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
     summary="Delete user",
     description="Delete a specific user"
 )
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a specific user
     
     - **user_id**: The user's ID
     """
-    try:
-        UserService.delete_user(db, user_id)
-        return None
-    except ValueError as e:
-        if "not found" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=str(e)
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete user: {str(e)}"
-        )
+    await UserService.delete_user(db, user_id)
+    return None
@@ -2,7 +2,7 @@
 Pydantic schemas for Document
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -48,7 +48,109 @@ class DocumentResponse(BaseModel):
         populate_by_name = True  # Allow both 'doc_metadata' and 'metadata'
 
 
+class BatchEmbeddingItem(BaseModel):
+    """Schema for one document in a batch OCR text + embedding save"""
+    document_id: int = Field(..., description="Document ID")
+    ocr_text: str = Field(..., description="Extracted text from OCR")
+    embedding: List[float] = Field(..., description="Vector embedding")
+
+
+class IngestItem(BaseModel):
+    """Schema for one fully processed document in an ingest-full request"""
+    owner_id: int = Field(..., description="Document owner user ID")
+    category: str = Field(..., description="Document category (TAX, VISA, MED, INS, etc.)")
+    event_name: Optional[str] = Field(None, description="Associated event name")
+    ocr_text: Optional[str] = Field(None, description="Extracted text from OCR")
+    embedding: Optional[List[float]] = Field(None, description="Vector embedding")
+    status: Optional[str] = Field("completed", description="Processing status (omitted from metadata if null)")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+
+
 class DocumentListResponse(BaseModel):
     """Schema for list of documents"""
     total: int = Field(..., description="Total number of documents")
     documents: list[DocumentResponse] = Field(..., description="List of documents")
+
+
+# ============================================================
+# Public API responses
+# ============================================================
+
+class UploadResponse(BaseModel):
+    """Response for upload-and-process"""
+    id: int
+    filename: Optional[str] = None
+    url: str
+    owner_id: int
+    created_at: datetime
+
+
+class IngestedDocument(BaseModel):
+    """One document registered by ingest-full"""
+    id: int
+    filename: Optional[str] = None
+    url: str
+    owner_id: int
+
+
+class IngestResponse(BaseModel):
+    """Response for ingest-full"""
+    count: int
+    documents: List[IngestedDocument]
+
+
+class SaveOcrResponse(BaseModel):
+    """Response for save-ocr-and-embedding"""
+    document_id: int
+    status: str
+    ocr_length: int
+    embedding_dimensions: int
+
+
+class BatchSaveResponse(BaseModel):
+    """Response for the batch OCR text + embedding save"""
+    status: str
+    saved: int
+    missing_document_ids: List[int]
+
+
+class BulkLoadResponse(BaseModel):
+    """Response for bulk-load-embeddings"""
+    status: str
+    loaded: int
+
+
+class DocumentDetailsResponse(BaseModel):
+    """Minimal document details for the AI Service"""
+    id: int
+    filename: Optional[str] = None
+    url: str
+    owner_id: int
+    ocr_text: Optional[str] = None
+    created_at: datetime
+
+
+class SearchHit(BaseModel):
+    """One semantic search result"""
+    id: int
+    filename: Optional[str] = None
+    owner_id: int
+
+
+class SearchResponse(BaseModel):
+    """Semantic search results, most similar first"""
+    count: int
+    documents: List[SearchHit]
+
+
+class EmbeddingCacheResponse(BaseModel):
+    """Response for embeddings/get-or-put"""
+    hit: bool
+    embedding: List[float]
+
+
+class StatusUpdateResponse(BaseModel):
+    """Response for a document status update"""
+    id: int
+    status: str
+    updated_at: datetime
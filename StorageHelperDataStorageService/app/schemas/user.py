@@ -31,6 +31,7 @@ class UserResponse(BaseModel):
 
 
 class UserListResponse(BaseModel):
-    """Schema for list of users"""
-    total: int = Field(..., description="Total number of users")
-    users: list[UserResponse] = Field(..., description="List of users")
+    """Schema for one page of users"""
+    total: int = Field(..., description="Number of users in this page")
+    users: list[UserResponse] = Field(..., description="List of users, ordered by ID")
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page (None on the last page)")
@@ -3,8 +3,12 @@ Services package - High-level business logic layer
 """
 from app.services.user_service import UserService
 from app.services.document_service import DocumentService
+from app.services.embedding_cache_service import EmbeddingCacheService
+from app.services.exceptions import NotFoundError
 
 __all__ = [
     "UserService",
-    "DocumentService"
+    "DocumentService",
+    "EmbeddingCacheService",
+    "NotFoundError"
 ]
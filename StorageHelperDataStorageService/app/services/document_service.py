@@ -1,16 +1,49 @@
 """
 Document business logic service - High-level API for AI Service
 """
-from sqlalchemy.orm import Session
-from typing import Optional, List, Dict, Any
-from io import BytesIO
+import asyncio
+from sqlalchemy import select, update, insert, func, cast, lambda_stmt, JSON
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from typing import Optional, List, Dict, Any, BinaryIO, Tuple, Set
+
+import numpy as np
 
 from app.models.document import Document
 from app.models.document_category import DocumentCategory
 from app.models.event import Event
 from app.models.document_embedding import DocumentEmbedding
-from app.schemas.document import DocumentCreate, DocumentUpdate
+from app.schemas.document import DocumentCreate, DocumentUpdate, BatchEmbeddingItem, IngestItem
 from app.integrations.storage_client import StorageClient, StorageException
+from app.services.exceptions import NotFoundError
+from app.services.embedding_index import (
+    EMBEDDING_DTYPE, RESCORE_MULTIPLIER, embedding_index, embedding_columns, quantize_rows
+)
+
+# Rows per multi-row INSERT in bulk embedding saves, and the most items one request may carry
+EMBEDDING_BATCH_SIZE = 500
+MAX_EMBEDDING_BATCH_ITEMS = 10000
+
+# Most documents one ingest-full request may carry
+MAX_INGEST_BATCH_ITEMS = 100
+
+# Records read from the stream per executemany call in bulk embedding loads
+EMBEDDING_LOAD_CHUNK_ROWS = 5000
+
+# Raw upsert issued through the DBAPI cursor; PyMySQL folds executemany into multi-row INSERTs
+EMBEDDING_UPSERT_SQL = (
+    "INSERT INTO document_embedding (document_id, embedding, embedding_i8, embedding_scale) "
+    "VALUES (%s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE embedding = VALUES(embedding), embedding_i8 = VALUES(embedding_i8), "
+    "embedding_scale = VALUES(embedding_scale)"
+)
+
+# Category codes whose ids are kept in process (the set is small and categories are never deleted)
+CATEGORY_ID_CACHE_SIZE = 256
+
+# Category code -> id, filled only from committed rows
+_category_id_cache: Dict[str, int] = {}
 
 
 class DocumentService:
@@ -25,9 +58,9 @@ class DocumentService:
     """
     
     @staticmethod
-    def process_new_document(
-        db: Session,
-        file_content: BytesIO,
+    async def process_new_document(
+        db: AsyncSession,
+        file_content: BinaryIO,
         filename: str,
         owner_id: int,
         category_code: str,
@@ -42,7 +75,7 @@ class DocumentService:
         
         Args:
             db: Database session
-            file_content: File content (BytesIO)
+            file_content: Readable binary file object (e.g. the upload's spooled file)
             filename: Original filename
             owner_id: Document owner user ID
             category_code: Document category code (TAX, VISA, MED, etc.)
@@ -57,39 +90,21 @@ class DocumentService:
         """
         image_url = None
         try:
-            # Step 1: Upload file to storage
-            image_url = StorageClient.upload_image(
-                file_content=file_content,
-                filename=filename,
-                folder=f"documents/{owner_id}"
+            # Steps 1-3: Upload file to storage (blocking client, in a worker thread) while
+            # the category and event are looked up or created on this session
+            uploads, references = await asyncio.gather(
+                DocumentService._upload_files([(file_content, filename, owner_id)]),
+                DocumentService._resolve_references(db, {category_code}, {event_name} if event_name else set()),
+                return_exceptions=True
             )
-            
-            # Step 2: Get or create category
-            doc_category = db.query(DocumentCategory)\
-                .filter(DocumentCategory.code == category_code).first()
-            if not doc_category:
-                # Auto-create new category
-                doc_category = DocumentCategory(
-                    code=category_code,
-                    name=category_code.title(),
-                    description=f"Auto-created from document upload"
-                )
-                db.add(doc_category)
-                db.flush()  # Flush to get category.id
-            
-            # Step 3: Get or create event
-            event = None
-            if event_name:
-                event = db.query(Event)\
-                    .filter(Event.name == event_name).first()
-                if not event:
-                    event = Event(
-                        name=event_name,
-                        category=None,
-                        description=f"Auto-created event from document upload"
-                    )
-                    db.add(event)
-                    db.flush()  # Flush to get event.id
+            if not isinstance(uploads, BaseException):
+                image_url = uploads[0]
+            for outcome in (uploads, references):
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            category_ids, event_ids = references
+            category_id = category_ids[category_code]
+            event_id = event_ids[event_name] if event_name else None
             
             # Step 4: Create document record
             metadata = additional_metadata or {}
@@ -97,125 +112,525 @@ class DocumentService:
                 title=filename,
                 image_url=image_url,
                 owner_id=owner_id,
-                category_id=doc_category.id,
-                event_id=event.id if event else None,
+                category_id=category_id,
+                event_id=event_id,
                 doc_metadata=metadata
             )
             db.add(document)
-            db.commit()
-            db.refresh(document)
+            await db.commit()
             
             return document
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             
             # Cleanup: delete uploaded file if DB save failed
             if image_url:
                 try:
-                    StorageClient.delete_image(image_url)
+                    await asyncio.to_thread(StorageClient.delete_image, image_url)
                 except StorageException:
                     pass  # Log but don't raise
             
-            raise ValueError(f"Failed to process document: {str(e)}")
+            raise ValueError(f"Failed to process document: {str(e)}") from e
+    
+    @staticmethod
+    async def process_new_documents_batch(
+        db: AsyncSession,
+        owner_id: int,
+        items: List[Tuple[BinaryIO, str, str, Optional[str], Optional[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Batch variant of process_new_document: upload + save many documents at once
+        
+        Files are uploaded concurrently and all rows are written in one transaction
+        (see ingest_documents), instead of one transaction and 2-3 lookups per document.
+        
+        Args:
+            db: Database session
+            owner_id: Owner of every document in the batch
+            items: (file object, filename, category code, event name, metadata) per document
+            
+        Returns:
+            {"id", "filename", "url", "owner_id"} per created document, in input order
+            
+        Raises:
+            ValueError: If operation fails (with automatic cleanup)
+        """
+        return await DocumentService.ingest_documents(
+            db=db,
+            files=[(file_content, filename) for file_content, filename, _, _, _ in items],
+            items=[
+                IngestItem(
+                    owner_id=owner_id,
+                    category=category_code,
+                    event_name=event_name,
+                    status=None,
+                    metadata=metadata
+                )
+                for _, _, category_code, event_name, metadata in items
+            ]
+        )
+    
+    @staticmethod
+    async def ingest_documents(
+        db: AsyncSession,
+        files: List[Tuple[BinaryIO, str]],
+        items: List[IngestItem]
+    ) -> List[Dict[str, Any]]:
+        """
+        Register fully processed documents in one call: upload, document record,
+        OCR text, embedding and status
+        
+        Replaces the upload-and-process / save-ocr-and-embedding / status sequence
+        (three requests and three transactions per document) for the AI Service.
+        Files are uploaded concurrently, while categories and events are resolved with
+        one IN query each; documents and embeddings are written with multi-row INSERTs,
+        and everything is committed in a single transaction.
+        
+        Args:
+            db: Database session
+            files: (file object, original filename) per document
+            items: Document fields, one per file and in the same order
+            
+        Returns:
+            {"id", "filename", "url", "owner_id"} per created document, in input order
+            
+        Raises:
+            ValueError: If the input is invalid or the operation fails (uploaded files are removed)
+        """
+        if len(files) != len(items):
+            raise ValueError(f"Got {len(files)} files but {len(items)} items")
+        if len(items) > MAX_INGEST_BATCH_ITEMS:
+            raise ValueError(f"Too many items: {len(items)} (maximum {MAX_INGEST_BATCH_ITEMS})")
+        if not items:
+            return []
+        
+        image_urls: List[str] = []
+        try:
+            # Steps 1-2: Upload all files (blocking client, in worker threads) while categories
+            # and events are resolved (one query each, creating missing ones)
+            uploads, references = await asyncio.gather(
+                DocumentService._upload_files(
+                    [(file_content, filename, item.owner_id) for (file_content, filename), item in zip(files, items)]
+                ),
+                DocumentService._resolve_references(
+                    db, {item.category for item in items}, {item.event_name for item in items if item.event_name}
+                ),
+                return_exceptions=True
+            )
+            if not isinstance(uploads, BaseException):
+                image_urls = uploads
+            for outcome in (uploads, references):
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            category_ids, event_ids = references
+            
+            # Step 3: Document records
+            rows = []
+            for (_, filename), item, image_url in zip(files, items, image_urls):
+                metadata = dict(item.metadata or {})
+                if item.status:
+                    metadata["status"] = item.status
+                rows.append({
+                    "title": filename,
+                    "image_url": image_url,
+                    "owner_id": item.owner_id,
+                    "category_id": category_ids[item.category],
+                    "event_id": event_ids[item.event_name] if item.event_name else None,
+                    "ocr_text": item.ocr_text,
+                    "doc_metadata": metadata,
+                })
+            document_ids = await DocumentService._insert_documents(db, rows)
+            
+            # Step 4: Embeddings (packed float32 bytes plus the int8 copy)
+            embedded = [
+                (document_id, item) for document_id, item in zip(document_ids, items) if item.embedding
+            ]
+            if embedded:
+                await db.execute(
+                    insert(DocumentEmbedding),
+                    [{"document_id": document_id, **embedding_columns(item.embedding)} for document_id, item in embedded]
+                )
+            
+            await db.commit()
+            embedding_index.upsert(
+                (document_id, item.owner_id, item.embedding) for document_id, item in embedded
+            )
+            
+            return [
+                {"id": document_id, "filename": row["title"], "url": row["image_url"], "owner_id": row["owner_id"]}
+                for document_id, row in zip(document_ids, rows)
+            ]
+            
+        except Exception as e:
+            await db.rollback()
+            
+            # Cleanup: delete uploaded files if the DB save failed
+            await DocumentService._delete_uploads(image_urls)
+            
+            raise ValueError(f"Failed to ingest documents: {str(e)}") from e
+    
+    @staticmethod
+    async def _upload_files(files: List[Tuple[BinaryIO, str, int]]) -> List[str]:
+        """
+        Upload (file object, filename, owner id) entries concurrently in worker threads.
+        If any upload fails, the ones that succeeded are deleted and the error is raised.
+        """
+        uploads = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    StorageClient.upload_image,
+                    file_content=file_content,
+                    filename=filename,
+                    folder=f"documents/{owner_id}"
+                )
+                for file_content, filename, owner_id in files
+            ),
+            return_exceptions=True
+        )
+        failure = next((result for result in uploads if isinstance(result, BaseException)), None)
+        if failure is not None:
+            await DocumentService._delete_uploads([url for url in uploads if isinstance(url, str)])
+            raise failure
+        return uploads
+    
+    @staticmethod
+    async def _delete_uploads(image_urls: List[str]) -> None:
+        """Delete uploaded files concurrently, ignoring failures (cleanup path)"""
+        await asyncio.gather(
+            *(asyncio.to_thread(StorageClient.delete_image, image_url) for image_url in image_urls),
+            return_exceptions=True
+        )
+    
+    @staticmethod
+    async def _resolve_references(
+        db: AsyncSession,
+        category_codes: Set[str],
+        event_names: Set[str]
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Resolve category codes and event names to ids, one after the other on the session"""
+        category_ids = await DocumentService._resolve_categories(db, category_codes)
+        event_ids = await DocumentService._resolve_events(db, event_names) if event_names else {}
+        return category_ids, event_ids
+    
+    @staticmethod
+    async def _resolve_categories(db: AsyncSession, codes: Set[str]) -> Dict[str, int]:
+        """
+        Map category codes to ids, auto-creating missing categories in one INSERT.
+        Ids come from the in-process cache when possible; otherwise one query resolves
+        the rest and caches the rows that already existed (created rows are not cached
+        until they are read back by a later call, since this transaction may roll back).
+        """
+        category_ids = {code: _category_id_cache[code] for code in codes if code in _category_id_cache}
+        if len(category_ids) == len(codes):
+            return category_ids
+        
+        query = select(DocumentCategory.code, DocumentCategory.id)
+        existing = dict((await db.execute(
+            query.filter(DocumentCategory.code.in_(codes - category_ids.keys()))
+        )).all())
+        if len(_category_id_cache) + len(existing) > CATEGORY_ID_CACHE_SIZE:
+            _category_id_cache.clear()
+        _category_id_cache.update(existing)
+        category_ids.update(existing)
+        
+        missing = sorted(codes - category_ids.keys())
+        if missing:
+            # A concurrent upload may create the same code first; the no-op update
+            # on the unique code turns that race into a skipped row instead of an error
+            stmt = mysql_insert(DocumentCategory).values([
+                {"code": code, "name": code.title(), "description": "Auto-created from document upload"}
+                for code in missing
+            ])
+            await db.execute(stmt.on_duplicate_key_update(code=stmt.inserted.code))
+            category_ids.update((await db.execute(query.filter(DocumentCategory.code.in_(missing)))).all())
+        return category_ids
+    
+    @staticmethod
+    async def _resolve_events(db: AsyncSession, names: Set[str]) -> Dict[str, int]:
+        """Map event names to ids with one query, auto-creating missing events in one INSERT"""
+        if not names:
+            return {}
+        query = select(Event.name, Event.id).order_by(Event.id.desc())
+        # Descending ids: with duplicate names, the dict keeps the oldest event
+        event_ids = dict((await db.execute(query.filter(Event.name.in_(names)))).all())
+        missing = sorted(names - event_ids.keys())
+        if missing:
+            await db.execute(
+                insert(Event),
+                [
+                    {"name": name, "category": None, "description": "Auto-created event from document upload"}
+                    for name in missing
+                ]
+            )
+            event_ids.update((await db.execute(query.filter(Event.name.in_(missing)))).all())
+        return event_ids
+    
+    @staticmethod
+    async def _insert_documents(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert document rows with one executemany INSERT and return their ids in input order.
+        MySQL has no INSERT ... RETURNING, so ids are read back by the rows' unique image URLs.
+        """
+        await db.execute(insert(Document), rows)
+        result = await db.execute(
+            select(Document.image_url, Document.id).filter(
+                Document.owner_id.in_({row["owner_id"] for row in rows}),
+                Document.image_url.in_([row["image_url"] for row in rows])
+            )
+        )
+        document_ids = dict(result.all())
+        return [document_ids[row["image_url"]] for row in rows]
     
     @staticmethod
-    def save_embedding_and_ocr(
-        db: Session,
+    async def save_embedding_and_ocr(
+        db: AsyncSession,
         document_id: int,
         ocr_text: str,
-        embedding: List[float]
-    ) -> DocumentEmbedding:
+        embedding: np.ndarray
+    ) -> None:
         """
         Save OCR text and vector embedding for a document
         
-        Called by AI Service after processing document with OCR and embeddings
+        Called by AI Service after processing document with OCR and embeddings.
+        Only the owner id is read; the OCR text and the embedding are written with
+        one UPDATE and one upsert, without loading either row.
         
         Args:
             db: Database session
             document_id: Document to update
             ocr_text: Extracted text from OCR
-            embedding: Vector embedding (list of floats)
-            
-        Returns:
-            DocumentEmbedding record
+            embedding: Vector embedding (float32 array, see as_embedding)
             
         Raises:
-            ValueError: If document not found or save fails
+            NotFoundError: If document not found
+            ValueError: If save fails
         """
         try:
-            # Verify document exists
-            document = db.query(Document)\
-                .filter(Document.id == document_id).first()
-            if not document:
-                raise ValueError(f"Document {document_id} not found")
+            # Verify document exists (owner id is needed for the search index); the
+            # lambda statements on these hot paths are built and compiled once per process
+            owner_id = await db.scalar(lambda_stmt(
+                lambda: select(Document.owner_id).filter(Document.id == document_id)
+            ))
+            if owner_id is None:
+                raise NotFoundError(f"Document {document_id} not found")
             
             # Update OCR text
-            document.ocr_text = ocr_text
-            
-            # Save or update embedding
-            embedding_record = db.query(DocumentEmbedding)\
-                .filter(DocumentEmbedding.document_id == document_id).first()
-            
-            if embedding_record:
-                embedding_record.embedding = embedding
-            else:
-                embedding_record = DocumentEmbedding(
-                    document_id=document_id,
-                    embedding=embedding
-                )
-                db.add(embedding_record)
+            await db.execute(
+                update(Document).where(Document.id == document_id).values(ocr_text=ocr_text)
+                .execution_options(synchronize_session=False)
+            )
             
-            db.commit()
-            db.refresh(embedding_record)
+            # Save or update embedding (packed float32 bytes plus the int8 copy)
+            stmt = mysql_insert(DocumentEmbedding).values(document_id=document_id, **embedding_columns(embedding))
+            await db.execute(stmt.on_duplicate_key_update(
+                embedding=stmt.inserted.embedding,
+                embedding_i8=stmt.inserted.embedding_i8,
+                embedding_scale=stmt.inserted.embedding_scale
+            ))
             
-            return embedding_record
+            await db.commit()
+            embedding_index.upsert([(document_id, owner_id, embedding)])
             
+        except ValueError:
+            raise
         except Exception as e:
-            db.rollback()
-            raise ValueError(f"Failed to save embedding: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"Failed to save embedding: {str(e)}") from e
     
     @staticmethod
-    def search_by_embedding(
-        db: Session,
-        embedding: List[float],
-        limit: int = 10,
-        owner_id: Optional[int] = None
-    ) -> List[Document]:
+    async def save_embeddings_bulk(
+        db: AsyncSession,
+        items: List[BatchEmbeddingItem],
+        batch_size: int = EMBEDDING_BATCH_SIZE
+    ) -> Dict[str, Any]:
         """
-        Search documents by vector similarity
+        Save OCR text and vector embeddings for many documents in one transaction
         
-        Called by AI Service for semantic search
+        Called by AI Service for bulk backfills. Embeddings are written with multi-row
+        INSERT ... ON DUPLICATE KEY UPDATE statements of `batch_size` rows, and OCR
+        texts with one executemany UPDATE per batch, followed by a single commit.
         
         Args:
             db: Database session
-            embedding: Query embedding vector
-            limit: Maximum results to return
-            owner_id: Optional filter by owner
+            items: Documents with OCR text and embedding
+            batch_size: Rows per INSERT statement
             
         Returns:
-            List of similar documents (ordered by similarity)
+            Dictionary with the number of saved documents and the IDs that were not found
+            
+        Raises:
+            ValueError: If there are too many items or the save fails
         """
+        if len(items) > MAX_EMBEDDING_BATCH_ITEMS:
+            raise ValueError(f"Too many items: {len(items)} (maximum {MAX_EMBEDDING_BATCH_ITEMS})")
+        
         try:
-            query = db.query(Document)\
-                .join(DocumentEmbedding, Document.id == DocumentEmbedding.document_id)
+            saved = 0
+            missing = []
+            owners: Dict[int, int] = {}
+            
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                
+                # Skip items whose document does not exist (the foreign key would reject the whole INSERT)
+                result = await db.execute(
+                    select(Document.id, Document.owner_id).filter(Document.id.in_([item.document_id for item in batch]))
+                )
+                existing = dict(result.all())
+                owners.update(existing)
+                missing.extend(item.document_id for item in batch if item.document_id not in existing)
+                batch = [item for item in batch if item.document_id in existing]
+                if not batch:
+                    continue
+                
+                await db.execute(
+                    update(Document),
+                    [{"id": item.document_id, "ocr_text": item.ocr_text} for item in batch]
+                )
+                
+                stmt = mysql_insert(DocumentEmbedding).values([
+                    {"document_id": item.document_id, **embedding_columns(item.embedding)}
+                    for item in batch
+                ])
+                await db.execute(stmt.on_duplicate_key_update(
+                    embedding=stmt.inserted.embedding,
+                    embedding_i8=stmt.inserted.embedding_i8,
+                    embedding_scale=stmt.inserted.embedding_scale
+                ))
+                saved += len(batch)
+            
+            await db.commit()
+            embedding_index.upsert(
+                (item.document_id, owners[item.document_id], item.embedding)
+                for item in items if item.document_id in owners
+            )
             
-            if owner_id:
-                query = query.filter(Document.owner_id == owner_id)
+            return {"saved": saved, "missing_document_ids": missing}
             
-            documents = query.all()
+        except Exception as e:
+            await db.rollback()
+            raise ValueError(f"Failed to save embeddings: {str(e)}") from e
+    
+    @staticmethod
+    async def bulk_load_embeddings(db: AsyncSession, stream: BinaryIO) -> int:
+        """
+        Load embeddings from a packed binary stream through the raw DBAPI cursor
+        
+        Used for initial indexing and backfills. The stream starts with the embedding
+        dimension D as a little-endian uint32, followed by fixed-size records of a
+        little-endian int32 document ID and D little-endian float32 values. Records are
+        read in chunks with numpy and upserted with cursor.executemany, bypassing
+        SQLAlchemy's per-row parameter processing. Everything is committed once at the end.
+        
+        Args:
+            db: Database session
+            stream: Binary stream in the format described above
             
-            # TODO: Calculate similarity scores and sort
-            # This requires vector similarity computation (cosine, euclidean, etc.)
-            # For now, return all documents
+        Returns:
+            Number of embeddings loaded
             
-            return documents[:limit]
+        Raises:
+            ValueError: If the stream is malformed or the load fails
+        """
+        header = stream.read(4)
+        if len(header) != 4:
+            raise ValueError("Embedding stream is missing its dimension header")
+        dimension = int(np.frombuffer(header, dtype="<u4")[0])
+        if dimension == 0:
+            raise ValueError("Embedding dimension must be positive")
+        
+        record_dtype = np.dtype([("document_id", "<i4"), ("embedding", EMBEDDING_DTYPE, (dimension,))])
+        
+        try:
+            loaded = await db.run_sync(DocumentService._load_embedding_records, stream, record_dtype)
+            await db.commit()
+            embedding_index.invalidate()
+            return loaded
             
         except Exception as e:
-            raise ValueError(f"Failed to search documents: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"Failed to load embeddings: {str(e)}") from e
+    
+    @staticmethod
+    def _load_embedding_records(session: Session, stream: BinaryIO, record_dtype: np.dtype) -> int:
+        """
+        Upsert packed embedding records with executemany on the raw DBAPI cursor.
+        Runs through AsyncSession.run_sync, where the driver's cursor calls are awaited transparently.
+        
+        Args:
+            session: Synchronous view of the request's session
+            stream: Binary stream positioned after the dimension header
+            record_dtype: numpy dtype of one (document_id, embedding) record
+            
+        Returns:
+            Number of records upserted
+        """
+        cursor = session.connection().connection.cursor()
+        loaded = 0
+        try:
+            while True:
+                chunk = stream.read(record_dtype.itemsize * EMBEDDING_LOAD_CHUNK_ROWS)
+                if not chunk:
+                    break
+                if len(chunk) % record_dtype.itemsize:
+                    raise ValueError("Embedding stream ends with a partial record")
+                
+                records = np.frombuffer(chunk, dtype=record_dtype)
+                quantized, scales = quantize_rows(records["embedding"])
+                cursor.executemany(
+                    EMBEDDING_UPSERT_SQL,
+                    [
+                        (int(document_id), embedding.tobytes(), row.tobytes(), float(scale))
+                        for document_id, embedding, row, scale
+                        in zip(records["document_id"], records["embedding"], quantized, scales)
+                    ]
+                )
+                loaded += len(records)
+            return loaded
+        finally:
+            cursor.close()
     
     @staticmethod
-    def get_document_with_details(db: Session, document_id: int) -> Document:
+    async def search_by_embedding(
+        db: AsyncSession,
+        embedding: np.ndarray,
+        limit: int = 10,
+        owner_id: Optional[int] = None,
+        rescore_multiplier: int = RESCORE_MULTIPLIER
+    ) -> List[Dict[str, Any]]:
+        """
+        Search documents by vector similarity
+        
+        Called by AI Service for semantic search. Candidates are picked from the
+        in-memory int8 embedding matrix and re-ranked exactly (see EmbeddingIndex),
+        and only the top `limit` documents are fetched, as plain rows rather than
+        ORM instances.
+        
+        Args:
+            db: Database session
+            embedding: Query embedding vector (float32 array, see as_embedding)
+            limit: Maximum results to return
+            owner_id: Optional filter by owner
+            rescore_multiplier: int8 candidates re-scored in float32 per result
+            
+        Returns:
+            List of {"id", "filename", "owner_id"} dicts (most similar first)
+        """
+        top_ids = await embedding_index.search(db, embedding, limit, owner_id, rescore_multiplier)
+        if not top_ids:
+            return []
+        
+        result = await db.execute(lambda_stmt(
+            lambda: select(Document.id, Document.title.label("filename"), Document.owner_id)
+            .filter(Document.id.in_(top_ids))
+        ))
+        by_id = {row["id"]: dict(row) for row in result.mappings()}
+        
+        return [by_id[document_id] for document_id in top_ids if document_id in by_id]
+    
+    @staticmethod
+    async def get_document_with_details(db: AsyncSession, document_id: int) -> Document:
         """
         Get complete document information including all relations
         
@@ -229,71 +644,76 @@ class DocumentService:
             Document with all related data loaded
             
         Raises:
-            ValueError: If document not found
+            NotFoundError: If document not found
         """
-        try:
-            document = db.query(Document)\
-                .filter(Document.id == document_id).first()
-            
-            if not document:
-                raise ValueError(f"Document {document_id} not found")
-            
-            # Ensure relations are loaded
-            _ = document.category_id
-            _ = document.owner_id
-            _ = document.event_id
-            
-            return document
-            
-        except Exception as e:
-            raise ValueError(f"Failed to get document: {str(e)}")
+        # Primary-key get: served from the session's identity map when already loaded,
+        # otherwise category, owner and event come back in the same query
+        document = await db.get(
+            Document,
+            document_id,
+            options=[
+                joinedload(Document.category),
+                joinedload(Document.owner, innerjoin=True),
+                joinedload(Document.event)
+            ]
+        )
+        
+        if not document:
+            raise NotFoundError(f"Document {document_id} not found")
+        
+        return document
     
     @staticmethod
-    def update_document_status(
-        db: Session,
+    async def update_document_status(
+        db: AsyncSession,
         document_id: int,
         status: str,
         metadata_update: Optional[Dict[str, Any]] = None
-    ) -> Document:
+    ) -> Dict[str, Any]:
         """
         Update document status and metadata
         
-        Called by AI Service to update processing status
+        Called by AI Service to update processing status. The merge runs in MySQL
+        (JSON_MERGE_PATCH) as a single UPDATE instead of a read-modify-write of the row.
         
         Args:
             db: Database session
             document_id: Document ID
             status: New status (e.g., "processing", "completed", "failed")
-            metadata_update: Additional metadata to merge
+            metadata_update: Additional metadata to merge (keys set to null are removed)
             
         Returns:
-            Updated Document
+            {"id", "updated_at"} of the updated document
             
         Raises:
-            ValueError: If document not found or update fails
+            NotFoundError: If document not found
+            ValueError: If update fails
         """
         try:
-            document = db.query(Document)\
-                .filter(Document.id == document_id).first()
-            
-            if not document:
-                raise ValueError(f"Document {document_id} not found")
-            
-            # Update metadata with status
-            if not document.doc_metadata:
-                document.doc_metadata = {}
-            
-            document.doc_metadata["status"] = status
+            patch = {"status": status, **(metadata_update or {})}
+            await db.execute(
+                update(Document).where(Document.id == document_id).values(
+                    doc_metadata=func.json_merge_patch(
+                        func.coalesce(Document.doc_metadata, cast({}, JSON)),
+                        cast(patch, JSON)
+                    )
+                ).execution_options(synchronize_session=False)
+            )
             
-            if metadata_update:
-                document.doc_metadata.update(metadata_update)
+            result = await db.execute(lambda_stmt(
+                lambda: select(Document.id, Document.updated_at).filter(Document.id == document_id)
+            ))
+            document = result.mappings().one_or_none()
+            if document is None:
+                raise NotFoundError(f"Document {document_id} not found")
             
-            db.commit()
-            db.refresh(document)
+            await db.commit()
             
-            return document
+            return dict(document)
             
+        except ValueError:
+            raise
         except Exception as e:
-            db.rollback()
-            raise ValueError(f"Failed to update document: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"Failed to update document: {str(e)}") from e
 
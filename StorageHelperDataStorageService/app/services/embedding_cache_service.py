@@ -0,0 +1,78 @@
+"""
+Embedding cache service - content-addressed lookups for re-embedded text
+"""
+import hashlib
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
+
+import numpy as np
+
+from app.models.embedding_cache import EmbeddingCache
+from app.services.document_service import EMBEDDING_DTYPE
+
+
+class EmbeddingCacheService:
+    """Service for the text -> embedding cache"""
+    
+    @staticmethod
+    def content_hash(text: str, model: str) -> bytes:
+        """
+        Hash text together with the embedding model that produced its vector
+        
+        Args:
+            text: Text that was embedded
+            model: Embedding model identifier
+            
+        Returns:
+            32-byte blake2b digest
+        """
+        return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=32).digest()
+    
+    @staticmethod
+    async def get_embedding(db: AsyncSession, text: str, model: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding
+        
+        Args:
+            db: Database session
+            text: Text that was embedded
+            model: Embedding model identifier
+            
+        Returns:
+            Embedding vector, or None on a cache miss
+        """
+        packed = await db.scalar(
+            select(EmbeddingCache.embedding)
+            .filter(EmbeddingCache.content_hash == EmbeddingCacheService.content_hash(text, model))
+        )
+        if packed is None:
+            return None
+        return np.frombuffer(packed, dtype=EMBEDDING_DTYPE).tolist()
+    
+    @staticmethod
+    async def put_embedding(db: AsyncSession, text: str, model: str, embedding: List[float]) -> None:
+        """
+        Store an embedding; an entry that already exists is left as-is
+        
+        Args:
+            db: Database session
+            text: Text that was embedded
+            model: Embedding model identifier
+            embedding: Embedding vector
+            
+        Raises:
+            ValueError: If the write fails
+        """
+        try:
+            stmt = mysql_insert(EmbeddingCache).prefix_with("IGNORE").values(
+                content_hash=EmbeddingCacheService.content_hash(text, model),
+                model=model,
+                embedding=np.asarray(embedding, dtype=EMBEDDING_DTYPE).tobytes()
+            )
+            await db.execute(stmt)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise ValueError(f"Failed to cache embedding: {str(e)}") from e
@@ -0,0 +1,314 @@
+"""
+In-memory embedding matrix for semantic search
+"""
+import asyncio
+import time
+from sqlalchemy import select, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Dict, Tuple, Iterable, Sequence, Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.document import Document
+from app.models.document_embedding import DocumentEmbedding
+
+# Embeddings are stored as packed little-endian float32 bytes
+EMBEDDING_DTYPE = "<f4"
+
+# Rows fetched per round trip while loading the matrix
+LOAD_BATCH_ROWS = 1000
+
+# int8 rows widened to float32 per scoring block (bounds the temporary copy)
+SCORE_BLOCK_ROWS = 4096
+
+# Default number of candidates re-scored exactly from float32 per requested result
+RESCORE_MULTIPLIER = 4
+
+# Hash partitions of the matrix by owner_id (owner_id % OWNER_SHARDS)
+OWNER_SHARDS = 16
+
+# Embeddings written since the last load that are kept aside before a full reload is forced
+MAX_PENDING_EMBEDDINGS = 1000
+
+# (dimension, shard) -> (document ids, owner ids, (N, D) int8 matrix, (N,) per-row scales to unit length),
+# rows ordered by owner id
+Matrices = Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+
+
+def quantize_rows(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization: row ~= quantized * scale
+    
+    Args:
+        matrix: (N, D) float matrix
+        
+    Returns:
+        (N, D) int8 matrix and (N,) float32 scales (all-zero rows get scale 1)
+    """
+    max_abs = np.max(np.abs(matrix), axis=1)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    quantized = np.clip(np.round(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales
+
+
+def as_embedding(values: Sequence[float]) -> np.ndarray:
+    """
+    Contiguous float32 vector for an embedding given as a list of floats
+    
+    Args:
+        values: Embedding values (an array already in that layout is returned as-is)
+        
+    Returns:
+        (D,) float32 array
+    """
+    return np.ascontiguousarray(values, dtype=EMBEDDING_DTYPE)
+
+
+def embedding_columns(embedding: np.ndarray) -> Dict[str, Any]:
+    """
+    DocumentEmbedding column values for one embedding
+    
+    Args:
+        embedding: Embedding vector (float32 arrays are packed without a copy)
+        
+    Returns:
+        Packed float32 "embedding", packed int8 "embedding_i8" and its "embedding_scale"
+    """
+    vector = as_embedding(embedding)
+    quantized, scales = quantize_rows(vector[None, :])
+    return {
+        "embedding": vector.tobytes(),
+        "embedding_i8": quantized[0].tobytes(),
+        "embedding_scale": float(scales[0]),
+    }
+
+
+class EmbeddingIndex:
+    """
+    All stored embeddings held in memory, so a query is scored without reading every
+    embedding row from the database.
+    
+    Matrices are split per dimension and hash-partitioned by owner into OWNER_SHARDS
+    shards, with rows ordered by owner id inside each shard. An owner-filtered query
+    scores one contiguous slice of one shard instead of masking every row.
+    
+    Rows are loaded from the stored int8 copies (a quarter of the float32 bytes to
+    read and hold) with a per-row scale to unit length, so quantized * scale is the
+    unit-length row. The int8 scores pick rescore_multiplier * limit candidates, whose
+    float32 embeddings are then fetched by primary key to rank them exactly.
+    
+    Writes through DocumentService are applied incrementally: new or replaced
+    embeddings are kept as float32 unit rows beside the matrices (superseding any
+    stale matrix row) until the next load, so a write never forces the whole table
+    to be re-read. Writes made by other worker processes are picked up once the
+    matrix is older than `ttl` seconds.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._matrices: Optional[Matrices] = None
+        # document id -> (owner id, float32 unit vector), written since the last load
+        self._pending: Dict[int, Tuple[int, np.ndarray]] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    def invalidate(self) -> None:
+        """Drop the matrix; the next search reloads it"""
+        self._matrices = None
+        self._pending = {}
+    
+    def upsert(self, entries: Iterable[Tuple[int, int, np.ndarray]]) -> None:
+        """
+        Apply saved embeddings to the loaded index without reloading it
+        
+        Args:
+            entries: (document id, owner id, embedding) per saved embedding
+        """
+        if self._matrices is None and not self._lock.locked():
+            return  # Nothing loaded or loading; the first search loads the saved rows
+        
+        entries = list(entries)
+        if len(self._pending) + len(entries) > MAX_PENDING_EMBEDDINGS:
+            self.invalidate()
+            return
+        
+        for document_id, owner_id, embedding in entries:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            self._pending[document_id] = (owner_id, vector / norm if norm > 0 else vector)
+    
+    async def search(
+        self,
+        db: AsyncSession,
+        embedding: np.ndarray,
+        limit: int,
+        owner_id: Optional[int] = None,
+        rescore_multiplier: int = RESCORE_MULTIPLIER
+    ) -> List[int]:
+        """
+        Rank documents by cosine similarity to a query vector
+        
+        Args:
+            db: Database session
+            embedding: Query embedding vector
+            limit: Maximum results to return
+            owner_id: Optional filter by owner
+            rescore_multiplier: int8 candidates re-scored in float32 per result
+                (higher trades speed for recall)
+            
+        Returns:
+            Document IDs, most similar first
+        """
+        query_vector = as_embedding(embedding)
+        if limit <= 0:
+            return []
+        matrices = await self._get_matrices(db)
+        
+        query_norm = float(np.linalg.norm(query_vector))
+        if query_norm > 0:
+            query_vector = query_vector / query_norm
+        
+        dimension = query_vector.shape[0]
+        shards = [owner_id % OWNER_SHARDS] if owner_id else range(OWNER_SHARDS)
+        
+        # Stage 1: approximate cosine scores from the int8 rows of the relevant shards
+        shard_ids = []
+        shard_scores = []
+        for shard in shards:
+            entry = matrices.get((dimension, shard))
+            if entry is None:
+                continue
+            ids, owners, quantized, scales = entry
+            if owner_id:
+                # Rows are ordered by owner, so the owner's rows are one slice (no copy)
+                rows = slice(
+                    np.searchsorted(owners, owner_id, side="left"),
+                    np.searchsorted(owners, owner_id, side="right")
+                )
+                ids, quantized, scales = ids[rows], quantized[rows], scales[rows]
+            if ids.shape[0]:
+                shard_ids.append(ids)
+                shard_scores.append(self._int8_scores(quantized, scales, query_vector))
+        
+        # Rows written since the load replace their matrix versions and are scored exactly
+        if self._pending:
+            stale = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+            for position, ids in enumerate(shard_ids):
+                fresh = ~np.isin(ids, stale)
+                shard_ids[position], shard_scores[position] = ids[fresh], shard_scores[position][fresh]
+            
+            pending = [
+                (document_id, vector) for document_id, (owner, vector) in self._pending.items()
+                if vector.shape[0] == dimension and (not owner_id or owner == owner_id)
+            ]
+            if pending:
+                shard_ids.append(np.asarray([document_id for document_id, _ in pending], dtype=np.int64))
+                shard_scores.append(np.stack([vector for _, vector in pending]) @ query_vector)
+        
+        if not shard_ids:
+            return []
+        
+        ids = np.concatenate(shard_ids)
+        scores = np.concatenate(shard_scores)
+        if ids.shape[0] == 0:
+            return []
+        n_candidates = min(limit * max(rescore_multiplier, 1), ids.shape[0])
+        candidates = ids[np.argpartition(-scores, n_candidates - 1)[:n_candidates]]
+        
+        # Stage 2: exact float32 scores for the candidates only
+        result = await db.execute(
+            select(DocumentEmbedding.document_id, DocumentEmbedding.embedding)
+            .filter(DocumentEmbedding.document_id.in_(candidates.tolist()))
+        )
+        exact_ids = []
+        buffers = []
+        row_bytes = query_vector.shape[0] * np.dtype(EMBEDDING_DTYPE).itemsize
+        for document_id, vector in result:
+            if vector is not None and len(vector) == row_bytes:
+                exact_ids.append(document_id)
+                buffers.append(vector)
+        if not exact_ids:
+            return []
+        
+        matrix = np.frombuffer(b"".join(buffers), dtype=EMBEDDING_DTYPE).reshape(len(exact_ids), -1)
+        norms = np.linalg.norm(matrix, axis=1)
+        exact = (matrix @ query_vector) / np.where(norms > 0, norms, 1.0)
+        
+        # Partial sort: select the top `limit` scores, then order just those
+        k = min(limit, len(exact_ids))
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top])]
+        return [exact_ids[i] for i in top]
+    
+    @staticmethod
+    def _int8_scores(quantized: np.ndarray, scales: np.ndarray, unit_query: np.ndarray) -> np.ndarray:
+        """Approximate cosine scores of a unit query against int8 rows, block by block"""
+        scores = np.empty(quantized.shape[0], dtype=np.float32)
+        for start in range(0, quantized.shape[0], SCORE_BLOCK_ROWS):
+            block = slice(start, start + SCORE_BLOCK_ROWS)
+            scores[block] = (quantized[block] @ unit_query) * scales[block]
+        return scores
+    
+    async def _get_matrices(self, db: AsyncSession) -> Matrices:
+        """Return the loaded matrices, (re)loading them if missing or expired"""
+        if self._matrices is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._matrices
+        
+        async with self._lock:
+            # Another request may have loaded it while we waited
+            if self._matrices is None or time.monotonic() - self._loaded_at >= self.ttl:
+                loaded_at = time.monotonic()
+                # Writes committed from here on may be missed by the load; they land in _pending
+                self._pending = {}
+                self._matrices = await self._load(db)
+                self._loaded_at = loaded_at
+            return self._matrices
+    
+    @staticmethod
+    async def _load(db: AsyncSession) -> Matrices:
+        """Stream every embedding and stack them into per-(dimension, shard) int8 matrices"""
+        # float32 bytes are only fetched for rows saved before the int8 copy existed
+        query = select(
+            DocumentEmbedding.document_id,
+            Document.owner_id,
+            DocumentEmbedding.embedding_i8,
+            case((DocumentEmbedding.embedding_i8.is_(None), DocumentEmbedding.embedding), else_=None)
+        ).join(Document, Document.id == DocumentEmbedding.document_id)
+        
+        # (dimension, shard) -> (ids, owners, packed int8 buffers)
+        groups: Dict[Tuple[int, int], Tuple[list, list, list]] = {}
+        itemsize = np.dtype(EMBEDDING_DTYPE).itemsize
+        rows = await db.stream(query.execution_options(yield_per=LOAD_BATCH_ROWS))
+        async for document_id, owner_id, quantized, vector in rows:
+            if not quantized:
+                if not vector or len(vector) % itemsize:
+                    continue
+                quantized = quantize_rows(np.frombuffer(vector, dtype=EMBEDDING_DTYPE)[None, :])[0].tobytes()
+            key = (len(quantized), owner_id % OWNER_SHARDS)
+            ids, owners, buffers = groups.setdefault(key, ([], [], []))
+            ids.append(document_id)
+            owners.append(owner_id)
+            buffers.append(quantized)
+        
+        matrices = {}
+        for (dimension, shard), (ids, owners, buffers) in groups.items():
+            owners = np.asarray(owners, dtype=np.int64)
+            order = np.argsort(owners, kind="stable")
+            quantized = np.frombuffer(b"".join(buffers), dtype=np.int8).reshape(len(ids), dimension)[order]
+            
+            # Scale each row to unit length (int32 accumulation; no float copy of the matrix)
+            norms = np.sqrt(np.einsum("ij,ij->i", quantized, quantized, dtype=np.int32)).astype(np.float32)
+            scales = (1.0 / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+            
+            matrices[(dimension, shard)] = (
+                np.asarray(ids, dtype=np.int64)[order],
+                owners[order],
+                quantized,
+                scales,
+            )
+        return matrices
+
+
+# Process-wide index shared by all requests
+embedding_index = EmbeddingIndex(ttl=settings.EMBEDDING_INDEX_TTL)
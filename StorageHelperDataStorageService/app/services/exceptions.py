@@ -0,0 +1,7 @@
+"""
+Service-layer exceptions
+"""
+
+
+class NotFoundError(ValueError):
+    """A requested record does not exist (reported as 404)"""
@@ -1,18 +1,28 @@
 """
 User business logic service
 """
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.services.exceptions import NotFoundError
+
+# Built once: validates a whole row list in a single call into pydantic-core
+_USER_LIST_ADAPTER = TypeAdapter(list[UserResponse])
+
+# Users per page when listing, and the most one page may hold
+DEFAULT_USER_PAGE_SIZE = 100
+MAX_USER_PAGE_SIZE = 1000
 
 
 class UserService:
     """Service for user-related business logic"""
     
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """
         Create a new user
         
@@ -32,31 +42,47 @@ class UserService:
                 note=user_data.note
             )
             db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            await db.commit()
             return new_user
         except IntegrityError as e:
-            db.rollback()
-            raise ValueError(f"User creation failed: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"User creation failed: {str(e)}") from e
         except Exception as e:
-            db.rollback()
-            raise ValueError(f"Unexpected error during user creation: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"Unexpected error during user creation: {str(e)}") from e
     
     @staticmethod
-    def get_all_users(db: Session) -> list[User]:
+    async def get_all_users(
+        db: AsyncSession,
+        cursor: int = 0,
+        limit: int = DEFAULT_USER_PAGE_SIZE
+    ) -> list[UserResponse]:
         """
-        Get all users
+        Get one page of users, ordered by ID
+        
+        Keyset pagination: the page starts after `cursor` (the last ID of the previous
+        page), so each page is a primary-key range scan however deep it is. Rows are
+        fetched as plain columns and validated straight into response schemas in one
+        batch, skipping ORM identity-map materialization per row.
         
         Args:
             db: Database session
+            cursor: Return users with an ID greater than this
+            limit: Maximum users to return
             
         Returns:
-            List of all users
+            Up to `limit` users
         """
-        return db.query(User).all()
+        result = await db.execute(
+            select(User.id, User.display_name, User.note, User.created_at, User.updated_at)
+            .filter(User.id > cursor)
+            .order_by(User.id)
+            .limit(limit)
+        )
+        return _USER_LIST_ADAPTER.validate_python(result.mappings().all())
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> User:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
         """
         Get a user by ID
         
@@ -67,10 +93,10 @@ class UserService:
         Returns:
             User object if found, None otherwise
         """
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
+    async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate) -> User:
         """
         Update a user
         
@@ -83,13 +109,14 @@ class UserService:
             Updated user object
             
         Raises:
-            ValueError: If user not found or update fails
+            NotFoundError: If user not found
+            ValueError: If update fails
         """
         try:
-            user = UserService.get_user_by_id(db, user_id)
+            user = await UserService.get_user_by_id(db, user_id)
             
             if not user:
-                raise ValueError(f"User with ID {user_id} not found")
+                raise NotFoundError(f"User with ID {user_id} not found")
             
             # Update only provided fields
             if user_data.display_name is not None:
@@ -97,17 +124,16 @@ class UserService:
             if user_data.note is not None:
                 user.note = user_data.note
             
-            db.commit()
-            db.refresh(user)
+            await db.commit()
             return user
         except ValueError:
             raise
         except Exception as e:
-            db.rollback()
-            raise ValueError(f"Failed to update user: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"Failed to update user: {str(e)}") from e
     
     @staticmethod
-    def delete_user(db: Session, user_id: int) -> bool:
+    async def delete_user(db: AsyncSession, user_id: int) -> bool:
         """
         Delete a user
         
@@ -119,19 +145,20 @@ class UserService:
             True if deletion successful
             
         Raises:
-            ValueError: If user not found or deletion fails
+            NotFoundError: If user not found
+            ValueError: If deletion fails
         """
         try:
-            user = UserService.get_user_by_id(db, user_id)
+            user = await UserService.get_user_by_id(db, user_id)
             
             if not user:
-                raise ValueError(f"User with ID {user_id} not found")
+                raise NotFoundError(f"User with ID {user_id} not found")
             
-            db.delete(user)
-            db.commit()
+            await db.delete(user)
+            await db.commit()
             return True
         except ValueError:
             raise
         except Exception as e:
-            db.rollback()
-            raise ValueError(f"Failed to delete user: {str(e)}")
+            await db.rollback()
+            raise ValueError(f"Failed to delete user: {str(e)}") from e
@@ -5,76 +5,90 @@ Minimal setup with only essential routes:
 - /api/users - User management (create user)
 - /api/v1 - Public API for AI Service (high-level operations)
 """
+import asyncio
 import logging
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, Base, warmup_db, ping_db
 from app.routes import users, public_api
+from app.services.exceptions import NotFoundError
 # Import all models to register them with SQLAlchemy
 from app.models import (
     User, DocumentCategory, StorageLocation, Event, 
-    Document, DocumentEmbedding, FeedbackMessage
+    Document, DocumentEmbedding, FeedbackMessage, EmbeddingCache
 )
 
 # Configure logging
 logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Seconds a successful database ping answers /health probes without pinging again
+HEALTH_CHECK_TTL = 1.0
+# Seconds a ping may take before the database is reported unreachable
+HEALTH_CHECK_TIMEOUT = 2.0
 
-# Initialize FastAPI app
+_last_db_ping = 0.0
+
+# Initialize FastAPI app (responses are serialized with orjson)
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware only when browser origins are configured
+if settings.CORS_ALLOWED_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-# Include routers
-app.include_router(users.router, prefix="/api", tags=["users"])
-app.include_router(public_api.router, tags=["public-api"])
 
+@app.exception_handler(NotFoundError)
+async def not_found_error_handler(request: Request, exc: NotFoundError):
+    """Service-layer errors for a missing record"""
+    return ORJSONResponse({"detail": str(exc)}, status_code=status.HTTP_404_NOT_FOUND)
 
-@app.get("/", tags=["root"])
-def root():
-    """Root endpoint"""
-    return {
-        "service": settings.API_TITLE,
-        "version": settings.API_VERSION,
-        "status": "running"
-    }
 
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError):
+    """Other service-layer errors (invalid input, failed writes)"""
+    return ORJSONResponse({"detail": str(exc)}, status_code=status.HTTP_400_BAD_REQUEST)
 
-@app.get("/health", tags=["health"])
-def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "database": "connected"
-    }
 
+@app.exception_handler(Exception)
+async def unhandled_error_handler(request: Request, exc: Exception):
+    """Anything else is reported as an internal error"""
+    logger.exception(f"Unhandled error on {request.method} {request.url.path}")
+    return ORJSONResponse({"detail": str(exc)}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level=settings.LOG_LEVEL.lower()
-    )
 
+@app.on_event("startup")
+async def startup():
+    """Create tables if enabled, then warm up the async connection pool"""
+    if settings.AUTO_CREATE_TABLES:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await warmup_db()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled async connections"""
+    await async_engine.dispose()
+
+
+# Include routers
+app.include_router(users.router, prefix="/api", tags=["users"])
+app.include_router(public_api.router, tags=["public-api"])
 
 
 @app.get("/", tags=["root"])
@@ -88,8 +102,25 @@ def root():
 
 
 @app.get("/health", tags=["health"])
-def health_check():
-    """Health check endpoint"""
+async def health_check():
+    """
+    Health check endpoint
+    
+    Pings the database with SELECT 1; a successful ping is reused for
+    HEALTH_CHECK_TTL seconds so frequent probes don't compete for pooled connections.
+    """
+    global _last_db_ping
+    if time.monotonic() - _last_db_ping >= HEALTH_CHECK_TTL:
+        try:
+            await asyncio.wait_for(ping_db(), timeout=HEALTH_CHECK_TIMEOUT)
+        except Exception:
+            logger.warning("Health check: database ping failed", exc_info=True)
+            return ORJSONResponse(
+                {"status": "unhealthy", "database": "disconnected"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        _last_db_ping = time.monotonic()
+    
     return {
         "status": "healthy",
         "database": "connected"
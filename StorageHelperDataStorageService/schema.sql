@@ -81,13 +81,19 @@ CREATE TABLE document (
     FOREIGN KEY (current_location_id) REFERENCES storage_location(id) ON DELETE SET NULL
 );
 
+-- Covers owner-filtered lookups of (id, title), e.g. owner-scoped semantic search;
+-- InnoDB secondary indexes carry the primary key, so id needs no extra column
+CREATE INDEX ix_document_owner_title ON document (owner_id, title);
+
 -- ============================================================
 -- 6. document_embedding: semantic vector representation (for search)
 -- ============================================================
 
 CREATE TABLE document_embedding (
     document_id     INT PRIMARY KEY,
-    embedding       JSON NOT NULL,    -- e.g. [0.123, -0.98, ...]
+    embedding       BLOB NOT NULL,    -- packed little-endian float32 values (4 bytes per dimension)
+    embedding_i8    BLOB,             -- int8 copy for the search index: embedding ~= embedding_i8 * embedding_scale
+    embedding_scale FLOAT,
     FOREIGN KEY (document_id) REFERENCES document(id) ON DELETE CASCADE
 );
 
@@ -104,6 +110,16 @@ CREATE TABLE feedback_message (
     FOREIGN KEY (document_id) REFERENCES document(id) ON DELETE CASCADE
 );
 
+-- ============================================================
+-- 8. embedding_cache: embeddings keyed by hash of (model, text)
+-- ============================================================
+
+CREATE TABLE embedding_cache (
+    content_hash    BINARY(32) PRIMARY KEY,   -- blake2b-256 of model name + text
+    model           VARCHAR(100) NOT NULL,
+    embedding       BLOB NOT NULL             -- packed little-endian float32 values
+);
+
 -- ============================================================
 -- END OF SCHEMA
 -- ============================================================
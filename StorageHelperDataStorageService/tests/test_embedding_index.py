@@ -0,0 +1,106 @@
+"""
+Tests for the in-memory embedding index used by semantic search
+"""
+import asyncio
+
+import numpy as np
+
+from app.services.embedding_index import EmbeddingIndex, embedding_columns
+
+DIMENSION = 32
+
+# Owners 1, 17 and 33 share one shard (owner_id % OWNER_SHARDS), so owner filtering
+# has to slice within a shard rather than rely on the partitioning
+OWNERS = (1, 2, 17, 33)
+
+
+class FakeSession:
+    """
+    Just enough of AsyncSession for EmbeddingIndex: stream() feeds the matrix load and
+    execute() answers the float32 rescore query for the requested candidate IDs only
+    """
+    
+    def __init__(self, rows):
+        # document id -> (owner id, float32 embedding)
+        self.rows = rows
+    
+    async def stream(self, query):
+        async def result():
+            for document_id, (owner_id, vector) in self.rows.items():
+                yield document_id, owner_id, embedding_columns(vector)["embedding_i8"], None
+        return result()
+    
+    async def execute(self, query):
+        candidates = query.whereclause.right.value
+        return [
+            (document_id, embedding_columns(self.rows[document_id][1])["embedding"])
+            for document_id in candidates if document_id in self.rows
+        ]
+
+
+def make_rows(count=400, seed=0):
+    """Random embeddings spread over OWNERS"""
+    rng = np.random.default_rng(seed)
+    return {
+        document_id: (OWNERS[document_id % len(OWNERS)], rng.standard_normal(DIMENSION).astype(np.float32))
+        for document_id in range(1, count + 1)
+    }
+
+
+def brute_force(rows, query, limit, owner_id=None):
+    """Document IDs ranked by exact cosine similarity"""
+    ids = [document_id for document_id, (owner, _) in rows.items() if owner_id is None or owner == owner_id]
+    matrix = np.stack([rows[document_id][1] for document_id in ids])
+    scores = (matrix @ query) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    return [ids[i] for i in np.argsort(-scores, kind="stable")[:limit]]
+
+
+def search(index, db, query, limit, owner_id=None):
+    return asyncio.run(index.search(db, query, limit, owner_id=owner_id))
+
+
+def test_search_matches_brute_force_top_k():
+    """The int8 preselect plus float32 rescore returns the exact top-k, in order."""
+    rows = make_rows()
+    db = FakeSession(rows)
+    index = EmbeddingIndex(ttl=300)
+    rng = np.random.default_rng(1)
+    
+    for _ in range(20):
+        query = rng.standard_normal(DIMENSION).astype(np.float32)
+        assert search(index, db, query, 10) == brute_force(rows, query, 10)
+
+
+def test_owner_filter_only_returns_that_owners_documents():
+    """Owner-filtered results match brute force over the owner's rows, excluding owners in the same shard."""
+    rows = make_rows()
+    db = FakeSession(rows)
+    index = EmbeddingIndex(ttl=300)
+    rng = np.random.default_rng(2)
+    
+    for owner_id in OWNERS:
+        query = rng.standard_normal(DIMENSION).astype(np.float32)
+        results = search(index, db, query, 10, owner_id=owner_id)
+        assert results == brute_force(rows, query, 10, owner_id=owner_id)
+        assert all(rows[document_id][0] == owner_id for document_id in results)
+    
+    assert search(index, db, np.ones(DIMENSION, dtype=np.float32), 10, owner_id=99) == []
+
+
+def test_upserted_row_replaces_stale_matrix_version():
+    """An embedding saved after the load is ranked by its new vector, and its old matrix row is dropped."""
+    rows = make_rows()
+    db = FakeSession(rows)
+    index = EmbeddingIndex(ttl=300)
+    query = np.random.default_rng(3).standard_normal(DIMENSION).astype(np.float32)
+    top_id = search(index, db, query, 1)[0]
+    
+    # Point the former best match away from the query, and another document straight at it
+    moved_id = next(document_id for document_id in rows if document_id != top_id)
+    rows[top_id] = (rows[top_id][0], -query)
+    rows[moved_id] = (rows[moved_id][0], query.copy())
+    index.upsert([(top_id, rows[top_id][0], -query), (moved_id, rows[moved_id][0], query)])
+    
+    assert search(index, db, query, 1) == [moved_id]
+    # With every row rescored, the ranking matches brute force over the new vectors, one row per document
+    assert search(index, db, query, len(rows)) == brute_force(rows, query, len(rows))